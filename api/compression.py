@@ -0,0 +1,80 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware, DEFAULT_EXCLUDED_CONTENT_TYPES
+from data_binding.export import COMPRESSED_MEDIA_TYPES
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+DEFAULT_MINIMUM_SIZE = 1024
+
+
+class CompressionMiddleware:
+    """
+    Compress responses larger than ``minimum_size``.
+
+    Brotli is used when the client accepts it and the ``brotli`` package is
+    installed, gzip otherwise. Exported files (Parquet, compressed CSV) are
+    sent as they are. The brotli path buffers single-chunk bodies only:
+    streamed responses and responses that already carry a Content-Encoding are
+    passed through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = DEFAULT_MINIMUM_SIZE, brotli_quality: int = 4, gzip_level: int = 6):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.brotli_quality = brotli_quality
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size, compresslevel=gzip_level,
+                                   exclude_content_types=DEFAULT_EXCLUDED_CONTENT_TYPES + COMPRESSED_MEDIA_TYPES)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and brotli is not None:
+            accept_encoding = Headers(scope=scope).get("Accept-Encoding", "")
+            if "br" in accept_encoding:
+                await BrotliResponder(self.app, self.minimum_size, self.brotli_quality)(scope, receive, send)
+                return
+        await self.gzip(scope, receive, send)
+
+
+class BrotliResponder:
+    def __init__(self, app, minimum_size: int, quality: int):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.quality = quality
+        self.send = None
+        self.initial_message = None
+        self.passthrough = False
+
+    async def __call__(self, scope, receive, send):
+        self.send = send
+        await self.app(scope, receive, self.send_with_brotli)
+
+    async def send_with_brotli(self, message):
+        if message["type"] == "http.response.start":
+            # Hold the headers until we know whether the body will be compressed
+            self.initial_message = message
+            headers = Headers(raw=message["headers"])
+            media_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+            self.passthrough = "content-encoding" in headers or media_type in COMPRESSED_MEDIA_TYPES
+            return
+        if message["type"] != "http.response.body" or self.initial_message is None:
+            await self.send(message)
+            return
+
+        initial_message, self.initial_message = self.initial_message, None
+        body = message.get("body", b"")
+        if self.passthrough or message.get("more_body", False) or len(body) < self.minimum_size:
+            # Small, already encoded or streamed bodies are sent as they are;
+            # any further body chunks go straight through (initial_message is None)
+            await self.send(initial_message)
+            await self.send(message)
+            return
+
+        compressed = brotli.compress(body, quality=self.quality)
+        headers = MutableHeaders(raw=initial_message["headers"])
+        headers["Content-Encoding"] = "br"
+        headers["Content-Length"] = str(len(compressed))
+        headers.add_vary_header("Accept-Encoding")
+        await self.send(initial_message)
+        await self.send({"type": "http.response.body", "body": compressed})
@@ -0,0 +1,222 @@
+import os
+import re
+import glob
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from data_binding.pushdown import build_select
+from data_binding.timeseries import has_series
+from utils.config_loader import load_yaml, load_dataset_definition, get_datacard_yaml_path, metadata_cache
+from utils.schema import schema_columns
+
+logger = logging.getLogger(__name__)
+
+DatasetKey = Tuple[str, str]
+
+_IDENTIFIER = re.compile(r'^"?([A-Za-z_][A-Za-z0-9_]*)"?$')
+_ALIAS = re.compile(r'\s+AS\s+"?([A-Za-z_][A-Za-z0-9_]*)"?\s*$', re.I)
+_DIRECTION = re.compile(r'\s+(ASC|DESC)?(\s+NULLS\s+(FIRST|LAST))?\s*$', re.I)
+
+
+class DatacardBindingError(ValueError):
+    """A datacard that cannot be bound to a dataset, or whose query does not fit its schema."""
+
+
+def _column_names(definition: Dict[str, Any]) -> List[str]:
+    return [column['name'] if isinstance(column, dict) else str(column).split()[0]
+            for column in schema_columns(definition)]
+
+
+class DatacardBinding:
+    """
+    A datacard resolved to the dataset it charts, with its query ready to run:
+    the ``table`` dropped (the dataset binds its own), described by the title,
+    and compiled to SQL for the dataset's table once.
+    """
+
+    def __init__(self, organization: str, definition: str, dataset: DatasetKey, table: str,
+                 datacard: Dict[str, Any], signature: Optional[Tuple[int, int, int]]):
+        self.organization = organization
+        self.definition = definition
+        self.dataset = dataset
+        self.table = table
+        self.datacard = datacard
+        self.signature = signature
+        query = {key: value for key, value in dict(datacard.get('query') or {}).items() if key != 'table'}
+        query.setdefault('description', datacard.get('title') or f"Datacard {organization}/{definition}")
+        self.query = query
+        # Joins name their tables when they are bound, so only single-dataset queries are precompiled
+        self.sql = None if query.get('join') else build_select(dict(query, table=table))
+
+    @property
+    def dataset_name(self) -> str:
+        return '/'.join(self.dataset)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'datacard': f"{self.organization}/{self.definition}", 'dataset': self.dataset_name,
+                'table': self.table, 'query': self.query, 'sql': self.sql}
+
+
+class DatacardIndex:
+    """
+    Datacard -> dataset bindings, built from the whole catalog at startup.
+
+    A datacard is bound to the dataset named by its ``dataset`` key, else to
+    the dataset whose table (``database.table``, or its slug) is its query's
+    ``table`` (in its organization first), else to the dataset with its own
+    organization and slug. Each binding is checked against the dataset schema:
+    plain ``select`` and ``order_by`` columns must exist, and so must the
+    ``xAxis``/``yAxis`` it charts.
+
+    Lookups are dictionary reads; a datacard whose YAML changed since it was
+    bound is re-bound on its next lookup.
+    """
+
+    def __init__(self, datacards_dir: str = 'datacards', datasets_dir: str = 'datasets'):
+        self.datacards_dir = datacards_dir
+        self.datasets_dir = datasets_dir
+        self._bindings: Dict[Tuple[str, str], DatacardBinding] = {}
+        self._errors: Dict[Tuple[str, str], Tuple[Optional[Tuple[int, int, int]], DatacardBindingError]] = {}
+        self._by_dataset: Dict[DatasetKey, List[Tuple[str, str]]] = {}
+        # table name -> datasets serving it
+        self._tables: Dict[str, List[DatasetKey]] = {}
+        self._built = False
+        self._lock = threading.Lock()
+
+    def build(self) -> Dict[str, str]:
+        """Bind every datacard; returns the problems found, by datacard name."""
+        with self._lock:
+            self._scan_datasets()
+            self._bindings, self._errors, self._by_dataset = {}, {}, {}
+            for path in sorted(glob.glob(os.path.join(self.datacards_dir, '*', '*.yml'))):
+                organization = os.path.basename(os.path.dirname(path))
+                definition = os.path.splitext(os.path.basename(path))[0]
+                self._bind(organization, definition)
+            self._built = True
+        problems = {f"{key[0]}/{key[1]}": str(error) for key, (_, error) in self._errors.items()}
+        for name, problem in problems.items():
+            logger.warning("Datacard %s is not servable: %s", name, problem)
+        logger.info("Bound %d datacards (%d with problems)", len(self._bindings), len(problems))
+        return problems
+
+    def resolve(self, organization: str, definition: str) -> DatacardBinding:
+        key = (organization, definition)
+        path = get_datacard_yaml_path(organization, definition)
+        binding = self._bindings.get(key)
+        signature = metadata_cache.signature(path)
+        if binding is not None and binding.signature == signature:
+            return binding
+        failed = self._errors.get(key)
+        if failed is not None and failed[0] == signature:
+            raise failed[1]
+        if signature is None:
+            raise FileNotFoundError(f"Datacard file not found: {path}")
+        with self._lock:
+            if binding is None and failed is None:
+                # Unknown until now: datasets may have been added too
+                self._scan_datasets()
+            binding = self._bind(organization, definition)
+        if binding is None:
+            raise self._errors[key][1]
+        return binding
+
+    def datacards_for(self, organization: str, dataset: str) -> List[Tuple[str, str]]:
+        """The datacards bound to a dataset."""
+        if not self._built:
+            self.build()
+        return list(self._by_dataset.get((organization, dataset), []))
+
+    def problems(self) -> Dict[str, str]:
+        return {f"{key[0]}/{key[1]}": str(error) for key, (_, error) in self._errors.items()}
+
+    def _scan_datasets(self):
+        tables: Dict[str, List[DatasetKey]] = {}
+        for path in glob.glob(os.path.join(self.datasets_dir, '*', '*', 'dataset.yaml')):
+            dataset_dir = os.path.dirname(path)
+            key = (os.path.basename(os.path.dirname(dataset_dir)), os.path.basename(dataset_dir))
+            try:
+                table = load_dataset_definition(*key).get('database', {}).get('table') or key[1]
+            except Exception as e:
+                logger.warning(f"Skipping dataset {key[0]}/{key[1]}: {str(e)}")
+                continue
+            for name in {table, key[1]}:
+                tables.setdefault(name, []).append(key)
+        self._tables = tables
+
+    def _bind(self, organization: str, definition: str) -> Optional[DatacardBinding]:
+        key = (organization, definition)
+        path = get_datacard_yaml_path(organization, definition)
+        signature = metadata_cache.signature(path)
+        previous = self._bindings.pop(key, None)
+        if previous is not None:
+            self._by_dataset.get(previous.dataset, []).remove(key)
+        self._errors.pop(key, None)
+        try:
+            datacard = load_yaml(path)
+            dataset = self._resolve_dataset(organization, definition, datacard)
+            dataset_definition = load_dataset_definition(*dataset)
+            binding = DatacardBinding(organization, definition, dataset,
+                                      dataset_definition.get('database', {}).get('table') or dataset[1],
+                                      datacard, signature)
+            self._validate(binding, _column_names(dataset_definition))
+        except DatacardBindingError as e:
+            self._errors[key] = (signature, e)
+            return None
+        except Exception as e:
+            self._errors[key] = (signature, DatacardBindingError(f"Datacard {organization}/{definition}: {str(e)}"))
+            return None
+        self._bindings[key] = binding
+        self._by_dataset.setdefault(binding.dataset, []).append(key)
+        return binding
+
+    def _resolve_dataset(self, organization: str, definition: str, datacard: Dict[str, Any]) -> DatasetKey:
+        name = f"{organization}/{definition}"
+        if datacard.get('dataset'):
+            dataset_org, _, dataset = str(datacard['dataset']).partition('/')
+            if not dataset:
+                raise DatacardBindingError(f"Datacard {name}: dataset must be 'organization/dataset', "
+                                           f"got '{datacard['dataset']}'")
+            if not os.path.exists(os.path.join(self.datasets_dir, dataset_org, dataset, 'dataset.yaml')):
+                raise DatacardBindingError(f"Datacard {name} is bound to {datacard['dataset']}, which does not exist")
+            return dataset_org, dataset
+        table = (datacard.get('query') or {}).get('table')
+        candidates = self._tables.get(table, []) if table else []
+        in_organization = [key for key in candidates if key[0] == organization]
+        if len(in_organization) == 1 or len(candidates) == 1:
+            return (in_organization or candidates)[0]
+        if len(candidates) > 1:
+            names = ', '.join(sorted('/'.join(key) for key in candidates))
+            raise DatacardBindingError(f"Datacard {name}: table '{table}' is served by {names}; "
+                                       f"set `dataset` to choose one")
+        if os.path.exists(os.path.join(self.datasets_dir, organization, definition, 'dataset.yaml')):
+            return organization, definition
+        raise DatacardBindingError(f"Datacard {name} is not bound to any dataset: no dataset serves table "
+                                   f"'{table}'; set `dataset: organization/dataset`")
+
+    @staticmethod
+    def _validate(binding: DatacardBinding, columns: List[str]):
+        if not columns:
+            # Datasets without a declared schema are checked when queried
+            return
+        query, known = binding.query, set(columns)
+        outputs, missing = set(), []
+        for item in query.get('select') or []:
+            alias = _ALIAS.search(item)
+            expression = item[:alias.start()] if alias else item
+            match = _IDENTIFIER.match(expression.strip())
+            if match and match.group(1) not in known:
+                missing.append(match.group(1))
+            outputs.add(alias.group(1) if alias else (match.group(1) if match else expression.strip()))
+        for item in query.get('order_by') or []:
+            match = _IDENTIFIER.match(_DIRECTION.sub('', item).strip())
+            if match and match.group(1) not in known | outputs:
+                missing.append(match.group(1))
+        if query.get('select') and '*' not in outputs and not has_series(query):
+            for axis in ('xAxis', 'yAxis'):
+                name = binding.datacard.get(axis)
+                if name and name not in outputs:
+                    missing.append(f"{name} ({axis})")
+        if missing:
+            raise DatacardBindingError(
+                f"Datacard {binding.organization}/{binding.definition} uses {', '.join(dict.fromkeys(missing))}, "
+                f"not in the columns of {binding.dataset_name} ({', '.join(columns)})")
@@ -0,0 +1,155 @@
+import os
+import glob
+import gzip
+import json
+import hashlib
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from utils.serialization import encode_json, table_to_records
+from data_binding.events import DatasetEvent
+from data_binding.snapshot import get_data_path, snapshot_version
+from utils.config_loader import (load_config, load_dataset_definition, get_datacard_yaml_path, get_dataset_yaml_path,
+                                 metadata_cache)
+from utils.metrics import stage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_DIR = '.cache/datacards'
+# Bumped when the artifact layout changes, so old artifacts are rebuilt
+FORMAT_VERSION = 1
+
+
+class DatacardSnapshot:
+    """A datacard's definition and chart data, as gzip-compressed JSON."""
+
+    def __init__(self, version: str, body: bytes):
+        self.version = version
+        # gzip of {"version", "generated_at", "datacard", "data"}
+        self.body = body
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.version}"'
+
+    def json(self) -> bytes:
+        return gzip.decompress(self.body)
+
+
+class DatacardSnapshotStore:
+    """
+    Pre-rendered datacards: the definition plus its downsampled query result,
+    stored once per datacard version under ``datacards.snapshot_dir``.
+
+    A version hashes everything the artifact is built from (the datacard
+    YAML, the dataset definition and the published data snapshot), so it
+    doubles as the ETag and a stale artifact is never served. Dataset events
+    rebuild the affected datacards off the request path, so views run no
+    query; a datacard with no artifact for its current version is built on
+    first request.
+    """
+
+    def __init__(self, datacard_service, query_service, directory: Optional[str] = None):
+        self.datacard_service = datacard_service
+        self.query_service = query_service
+        if directory is None:
+            directory = load_config().get('datacards', {}).get('snapshot_dir', DEFAULT_SNAPSHOT_DIR)
+        self.directory = directory
+        # (organization, definition) -> latest snapshot held in memory
+        self._snapshots: Dict[Tuple[str, str], DatacardSnapshot] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def dataset_for(self, organization: str, definition: str) -> Tuple[str, str]:
+        return self.datacard_service.binding(organization, definition).dataset
+
+    def datacards_for(self, organization: str, dataset: str) -> List[Tuple[str, str]]:
+        return self.datacard_service.index.datacards_for(organization, dataset)
+
+    def version(self, organization: str, definition: str) -> str:
+        datacard_path = get_datacard_yaml_path(organization, definition)
+        if not os.path.exists(datacard_path):
+            raise FileNotFoundError(f"Datacard file not found: {datacard_path}")
+        dataset_org, dataset = self.dataset_for(organization, definition)
+        database_config = load_dataset_definition(dataset_org, dataset).get('database', {})
+        sources = [
+            FORMAT_VERSION,
+            metadata_cache.signature(datacard_path),
+            metadata_cache.signature(get_dataset_yaml_path(dataset_org, dataset)),
+            snapshot_version(get_data_path(dataset_org, dataset, database_config) or ''),
+            load_config().get('datacards', {}).get('max_points'),
+        ]
+        return hashlib.sha256(json.dumps(sources, default=str).encode()).hexdigest()[:20]
+
+    def path(self, organization: str, definition: str, version: str) -> str:
+        return os.path.join(self.directory, organization, f"{definition}.{version}.json.gz")
+
+    def get(self, organization: str, definition: str) -> DatacardSnapshot:
+        """The snapshot of the datacard's current version, built if there is none yet."""
+        version = self.version(organization, definition)
+        snapshot = self._snapshots.get((organization, definition))
+        if snapshot is not None and snapshot.version == version:
+            self.hits += 1
+            return snapshot
+        path = self.path(organization, definition, version)
+        if os.path.exists(path):
+            # Built by an earlier process, or by another worker
+            with open(path, 'rb') as f:
+                snapshot = DatacardSnapshot(version, f.read())
+            self.hits += 1
+        else:
+            self.misses += 1
+            snapshot = self.build(organization, definition, version)
+        self._snapshots[(organization, definition)] = snapshot
+        return snapshot
+
+    def build(self, organization: str, definition: str, version: Optional[str] = None) -> DatacardSnapshot:
+        """Run the datacard's query and write its artifact, replacing older versions."""
+        with self._lock:
+            version = version or self.version(organization, definition)
+            with stage("datacard_snapshot"):
+                datacard = self.datacard_service.get_datacard(organization, definition)
+                query = self.datacard_service.chart_query(organization, definition)
+                binding = self.datacard_service.binding(organization, definition)
+                # The artifact is the cache; its version already names the data snapshot
+                table = self.query_service.execute_query_on_dataset_arrow(query, *binding.dataset, cache=False,
+                                                                          compiled=binding.sql)
+                document = encode_json({
+                    'version': version,
+                    'generated_at': datetime.now(timezone.utc).isoformat(),
+                    'datacard': datacard,
+                    'data': table_to_records(table),
+                })
+                # mtime=0 keeps the bytes a function of the content
+                snapshot = DatacardSnapshot(version, gzip.compress(document, compresslevel=6, mtime=0))
+            path = self.path(organization, definition, version)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temporary = f"{path}.{os.getpid()}.tmp"
+            with open(temporary, 'wb') as f:
+                f.write(snapshot.body)
+            os.replace(temporary, path)
+            for old in glob.glob(self.path(organization, definition, '*')):
+                if old != path:
+                    try:
+                        os.remove(old)
+                    except FileNotFoundError:
+                        pass
+            self._snapshots[(organization, definition)] = snapshot
+        logger.info("Built datacard snapshot %s/%s (%d rows, %d bytes)",
+                    organization, definition, table.num_rows, len(snapshot.body))
+        return snapshot
+
+    def on_dataset_event(self, event: DatasetEvent):
+        for organization, definition in self.datacards_for(event.organization, event.dataset):
+            self._snapshots.pop((organization, definition), None)
+            try:
+                self.build(organization, definition)
+            except Exception as e:
+                # The next view builds it instead
+                logger.error(f"Could not rebuild datacard snapshot {organization}/{definition}: {str(e)}")
+
+    def info(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._snapshots),
+                'bytes': sum(len(snapshot.body) for snapshot in self._snapshots.values())}
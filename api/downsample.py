@@ -0,0 +1,124 @@
+import logging
+from typing import Any, Dict, Optional
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from utils.metrics import stage
+
+logger = logging.getLogger(__name__)
+
+METHODS = ('lttb', 'minmax')
+
+
+def _axis(column: pa.ChunkedArray) -> np.ndarray:
+    """A float x axis: numbers and timestamps as themselves, anything else by position."""
+    if pa.types.is_temporal(column.type):
+        column = column.cast(pa.int32() if pa.types.is_date32(column.type) else pa.int64())
+    elif not (pa.types.is_integer(column.type) or pa.types.is_floating(column.type)):
+        return np.arange(len(column), dtype=np.float64)
+    return column.to_numpy(zero_copy_only=False).astype(np.float64)
+
+
+def _values(column: pa.ChunkedArray) -> np.ndarray:
+    if not (pa.types.is_integer(column.type) or pa.types.is_floating(column.type) or pa.types.is_decimal(column.type)):
+        raise ValueError(f"Cannot downsample a {column.type} column; the y axis must be numeric")
+    # Nulls become NaN, which no bucket picks over a value
+    return pc.cast(column, pa.float64()).to_numpy(zero_copy_only=False)
+
+
+def _bucket_edges(count: int, buckets: int) -> np.ndarray:
+    """Start offsets of ``buckets`` equal-count buckets over ``count`` points, plus ``count``."""
+    return np.linspace(0, count, buckets + 1).astype(np.int64)
+
+
+def lttb(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Indices of the points Largest-Triangle-Three-Buckets keeps: the first and
+    last point, and from each of ``max_points - 2`` equal-count buckets the
+    point forming the largest triangle with the point kept from the previous
+    bucket and the mean of the next one.
+    """
+    count = len(x)
+    if max_points >= count:
+        return np.arange(count)
+    if max_points < 3:
+        raise ValueError("LTTB keeps the first and last point; max_points must be at least 3")
+    edges = 1 + _bucket_edges(count - 2, max_points - 2)
+    starts, ends = edges[:-1], edges[1:]
+    # Mean of every bucket, and of the last point, as the third triangle vertex
+    filled = np.where(np.isnan(y), 0.0, y)
+    valid = (~np.isnan(y)).astype(np.float64)
+    sizes = np.diff(edges).astype(np.float64)
+    mean_x = np.add.reduceat(x[1:-1], starts - 1) / sizes
+    value_counts = np.add.reduceat(valid[1:-1], starts - 1)
+    mean_y = np.add.reduceat(filled[1:-1], starts - 1) / np.maximum(value_counts, 1)
+    mean_x = np.append(mean_x[1:], x[-1])
+    mean_y = np.append(mean_y[1:], filled[-1])
+
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0], selected[-1] = 0, count - 1
+    previous = 0
+    for bucket, (start, end) in enumerate(zip(starts, ends)):
+        ax, ay = x[previous], filled[previous]
+        area = np.abs((ax - mean_x[bucket]) * (y[start:end] - ay) - (ax - x[start:end]) * (mean_y[bucket] - ay))
+        # All-null buckets keep their first point
+        best = np.nanargmax(area) if value_counts[bucket] else 0
+        previous = selected[bucket + 1] = start + best
+    return selected
+
+
+def min_max(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Indices of the minimum and maximum of each of ``(max_points - 2) // 2``
+    equal-count buckets, plus the first and last point, in order. Keeps
+    every spike, so it suits noisy series better than LTTB.
+    """
+    count = len(x)
+    if max_points >= count:
+        return np.arange(count)
+    buckets = max(1, (max_points - 2) // 2)
+    starts = _bucket_edges(count, buckets)[:-1]
+    bucket_of = np.repeat(np.arange(buckets), np.diff(_bucket_edges(count, buckets)))
+    lows = np.fmin.reduceat(y, starts)[bucket_of]
+    highs = np.fmax.reduceat(y, starts)[bucket_of]
+    # The first point of each bucket that equals its minimum (or maximum)
+    first_low = np.unique(bucket_of[y == lows], return_index=True)[1]
+    first_high = np.unique(bucket_of[y == highs], return_index=True)[1]
+    positions = np.concatenate([np.flatnonzero(y == lows)[first_low], np.flatnonzero(y == highs)[first_high],
+                                [0, count - 1]])
+    return np.unique(positions)
+
+
+def downsample_table(table: pa.Table, x: str, y: str, max_points: int, method: str = 'lttb') -> pa.Table:
+    """
+    At most ``max_points`` rows of ``table`` chosen to preserve the shape of
+    the ``y`` over ``x`` line, so a chart's payload and render time do not
+    grow with the data. Rows are sorted by ``x`` first unless they already are.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unsupported downsampling method '{method}'; use one of {', '.join(METHODS)}")
+    if max_points is None or table.num_rows <= max_points:
+        return table
+    if max_points < 4:
+        raise ValueError("max_points must be at least 4")
+    for name in (x, y):
+        if name not in table.column_names:
+            raise ValueError(f"Cannot downsample on '{name}': the query returns no such column")
+
+    with stage("downsample"):
+        axis = _axis(table.column(x))
+        if np.any(np.diff(axis) < 0):
+            order = np.argsort(axis, kind='stable')
+            table, axis = table.take(pa.array(order)), axis[order]
+        values = _values(table.column(y))
+        indices = (lttb if method == 'lttb' else min_max)(axis, values, max_points)
+        logger.debug("Downsampled %d rows to %d with %s", table.num_rows, len(indices), method)
+        return table.take(pa.array(indices))
+
+
+def apply_downsample(table: pa.Table, downsample: Optional[Dict[str, Any]]) -> pa.Table:
+    """Apply a query model's ``downsample`` section, if any, to its result."""
+    if not downsample or not downsample.get('max_points'):
+        return table
+    return downsample_table(table, downsample['x'], downsample['y'], downsample['max_points'],
+                            downsample.get('method') or 'lttb')
@@ -0,0 +1,71 @@
+import os
+import hashlib
+from typing import Dict, Tuple
+from fastapi import Request
+from fastapi.staticfiles import StaticFiles
+from utils.config_loader import MetadataCache
+from utils.metrics import registry
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Cacheable, but always revalidated with the ETag so edits show up immediately
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# In-memory copies of small text files served verbatim (e.g. render.html)
+text_cache = MetadataCache(parse=lambda file: file.read(), stage_name='template_load')
+registry.register_cache('template', text_cache.info)
+
+
+def load_text(file_path: str) -> str:
+    return text_cache.get(file_path)
+
+
+def file_etag(file_path: str) -> str:
+    st = os.stat(file_path)
+    return f'W/"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return any(tag.strip() in (etag, "*") for tag in if_none_match.split(","))
+
+
+class HashedStaticFiles(StaticFiles):
+    """
+    StaticFiles that can hand out content-hashed URLs.
+
+    Assets requested through ``url_for`` carry ``?v=<hash>`` and are served with
+    a one-year immutable Cache-Control; any other request (or a stale hash) is
+    revalidated through the ETag StaticFiles already sets.
+    """
+
+    def __init__(self, *args, url_prefix: str = "/static", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.url_prefix = url_prefix
+        self._hashes: Dict[str, Tuple[Tuple[int, int], str]] = {}
+
+    def content_hash(self, path: str) -> str:
+        full_path = os.path.join(self.directory, path)
+        st = os.stat(full_path)
+        signature = (st.st_mtime_ns, st.st_size)
+        entry = self._hashes.get(path)
+        if entry is None or entry[0] != signature:
+            with open(full_path, "rb") as f:
+                entry = (signature, hashlib.sha256(f.read()).hexdigest()[:12])
+            self._hashes[path] = entry
+        return entry[1]
+
+    def url_for(self, path: str) -> str:
+        return f"{self.url_prefix}/{path}?v={self.content_hash(path)}"
+
+    async def get_response(self, path: str, scope):
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            version = Request(scope).query_params.get("v")
+            try:
+                fresh = version is not None and version == self.content_hash(path)
+            except OSError:
+                fresh = False
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL if fresh else REVALIDATE_CACHE_CONTROL
+        return response
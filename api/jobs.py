@@ -0,0 +1,235 @@
+import os
+import re
+import glob
+import json
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+from data_binding.export import EXPORT_FORMATS, export_format
+from utils.config_loader import load_config, load_dataset_definition
+from utils.metrics import stage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SPOOL_DIR = '.cache/jobs'
+DEFAULT_WORKERS = 2
+DEFAULT_TTL_SECONDS = 3600
+DEFAULT_GC_INTERVAL_SECONDS = 60
+# A running job's record is rewritten when its progress moves this much, or this often
+PROGRESS_SAVE_STEP = 0.01
+PROGRESS_SAVE_INTERVAL_SECONDS = 1.0
+
+_JOB_ID = re.compile(r'^[0-9a-f]{32}$')
+QUEUED, RUNNING, SUCCEEDED, FAILED = 'queued', 'running', 'succeeded', 'failed'
+FINISHED = (SUCCEEDED, FAILED)
+
+
+class Job:
+    """A query submitted to run in the background, and where its result is spooled."""
+
+    def __init__(self, id: str, organization: str, dataset: str, query: Dict[str, Any], format: str,
+                 compression: Optional[str] = None, status: str = QUEUED, progress: float = 0.0, rows: Optional[int] = None,
+                 bytes: Optional[int] = None, error: Optional[str] = None, created_at: Optional[float] = None,
+                 started_at: Optional[float] = None, finished_at: Optional[float] = None,
+                 expires_at: Optional[float] = None):
+        self.id = id
+        self.organization = organization
+        self.dataset = dataset
+        self.query = query
+        self.format = format
+        self.compression = compression
+        self.status = status
+        self.progress = progress
+        self.rows = rows
+        self.bytes = bytes
+        self.error = error
+        self.created_at = created_at if created_at is not None else time.time()
+        self.started_at = started_at
+        self.finished_at = finished_at
+        self.expires_at = expires_at
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    @property
+    def media_type(self) -> str:
+        return EXPORT_FORMATS[self.format].content_type(self.compression)
+
+    @property
+    def filename(self) -> str:
+        return EXPORT_FORMATS[self.format].filename(f"{self.dataset}-{self.id}", self.compression)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'id': self.id, 'organization': self.organization, 'dataset': self.dataset, 'query': self.query,
+                'format': self.format, 'compression': self.compression, 'status': self.status, 'progress': round(self.progress, 4),
+                'rows': self.rows, 'bytes': self.bytes, 'error': self.error, 'created_at': self.created_at,
+                'started_at': self.started_at, 'finished_at': self.finished_at, 'expires_at': self.expires_at}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Job':
+        return cls(**data)
+
+
+class JobManager:
+    """
+    Long-running queries run on a worker pool instead of an HTTP request.
+
+    Each job reports the fraction of its query done (DuckDB's
+    ``query_progress``) and spools its result to a Parquet, CSV or Arrow file under
+    ``jobs.spool_dir``, next to a JSON record of its status, so any API
+    process can serve the status and the download. Results are kept for
+    ``jobs.ttl_seconds`` after the job finishes, then garbage-collected;
+    ``start`` runs the collector every ``jobs.gc_interval_seconds``.
+    """
+
+    def __init__(self, query_service, directory: Optional[str] = None, workers: Optional[int] = None,
+                 ttl_seconds: Optional[float] = None, gc_interval: Optional[float] = None):
+        config = load_config().get('jobs', {})
+        self.query_service = query_service
+        self.directory = directory or config.get('spool_dir', DEFAULT_SPOOL_DIR)
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else config.get('ttl_seconds', DEFAULT_TTL_SECONDS)
+        self.gc_interval = gc_interval or config.get('gc_interval_seconds', DEFAULT_GC_INTERVAL_SECONDS)
+        self._executor = ThreadPoolExecutor(max_workers=workers or config.get('workers', DEFAULT_WORKERS),
+                                            thread_name_prefix='query-job')
+        # Jobs submitted to this process, and those still to run, by id
+        self._jobs: Dict[str, Job] = {}
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, query: Dict[str, Any], organization: str, dataset: str, format: str = 'parquet',
+               compression: Optional[str] = None) -> Job:
+        format = export_format(format).name
+        compression = EXPORT_FORMATS[format].compression(compression)
+        # Unknown datasets fail here rather than in the background
+        load_dataset_definition(organization, dataset)
+        job = Job(uuid.uuid4().hex, organization, dataset, query, format, compression)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._save(job)
+        with self._lock:
+            self._pending[job.id] = self._executor.submit(self._run, job)
+        logger.info("Queued job %s on %s/%s", job.id, organization, dataset)
+        return job
+
+    def get(self, job_id: str) -> Job:
+        """The job, from this process or from its record in the spool; KeyError if unknown or expired."""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+        if not _JOB_ID.match(job_id):
+            raise KeyError(job_id)
+        try:
+            with open(self._record_path(job_id)) as f:
+                return Job.from_dict(json.load(f))
+        except (FileNotFoundError, ValueError, TypeError):
+            raise KeyError(job_id)
+
+    def result_path(self, job: Job) -> str:
+        return os.path.join(self.directory, EXPORT_FORMATS[job.format].filename(job.id, job.compression))
+
+    def collect_garbage(self, now: Optional[float] = None) -> int:
+        """Delete expired jobs and their results; returns how many were removed."""
+        now = now if now is not None else time.time()
+        removed = 0
+        for record in glob.glob(os.path.join(self.directory, '*.json')):
+            job_id = os.path.splitext(os.path.basename(record))[0]
+            try:
+                job = self.get(job_id)
+            except KeyError:
+                continue
+            if job.finished:
+                expired = job.expires_at is not None and job.expires_at <= now
+            else:
+                # Left unfinished by a process that is gone
+                expired = job_id not in self._jobs and job.created_at + self.ttl_seconds <= now
+            if expired:
+                with self._lock:
+                    self._jobs.pop(job_id, None)
+                for path in glob.glob(os.path.join(self.directory, f"{job_id}.*")):
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                removed += 1
+        if removed:
+            logger.info("Removed %d expired jobs", removed)
+        return removed
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._collect_periodically, name='job-gc', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the collector and the worker pool; running jobs finish, queued ones are failed."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            cancelled = [self._jobs[job_id] for job_id, future in self._pending.items() if future.cancelled()]
+        for job in cancelled:
+            job.status, job.error, job.finished_at = FAILED, "Cancelled: the server shut down", time.time()
+            job.expires_at = job.finished_at + self.ttl_seconds
+            self._save(job)
+
+    def _collect_periodically(self):
+        while not self._stop.wait(self.gc_interval):
+            try:
+                self.collect_garbage()
+            except Exception:
+                logger.exception("Error collecting expired jobs in %s", self.directory)
+
+    def _run(self, job: Job):
+        with self._lock:
+            self._pending.pop(job.id, None)
+        job.status, job.started_at = RUNNING, time.time()
+        self._save(job)
+        saved = {'progress': job.progress, 'at': time.monotonic()}
+
+        def on_progress(fraction: float):
+            job.progress = max(job.progress, fraction)
+            # Persisted, throttled, so processes polling the spool see it move
+            now = time.monotonic()
+            if (job.progress - saved['progress'] >= PROGRESS_SAVE_STEP
+                    or now - saved['at'] >= PROGRESS_SAVE_INTERVAL_SECONDS):
+                saved['progress'], saved['at'] = job.progress, now
+                self._save(job)
+
+        path = self.result_path(job)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        try:
+            # The engine writes the spool file itself; the result cache is left alone
+            with stage("job_spool"):
+                job.rows = self.query_service.export_query_on_dataset(
+                    job.query, job.organization, job.dataset, temporary, job.format, job.compression, on_progress)
+            os.replace(temporary, path)
+            job.bytes, job.progress, job.status = os.path.getsize(path), 1.0, SUCCEEDED
+        except Exception as e:
+            logger.error(f"Job {job.id} on {job.organization}/{job.dataset} failed: {str(e)}")
+            job.status, job.error = FAILED, str(e)
+            if os.path.exists(temporary):
+                os.remove(temporary)
+        job.finished_at = time.time()
+        job.expires_at = job.finished_at + self.ttl_seconds
+        self._save(job)
+        logger.info("Job %s %s in %.1fs", job.id, job.status, job.finished_at - job.started_at)
+
+    def _record_path(self, job_id: str) -> str:
+        return os.path.join(self.directory, f"{job_id}.json")
+
+    def _save(self, job: Job):
+        # Written whole and renamed, so readers never see a partial record
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._record_path(job.id)
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, 'w') as f:
+            json.dump(job.to_dict(), f)
+        os.replace(temporary, path)
@@ -0,0 +1,49 @@
+import time
+from starlette.routing import Match
+from utils.metrics import REQUEST_LATENCY, RESPONSE_BYTES
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsMiddleware:
+    """
+    Record latency per route template (``/query/{organization}/{dataset}``, not
+    the raw path, to keep label cardinality bounded) and bytes sent on the wire.
+    Add it last so it wraps compression and sees the compressed size.
+    """
+
+    def __init__(self, app, routes_app=None):
+        self.app = app
+        self.routes_app = routes_app
+
+    def _route_label(self, scope) -> str:
+        routes = getattr(self.routes_app, "routes", [])
+        for route in routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(route, "path", scope["path"])
+        return "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = self._route_label(scope)
+        status = {"code": 500}
+        sent = {"bytes": 0}
+        start = time.perf_counter()
+
+        async def send_with_metrics(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            elif message["type"] == "http.response.body":
+                sent["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            REQUEST_LATENCY.observe(time.perf_counter() - start, method=method, route=route, status=status["code"])
+            RESPONSE_BYTES.inc(sent["bytes"], method=method, route=route)
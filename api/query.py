@@ -1,13 +1,46 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
+
+class JoinModel(BaseModel):
+    dataset: str = Field(..., description="Dataset to join, as organization/dataset")
+    on: List[str] = Field(..., description="Join keys declared in both datasets' dataset.yaml")
+    how: str = Field("inner", description="inner, left, right or full")
+    alias: Optional[str] = Field(None, description="Name to qualify its columns with; defaults to its table name")
+
+class SeriesOperator(BaseModel):
+    op: str = Field(..., description="rolling, lag, lead, delta or pct_change")
+    column: str = Field(..., description="Column the operator is applied to")
+    window: int = Field(1, description="Rows in a rolling window, or periods shifted by lag, lead, delta and pct_change")
+    function: Optional[str] = Field(None, description="Rolling aggregate: avg (default), sum, min, max, count, median or stddev")
+    min_periods: Optional[int] = Field(None, description="Non-null values a rolling window needs; defaults to window")
+    alias: Optional[str] = Field(None, description="Name of the result column, e.g. unemployment_rate_rolling_avg_12 by default")
+
+class ResampleModel(BaseModel):
+    every: str = Field(..., description="minute, hour, day, week, month, quarter or year")
+    aggregate: str = Field("avg", description="Aggregate of the values in each period")
+    columns: List[str] = Field(default_factory=list, description="Columns to aggregate; defaults to the selected value columns")
+    fill: Optional[str] = Field(None, description="Fill empty periods: null, zero, forward, backward or linear")
+
+class DownsampleModel(BaseModel):
+    x: str = Field(..., description="Column of the x axis; rows are ordered by it")
+    y: str = Field(..., description="Numeric column whose shape is preserved")
+    max_points: int = Field(..., description="Most rows returned, e.g. the chart width in pixels")
+    method: str = Field("lttb", description="lttb (Largest-Triangle-Three-Buckets) or minmax (min and max per bucket)")
 
 class QueryModel(BaseModel):
     description: Optional[str] = Field(None, description="Description of the query")
     select: List[str] = Field(default_factory=list)
     where: Optional[str] = None
+    group_by: Optional[List[str]] = Field(default_factory=list)
     order_by: Optional[List[str]] = Field(default_factory=list)
     limit: Optional[int] = None
     table: Optional[str] = None
+    join: List[JoinModel] = Field(default_factory=list)
+    time_column: Optional[str] = Field(None, description="Column ordering the series operators and resampling")
+    partition_by: List[str] = Field(default_factory=list, description="Columns splitting the data into separate series")
+    series: List[SeriesOperator] = Field(default_factory=list)
+    resample: Optional[ResampleModel] = None
+    downsample: Optional[DownsampleModel] = Field(None, description="Reduce the result to the points a chart needs")
 
 class QueryBuilder:
     def __init__(self):
@@ -25,6 +58,10 @@ class QueryBuilder:
         self.query_model.where = condition
         return self
 
+    def group_by(self, *fields: str) -> 'QueryBuilder':
+        self.query_model.group_by.extend(fields)
+        return self
+
     def order_by(self, *fields: str) -> 'QueryBuilder':
         self.query_model.order_by.extend(fields)
         return self
@@ -33,5 +70,41 @@ class QueryBuilder:
         self.query_model.limit = limit
         return self
 
+    def join(self, dataset: str, *on: str, how: str = "inner", alias: Optional[str] = None) -> 'QueryBuilder':
+        self.query_model.join.append(JoinModel(dataset=dataset, on=list(on), how=how, alias=alias))
+        return self
+
+    def series(self, time_column: str, *operators: Dict[str, Any], partition_by: List[str] = ()) -> 'QueryBuilder':
+        self.query_model.time_column = time_column
+        self.query_model.partition_by = list(partition_by)
+        self.query_model.series.extend(SeriesOperator(**operator) for operator in operators)
+        return self
+
+    def resample(self, every: str, aggregate: str = "avg", fill: Optional[str] = None, columns: List[str] = ()) -> 'QueryBuilder':
+        self.query_model.resample = ResampleModel(every=every, aggregate=aggregate, fill=fill, columns=list(columns))
+        return self
+
+    def downsample(self, x: str, y: str, max_points: int, method: str = "lttb") -> 'QueryBuilder':
+        self.query_model.downsample = DownsampleModel(x=x, y=y, max_points=max_points, method=method)
+        return self
+
     def build(self) -> QueryModel:
-        return self.query_model
\ No newline at end of file
+        return self.query_model
+
+class BatchQueryItem(BaseModel):
+    id: str = Field(..., description="Client-chosen key for this query's result")
+    organization: str
+    dataset: str
+    query: QueryModel
+
+
+class BatchQueryRequest(BaseModel):
+    queries: List[BatchQueryItem] = Field(default_factory=list)
+
+
+class JobRequest(BaseModel):
+    organization: str
+    dataset: str
+    query: QueryModel
+    format: str = Field('parquet', description="Format the result is spooled in: parquet, csv or arrow")
+    compression: Optional[str] = Field(None, description="Compression of the result; the format's default if unset")
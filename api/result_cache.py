@@ -0,0 +1,103 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+import pyarrow as pa
+
+ResultKey = Tuple[str, str, str]
+DatasetKey = Tuple[str, str]
+
+
+class QueryResultCache:
+    """
+    LRU cache of query results (Arrow tables), bounded by entry count and bytes.
+
+    Entries are not validated on lookup: the cache is only correct while it
+    is subscribed to dataset events, and ``invalidate_dataset`` drops exactly the
+    results that read the dataset that changed (a join reads several).
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[ResultKey, pa.Table]' = OrderedDict()
+        self._by_dataset: Dict[DatasetKey, Set[ResultKey]] = {}
+        self._dependencies: Dict[ResultKey, List[DatasetKey]] = {}
+        # Bumped on every invalidation, so a query that was running while its
+        # dataset changed does not store its (stale) result
+        self._generations: Dict[DatasetKey, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(organization: str, dataset: str, query_model: Dict[str, Any]) -> ResultKey:
+        # `description` is free text for the caller and does not change the result
+        query = {k: v for k, v in query_model.items() if k != 'description'}
+        return organization, dataset, json.dumps(query, sort_keys=True, default=str)
+
+    def get(self, key: ResultKey) -> Optional[pa.Table]:
+        with self._lock:
+            table = self._entries.get(key)
+            if table is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return table
+
+    def generation(self, datasets: List[DatasetKey]) -> Tuple[int, ...]:
+        return tuple(self._generations.get(dataset, 0) for dataset in datasets)
+
+    def put(self, key: ResultKey, table: pa.Table, generation: Optional[Tuple[int, ...]] = None,
+            datasets: Optional[List[DatasetKey]] = None):
+        """Store a result that read ``datasets`` (by default the key's own dataset)."""
+        datasets = list(datasets or [key[:2]])
+        size = table.nbytes
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation(datasets):
+                return
+            self._pop(key)
+            self._entries[key] = table
+            self._dependencies[key] = datasets
+            for dataset in datasets:
+                self._by_dataset.setdefault(dataset, set()).add(key)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+
+    def invalidate_dataset(self, organization: str, dataset: str) -> int:
+        """Drop every result of one dataset; returns how many were dropped."""
+        with self._lock:
+            self._generations[(organization, dataset)] = self._generations.get((organization, dataset), 0) + 1
+            keys = self._by_dataset.pop((organization, dataset), set())
+            for key in keys:
+                self._pop(key)
+            return len(keys)
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_dataset.clear()
+            self._dependencies.clear()
+            self._bytes = 0
+            for dataset in self._generations:
+                self._generations[dataset] += 1
+
+    def _pop(self, key: ResultKey):
+        table = self._entries.pop(key, None)
+        if table is None:
+            return
+        self._bytes -= table.nbytes
+        for dataset in self._dependencies.pop(key, []):
+            keys = self._by_dataset.get(dataset)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_dataset[dataset]
+
+    def info(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries), "bytes": self._bytes}
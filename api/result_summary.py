@@ -0,0 +1,141 @@
+from typing import Any, Dict, List, Optional
+import duckdb
+import pyarrow as pa
+from data_binding.result_set import ResultSet
+from utils.serialization import encode_json, to_json_compatible
+from utils.metrics import stage
+
+# Encoded size a summary is kept under, whatever the row count
+DEFAULT_MAX_BYTES = 8192
+DEFAULT_SAMPLE_ROWS = 20
+DEFAULT_TOP_K = 5
+QUANTILES = (0.25, 0.5, 0.75)
+# Longer text values are cut in samples and top-k lists
+MAX_VALUE_CHARS = 80
+
+SECONDS_PER_DAY = 86400
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _is_numeric(column_type: pa.DataType) -> bool:
+    return pa.types.is_integer(column_type) or pa.types.is_floating(column_type) or pa.types.is_decimal(column_type)
+
+
+def _is_dimension(column_type: pa.DataType) -> bool:
+    return (pa.types.is_string(column_type) or pa.types.is_large_string(column_type)
+            or pa.types.is_boolean(column_type) or pa.types.is_dictionary(column_type))
+
+
+def _cut(value: Any) -> Any:
+    if isinstance(value, str) and len(value) > MAX_VALUE_CHARS:
+        return value[:MAX_VALUE_CHARS - 1] + '…'
+    return value
+
+
+def _fetch(conn, sql: str) -> List[Dict[str, Any]]:
+    result = conn.execute(sql)
+    return to_json_compatible(result.to_arrow_table()).to_pylist()
+
+
+def _column_stats(conn, schema: pa.Schema) -> List[Dict[str, Any]]:
+    """Count, nulls and min/max of every column, plus mean and quantiles of numeric ones, in one scan."""
+    expressions = []
+    for index, field in enumerate(schema):
+        column = _quote(field.name)
+        expressions.append(f"count({column}) AS c{index}_count")
+        if _is_numeric(field.type) or pa.types.is_temporal(field.type):
+            expressions += [f"min({column}) AS c{index}_min", f"max({column}) AS c{index}_max"]
+        if _is_numeric(field.type):
+            quantiles = ', '.join(str(q) for q in QUANTILES)
+            expressions += [f"avg({column})::DOUBLE AS c{index}_mean",
+                            f"quantile_cont({column}::DOUBLE, [{quantiles}]) AS c{index}_quantiles"]
+        elif _is_dimension(field.type):
+            expressions.append(f"count(DISTINCT {column}) AS c{index}_distinct")
+    row, = _fetch(conn, f"SELECT count(*) AS rows, {', '.join(expressions)} FROM result")
+
+    columns = []
+    for index, field in enumerate(schema):
+        described = {'name': field.name, 'type': str(field.type), 'nulls': row['rows'] - row[f'c{index}_count']}
+        for key in ('min', 'max', 'mean', 'distinct'):
+            if f'c{index}_{key}' in row:
+                described[key] = row[f'c{index}_{key}']
+        if row.get(f'c{index}_quantiles') is not None:
+            described['quantiles'] = {f"p{int(q * 100)}": value
+                                      for q, value in zip(QUANTILES, row[f'c{index}_quantiles'])}
+        columns.append(described)
+    return columns
+
+
+def _top_values(conn, name: str, top_k: int) -> List[Dict[str, Any]]:
+    column = _quote(name)
+    rows = _fetch(conn, f"SELECT {column} AS value, count(*) AS rows FROM result "
+                        f"GROUP BY 1 ORDER BY 2 DESC, 1 LIMIT {int(top_k)}")
+    return [{'value': _cut(row['value']), 'rows': row['rows']} for row in rows]
+
+
+def _trends(conn, time_column: str, measures: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Least-squares slope of each measure against the time column, per day, and its r²."""
+    axis = f"epoch({_quote(time_column)}) / {SECONDS_PER_DAY}"
+    expressions = []
+    for index, measure in enumerate(measures):
+        value = f"{_quote(measure)}::DOUBLE"
+        expressions += [f"regr_slope({value}, {axis}) AS m{index}_slope", f"regr_r2({value}, {axis}) AS m{index}_r2"]
+    row, = _fetch(conn, f"SELECT {', '.join(expressions)} FROM result")
+    return {measure: {'slope_per_day': row[f'm{index}_slope'], 'r2': row[f'm{index}_r2']}
+            for index, measure in enumerate(measures) if row[f'm{index}_slope'] is not None}
+
+
+def _sample(result: ResultSet, rows: int) -> List[Dict[str, Any]]:
+    return [{name: _cut(value) for name, value in record.items()} for record in result.head(rows).to_records()]
+
+
+def summarize_result(result: ResultSet, max_bytes: int = DEFAULT_MAX_BYTES, sample_rows: int = DEFAULT_SAMPLE_ROWS,
+                     top_k: int = DEFAULT_TOP_K, time_column: Optional[str] = None) -> Dict[str, Any]:
+    """
+    A summary of a query result whose size does not grow with its rows.
+
+    DuckDB computes it over the result's Arrow table, without copying it:
+    the row count, per-column nulls, min/max, mean and quartiles of numeric
+    columns, distinct counts and the ``top_k`` most frequent values of text
+    columns, and the trend of each numeric column over ``time_column`` (the
+    first date or timestamp column by default). Then the first
+    ``sample_rows`` rows are added, halved until the encoded summary fits in
+    ``max_bytes``; if the column statistics alone do not fit, trailing
+    columns are left out and counted in ``columns_omitted``.
+    """
+    schema = result.schema
+    with stage("result_summary"):
+        conn = duckdb.connect()
+        try:
+            conn.register('result', result.to_arrow())
+            columns = _column_stats(conn, schema)
+            for described, field in zip(columns, schema):
+                if _is_dimension(field.type):
+                    described['top'] = _top_values(conn, field.name, top_k)
+            if time_column is None:
+                time_column = next((field.name for field in schema
+                                    if pa.types.is_date(field.type) or pa.types.is_timestamp(field.type)), None)
+            measures = [field.name for field in schema if _is_numeric(field.type) and field.name != time_column]
+            trends = _trends(conn, time_column, measures) if time_column and measures and result.num_rows > 1 else {}
+        finally:
+            conn.close()
+
+        summary = {'rows': result.num_rows, 'columns': columns}
+        if trends:
+            summary['trend'] = {'time_column': time_column, 'measures': trends}
+        rows = min(sample_rows, result.num_rows)
+        summary['sample'] = _sample(result, rows)
+        while rows and len(encode_json(summary)) > max_bytes:
+            rows //= 2
+            summary['sample'] = _sample(result, rows)
+        while len(summary['columns']) > 1 and len(encode_json(summary)) > max_bytes:
+            summary['columns'] = summary['columns'][:-1]
+            summary['columns_omitted'] = len(columns) - len(summary['columns'])
+            if trends:
+                kept = {described['name'] for described in summary['columns']}
+                trends = {name: trend for name, trend in trends.items() if name in kept}
+                summary['trend']['measures'] = trends
+    return summary
@@ -0,0 +1,14 @@
+import time
+from typing import Any, Dict
+import pyarrow as pa
+from utils.serialization import encode_json, table_to_records
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+def encode_profiled_table(table: pa.Table, profile: Dict[str, Any]) -> bytes:
+    """Encode ``{"data": rows, "profile": profile}``, adding the serialization time to the profile."""
+    start = time.perf_counter()
+    records = table_to_records(table)
+    profile.setdefault('stages_ms', {})['serialization'] = round((time.perf_counter() - start) * 1000, 3)
+    return encode_json({"data": records, "profile": profile})
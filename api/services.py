@@ -1,47 +1,135 @@
-from data_binding.database_engine import ConcreteConnectionManager
-from typing import List, Dict, Any
-import logging
-from utils.config_loader import load_config, load_dataset_definition
+from data_binding.database_engine import ConnectionManager, ConcreteConnectionManager
+from data_binding.timeseries import has_series
+from data_binding.connection_factory import normalize_connection_config, default_backend
+from typing import Callable, List, Dict, Any, Optional, Tuple
 import os
+import logging
+from utils.config_loader import load_config, load_dataset_definition, load_yaml, get_datacard_yaml_path
+import time
 import yaml
-import json
-from datetime import datetime, date
+import pyarrow as pa
+from api.query import BatchQueryItem
+from utils.serialization import table_to_records
+from data_binding.result_set import ResultSet
+from api.result_cache import QueryResultCache
+from api.downsample import apply_downsample
+from data_binding.export import export_format, write_table
+from api.datacard_index import DatacardIndex, DatacardBinding
+from data_binding.events import DatasetEvent
 
 logger = logging.getLogger(__name__)
 
+# Rows a datacard chart receives by default, about its width in pixels
+DEFAULT_MAX_POINTS = 1000
+MAX_POINTS_LIMIT = 10000
+
 class QueryService:
-    def __init__(self):
+    def __init__(self, connection_manager: Optional[ConnectionManager] = None,
+                 result_cache: Optional[QueryResultCache] = None):
+        # When no shared connection manager is injected, one is created per
+        # dataset from its `database` section and kept for the process lifetime.
+        self.connection_manager = connection_manager
         self.connection_managers = {}
+        # Only set when dataset events are delivered to invalidate_dataset
+        self.result_cache = result_cache
+
+    def invalidate_dataset(self, organization: str, dataset: str):
+        """Drop the cached results and table binding of one dataset."""
+        if self.result_cache is not None:
+            dropped = self.result_cache.invalidate_dataset(organization, dataset)
+            logger.debug("Dropped %d cached results of %s/%s", dropped, organization, dataset)
+        connection_manager = self.connection_manager or self.connection_managers.get(f"{organization}/{dataset}")
+        if connection_manager is not None:
+            connection_manager.invalidate_dataset(organization, dataset)
+
+    def on_dataset_event(self, event: DatasetEvent):
+        self.invalidate_dataset(event.organization, event.dataset)
 
-    def execute_query_on_dataset(self, query_model: Dict[str, Any], organization: str, dataset: str):
-        logger.debug(f"Executing query on {organization}/{dataset}: {query_model}")
+    def execute_query_on_dataset(self, query_model: Dict[str, Any], organization: str, dataset: str) -> ResultSet:
+        """The query's result as columns, read row by row only where rows are needed."""
+        return ResultSet(self.execute_query_on_dataset_arrow(query_model, organization, dataset))
+
+    def execute_query(self, query_model) -> ResultSet:
+        """Run a query model naming its own ``table`` on the injected connection manager."""
+        if self.connection_manager is None:
+            raise ValueError("execute_query needs a connection manager; use execute_query_on_dataset")
+        result = self.connection_manager.execute_query(self._to_dict(query_model))
+        return result if isinstance(result, ResultSet) else ResultSet.from_records(result)
+
+    def execute_query_on_dataset_arrow(self, query_model: Dict[str, Any], organization: str, dataset: str,
+                                       cache: bool = True, compiled: Optional[str] = None,
+                                       on_progress: Optional[Callable[[float], None]] = None) -> pa.Table:
+        """
+        Columnar variant of execute_query_on_dataset, for callers that encode the
+        result themselves. ``cache=False`` reads the published data even if the
+        dataset event announcing it has not been delivered yet. ``compiled`` is
+        the query's SQL for the dataset's table, built once by its caller; SQL
+        backends run it as is. ``on_progress`` is called with the fraction of
+        the query done while it runs, on backends that report it.
+        """
+        logger.debug("Executing columnar query on %s/%s: %s", organization, dataset, query_model)
         try:
-            # Load the dataset definition
-            dataset_config = load_dataset_definition(organization, dataset)
-            
-            # Extract database configuration
-            database_config = dataset_config.get('database', {})
-            db_type = database_config.get('type')
-            
-            if not db_type:
-                raise ValueError(f"Database type not specified in dataset configuration for {organization}/{dataset}")
-            
-            # Create or get a connection manager using the dataset config
-            connection_key = f"{organization}/{dataset}"
-            if connection_key not in self.connection_managers:
-                self.connection_managers[connection_key] = ConcreteConnectionManager(database_config)
-            
-            connection_manager = self.connection_managers[connection_key]
-            
-            # Ensure query_model is a dictionary
-            if not isinstance(query_model, dict):
-                query_model = query_model.dict()
-            
-            # Execute the query
-            result = connection_manager.execute_query_on_dataset(organization, dataset, query_model)
-            
-            # Ensure the result is JSON serializable
-            return json.loads(json.dumps(result, default=self._json_serial))
+            query = self._to_dict(query_model)
+            use_cache = cache and self.result_cache is not None
+            key = QueryResultCache.key(organization, dataset, query) if use_cache else None
+            if key is not None:
+                cached = self.result_cache.get(key)
+                if cached is not None:
+                    return cached
+                datasets = self._datasets_read(organization, dataset, query)
+                generation = self.result_cache.generation(datasets)
+            connection_manager = self._connection_manager_for(organization, dataset, query)
+            if compiled and connection_manager.capabilities.sql:
+                table = connection_manager.execute_sql_on_dataset_arrow(organization, dataset, compiled)
+            elif on_progress is not None:
+                table = connection_manager.execute_query_with_progress(organization, dataset, query, on_progress)
+            else:
+                table = connection_manager.execute_query_on_dataset_arrow(organization, dataset, query)
+            table = apply_downsample(table, query.get('downsample'))
+            if key is not None:
+                self.result_cache.put(key, table, generation, datasets)
+            return table
+        except FileNotFoundError:
+            logger.error(f"Dataset configuration not found for {organization}/{dataset}")
+            raise
+        except Exception as e:
+            logger.error(f"Error executing query: {str(e)}")
+            raise
+
+    def export_query_on_dataset(self, query_model: Dict[str, Any], organization: str, dataset: str, path: str,
+                                format: str = 'parquet', compression: Optional[str] = None,
+                                on_progress: Optional[Callable[[float], None]] = None) -> int:
+        """
+        Write a query's result to ``path`` as Parquet, CSV or an Arrow stream;
+        returns the rows written. DuckDB writes the file itself, so the rows
+        never reach Python; a downsampled result is written from Arrow.
+        """
+        query = self._to_dict(query_model)
+        # Unknown formats and compressions fail before the query runs
+        export_format(format).compression(compression)
+        logger.debug("Exporting %s/%s as %s: %s", organization, dataset, format, query)
+        if query.get('downsample'):
+            # Called from worker threads: the query runs on a cursor of its own,
+            # through the progress-tracked path when progress is reported
+            table = self.execute_query_on_dataset_arrow(query, organization, dataset, cache=False,
+                                                        on_progress=on_progress)
+            return write_table(table, path, format, compression)
+        connection_manager = self._connection_manager_for(organization, dataset, query)
+        return connection_manager.export_query_on_dataset(organization, dataset, query, path, format,
+                                                          compression, on_progress)
+
+    def profile_query_on_dataset(self, query_model: Dict[str, Any], organization: str, dataset: str) -> Tuple[pa.Table, Dict[str, Any]]:
+        """Execute a query and return it with its SQL, engine profile and stage timings."""
+        logger.debug("Profiling query on %s/%s: %s", organization, dataset, query_model)
+        try:
+            query = self._to_dict(query_model)
+            connection_manager = self._connection_manager_for(organization, dataset, query)
+            table, profile = connection_manager.profile_query_on_dataset(organization, dataset, query)
+            if query.get('downsample'):
+                start = time.perf_counter()
+                table = apply_downsample(table, query['downsample'])
+                profile.setdefault('stages_ms', {})['downsample'] = round((time.perf_counter() - start) * 1000, 3)
+            return table, profile
         except FileNotFoundError:
             logger.error(f"Dataset configuration not found for {organization}/{dataset}")
             raise
@@ -49,37 +137,120 @@ class QueryService:
             logger.error(f"Error executing query: {str(e)}")
             raise
 
-    def _json_serial(self, obj):
-        """JSON serializer for objects not serializable by default json code"""
-        if isinstance(obj, (datetime, date)):
-            return obj.isoformat()
-        raise TypeError(f"Type {type(obj)} not serializable")
+    def execute_batch(self, items: List[BatchQueryItem]) -> Dict[str, Dict[str, Any]]:
+        """
+        Execute many queries, grouped so each dataset is bound once and its
+        queries run together on one connection manager.
+
+        Returns a mapping of item id to ``{"data": rows}`` or ``{"error": message}``;
+        a failing item never fails the rest of the batch.
+        """
+        groups: Dict[tuple, List[BatchQueryItem]] = {}
+        for item in items:
+            groups.setdefault((item.organization, item.dataset), []).append(item)
+
+        results: Dict[str, Dict[str, Any]] = {}
+        for (organization, dataset), group in groups.items():
+            logger.debug("Executing %d batched queries on %s/%s", len(group), organization, dataset)
+            queries = [self._to_dict(item.query) for item in group]
+            try:
+                joined = next((query for query in queries if query.get('join')), {})
+                connection_manager = self._connection_manager_for(organization, dataset, joined)
+                tables = connection_manager.execute_queries_on_dataset_arrow(organization, dataset, queries)
+            except Exception as e:
+                logger.error(f"Error executing batch on {organization}/{dataset}: {str(e)}")
+                tables = [e] * len(group)
+
+            for item, query, table in zip(group, queries, tables):
+                if not isinstance(table, Exception):
+                    try:
+                        table = apply_downsample(table, query.get('downsample'))
+                    except ValueError as e:
+                        table = e
+                if isinstance(table, Exception):
+                    results[item.id] = {"error": str(table)}
+                else:
+                    results[item.id] = {"data": table_to_records(table)}
+        return results
+
+    def _to_dict(self, query_model) -> Dict[str, Any]:
+        # Ensure query_model is a dictionary
+        if not isinstance(query_model, dict):
+            return query_model.dict()
+        return dict(query_model)
+
+    def _connection_manager_for(self, organization: str, dataset: str, query: Dict[str, Any]) -> ConnectionManager:
+        connection_manager = self.connection_manager or self._get_dataset_connection_manager(organization, dataset)
+        if query.get('join') and not connection_manager.capabilities.joins:
+            raise ValueError(f"The backend of {organization}/{dataset} cannot join other datasets")
+        # Scan backends run time-series operators in their residual query
+        capabilities = connection_manager.capabilities
+        if has_series(query) and capabilities.sql and not capabilities.windows:
+            raise ValueError(f"The backend of {organization}/{dataset} cannot run series or resample operators")
+        return connection_manager
+
+    @staticmethod
+    def _datasets_read(organization: str, dataset: str, query: Dict[str, Any]) -> List[Tuple[str, str]]:
+        joined = [tuple(join['dataset'].split('/', 1)) for join in query.get('join') or []]
+        return [(organization, dataset)] + [key for key in joined if len(key) == 2]
+
+    def _get_dataset_connection_manager(self, organization: str, dataset: str) -> ConnectionManager:
+        connection_key = f"{organization}/{dataset}"
+        if connection_key not in self.connection_managers:
+            # Load the dataset definition
+            dataset_config = load_dataset_definition(organization, dataset)
+
+            # Extract database configuration; the backend defaults to `data_binding.driver`
+            database_config = normalize_connection_config(dataset_config.get('database', {}))
+            if not database_config.get('type'):
+                database_config['type'] = default_backend()
+
+            if not database_config['type']:
+                raise ValueError(f"Database type not specified in dataset configuration for {organization}/{dataset}")
+
+            self.connection_managers[connection_key] = ConcreteConnectionManager(database_config)
+        return self.connection_managers[connection_key]
 
 class DatacardService:
-    def __init__(self):
-        pass
+    def __init__(self, connection_manager: Optional[ConnectionManager] = None,
+                 index: Optional[DatacardIndex] = None):
+        self.connection_manager = connection_manager
+        self.index = index or DatacardIndex()
+
+    def binding(self, organization: str, definition: str) -> DatacardBinding:
+        """The datacard bound to its dataset, with its query compiled for the dataset's table."""
+        return self.index.resolve(organization, definition)
+
+    def chart_query(self, organization: str, definition: str, max_points: Optional[int] = None) -> Dict[str, Any]:
+        """
+        The datacard's query, downsampled on its ``xAxis``/``yAxis`` to at most
+        ``max_points`` rows: the request's value, else the datacard's
+        ``max_points``, else ``datacards.max_points`` from the config, capped
+        at ``datacards.max_points_limit``.
+        """
+        binding = self.binding(organization, definition)
+        datacard, query = binding.datacard, dict(binding.query)
+        settings = load_config().get('datacards', {})
+        max_points = max_points or datacard.get('max_points') or settings.get('max_points', DEFAULT_MAX_POINTS)
+        max_points = min(int(max_points), settings.get('max_points_limit', MAX_POINTS_LIMIT))
+        if datacard.get('xAxis') and datacard.get('yAxis') and max_points > 0:
+            query['downsample'] = {'x': datacard['xAxis'], 'y': datacard['yAxis'], 'max_points': max_points,
+                                   'method': datacard.get('downsample') or 'lttb'}
+        return query
 
     def get_datacard(self, organization: str, definition: str) -> Dict[str, Any]:
-        logger.debug(f"Attempting to get datacard for {organization}/{definition}")
+        """The datacard definition as written; its binding is ``binding``, and may fail when this does not."""
+        logger.debug("Attempting to get datacard for %s/%s", organization, definition)
         try:
-            # Construct the path to the YAML file
-            file_path = os.path.join('datacards', organization, f"{definition}.yml")
-            logger.debug(f"Looking for datacard file at: {file_path}")
-
-            # Check if the file exists
+            file_path = get_datacard_yaml_path(organization, definition)
             if not os.path.exists(file_path):
                 logger.error(f"Datacard file not found: {file_path}")
                 raise FileNotFoundError(f"Datacard file not found: {file_path}")
-
-            # Read and parse the YAML file
-            with open(file_path, 'r') as file:
-                datacard_definition = yaml.safe_load(file)
-            
-            logger.debug(f"Successfully loaded datacard: {datacard_definition}")
-            return datacard_definition
+            # Cached until the file changes
+            return load_yaml(file_path)
         except yaml.YAMLError as e:
             logger.error(f"Error parsing YAML file: {str(e)}")
             raise ValueError(f"Error parsing YAML file: {str(e)}")
         except Exception as e:
             logger.error(f"Unexpected error in get_datacard: {str(e)}")
-            raise
\ No newline at end of file
+            raise
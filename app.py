@@ -5,42 +5,161 @@ import os
 project_root = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, project_root)
 
-import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends, HTTPException, Request, Form
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, Response, PlainTextResponse, FileResponse
 from fastapi.templating import Jinja2Templates
-from api.query import QueryModel
+from starlette.background import BackgroundTask
+from api.query import QueryModel, BatchQueryRequest, JobRequest
 from api.services import QueryService, DatacardService
+from api.result_cache import QueryResultCache
+from api.datacard_snapshots import DatacardSnapshotStore
+from api.datacard_index import DatacardIndex
+from api.jobs import JobManager, SUCCEEDED
+from data_binding.export import export_format
+from api.serialization import encode_profiled_table, JSON_MEDIA_TYPE
+from utils.serialization import encode_table, encode_json
+from api.compression import CompressionMiddleware
+from api.metrics import MetricsMiddleware, PROMETHEUS_MEDIA_TYPE
+from utils.metrics import registry
+from api.http_cache import HashedStaticFiles, load_text, file_etag, is_not_modified, REVALIDATE_CACHE_CONTROL
 from data_binding.database_engine import ConnectionManager, ConcreteConnectionManager
-from utils.config_loader import load_config, load_dataset_definition
+from data_binding.connection_factory import normalize_connection_config
+from utils.config_loader import load_config, load_dataset_definition, get_datacard_yaml_path, metadata_cache
+from data_binding.events import bus, EventLogWatcher, DatasetEvent
 import logging
 import traceback
-from services.chat_service import ChatService
-from services.search_service import SearchService
+import argparse
+import tempfile
+from functools import lru_cache
+from typing import Callable, Optional
 import json
 
-logging.basicConfig(level=logging.DEBUG)
+logging.basicConfig(level=os.getenv("DATAFLARE_LOG_LEVEL", "INFO").upper())
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
-app.mount("/static", StaticFiles(directory="static"), name="static")
+DEFAULT_EXPORT_DIR = os.path.join('.cache', 'exports')
+RENDER_TEMPLATE_PATH = os.path.join(project_root, "render", "datacard", "render.html")
+SNAPSHOT_PLACEHOLDER = '<script id="datacard-snapshot" type="application/json"></script>'
+
+# Services are built on first use rather than at import time: the chat stack
+# pulls in the LLM SDK, which dominates cold start and is only needed by /api/chat.
+@lru_cache(maxsize=None)
+def get_shared_query_service() -> QueryService:
+    return QueryService()
+
+@lru_cache(maxsize=None)
+def get_datacard_index() -> DatacardIndex:
+    return DatacardIndex()
+
+@lru_cache(maxsize=None)
+def get_snapshot_store() -> DatacardSnapshotStore:
+    return DatacardSnapshotStore(DatacardService(index=get_datacard_index()), get_shared_query_service())
+
+@lru_cache(maxsize=None)
+def get_job_manager() -> JobManager:
+    return JobManager(get_shared_query_service())
+
+@lru_cache(maxsize=None)
+def get_search_service():
+    from services.search_service import SearchService
+    return SearchService()
+
+_chat_service = None
+
+def get_chat_service():
+    """The chat service, or None when it cannot be built (e.g. missing LLM SDK or key)."""
+    global _chat_service
+    if _chat_service is None:
+        try:
+            from services.chat_service import ChatService
+            _chat_service = ChatService()
+        except Exception as e:
+            # Not cached, so a fixed environment is picked up on the next request
+            logger.error(f"Chat service unavailable: {str(e)}")
+            return None
+    return _chat_service
+
+def invalidate_catalog(event: DatasetEvent):
+    # Definitions and search metadata of the dataset are re-read on next use
+    metadata_cache.invalidate_directory(os.path.join('datasets', event.organization, event.dataset))
+
+def start_invalidation(query_service: QueryService,
+                       snapshots: Optional[DatacardSnapshotStore] = None) -> Callable[[], None]:
+    """
+    Follow the dataset event log written by workflows, and give the query
+    service a result cache that those events keep fresh. Datacard snapshots
+    of a changed dataset are rebuilt after its cached results are dropped.
+    Returns a function that stops it.
+    """
+    config = load_config().get('invalidation', {})
+    cache_config = config.get('result_cache', {})
+    if cache_config.get('max_entries', 256) > 0:
+        query_service.result_cache = QueryResultCache(
+            max_entries=cache_config.get('max_entries', 256),
+            max_bytes=int(cache_config.get('max_mb', 64) * 1024 * 1024),
+        )
+        registry.register_cache('query_results', query_service.result_cache.info)
+    watcher = EventLogWatcher(bus, config.get('event_log'), config.get('poll_interval_seconds', 0.5))
+    unsubscribes = [bus.subscribe(query_service.on_dataset_event), bus.subscribe(invalidate_catalog)]
+    if snapshots is not None:
+        registry.register_cache('datacard_snapshots', snapshots.info)
+        unsubscribes.append(bus.subscribe(snapshots.on_dataset_event))
+    watcher.start()
+
+    def stop():
+        watcher.stop()
+        for unsubscribe in unsubscribes:
+            unsubscribe()
+        query_service.result_cache = None
+    return stop
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm the cheap services before the first request; chat stays lazy
+    query_service = get_shared_query_service()
+    get_search_service()
+    # Bind every datacard to its dataset now, so broken ones are reported at startup
+    get_datacard_index().build()
+    stop_invalidation = start_invalidation(query_service, get_snapshot_store())
+    jobs = get_job_manager()
+    jobs.start()
+    yield
+    jobs.stop()
+    stop_invalidation()
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware, routes_app=app)
+static_files = HashedStaticFiles(directory="static")
+app.mount("/static", static_files, name="static")
 
 templates = Jinja2Templates(directory="templates")
+templates.env.globals["static_url"] = static_files.url_for
 
 # Dependency Injection
-def get_connection_manager():
+def get_connection_manager() -> Optional[ConnectionManager]:
+    # Datasets normally bind through their own `database` section; a shared
+    # connection manager is only used when the global config pins one.
     config = load_config()
-    connection_config = config.get('connection', {})
+    connection_config = normalize_connection_config(config.get('connection', {}))
+    if not connection_config.get('type'):
+        return None
     return ConcreteConnectionManager(connection_config)
 
-def get_query_service(connection_manager: ConnectionManager = Depends(get_connection_manager)):
+def get_query_service(connection_manager: Optional[ConnectionManager] = Depends(get_connection_manager)):
+    if connection_manager is None:
+        return get_shared_query_service()
     return QueryService(connection_manager)
 
 def get_datacard_service(connection_manager: ConnectionManager = Depends(get_connection_manager)):
-    return DatacardService(connection_manager)
+    return DatacardService(connection_manager, get_datacard_index())
 
 # Routes
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(content=registry.render(), media_type=PROMETHEUS_MEDIA_TYPE)
+
 @app.get("/", response_class=RedirectResponse)
 async def read_root():
     return RedirectResponse(url="/chat")
@@ -52,9 +171,7 @@ async def chat_page(request: Request):
 @app.get("/render", response_class=HTMLResponse)
 async def render():
     try:
-        with open("render/datacard/render.html", "r") as f:
-            content = f.read()
-        return HTMLResponse(content=content)
+        return HTMLResponse(content=load_text(RENDER_TEMPLATE_PATH))
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Render file not found")
 
@@ -63,21 +180,28 @@ async def query(
     organization: str,
     dataset: str,
     query_model: QueryModel,
+    profile: bool = False,
     service: QueryService = Depends(get_query_service)
 ):
     try:
-        logger.debug(f"Received query for {organization}/{dataset}: {query_model}")
+        logger.debug("Received query for %s/%s: %s", organization, dataset, query_model)
 
         if not query_model.description:
             raise ValueError("Query description is required")
 
-        result = service.execute_query_on_dataset(query_model, organization, dataset)
+        if profile:
+            result, query_profile = service.profile_query_on_dataset(query_model, organization, dataset)
+        else:
+            result = service.execute_query_on_dataset_arrow(query_model, organization, dataset)
 
-        if not result:
+        if result.num_rows == 0:
             return JSONResponse(content={"message": "No data found for the given query"}, status_code=404)
 
-        logger.debug(f"Query result: {result}")
-        return JSONResponse(content=result)
+        logger.debug("Query returned %d rows", result.num_rows)
+        if profile:
+            return Response(content=encode_profiled_table(result, query_profile), media_type=JSON_MEDIA_TYPE)
+        # Encoded once here; a raw Response skips FastAPI's re-serialization
+        return Response(content=encode_table(result), media_type=JSON_MEDIA_TYPE)
     except ValueError as ve:
         logger.error(f"Invalid query: {str(ve)}")
         raise HTTPException(status_code=400, detail=str(ve))
@@ -85,41 +209,123 @@ async def query(
         logger.error(f"Error in query endpoint: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="An internal server error occurred")
 
+def inline_snapshot(html: str, snapshot_json: bytes) -> str:
+    # `</` would end the script element early
+    payload = snapshot_json.decode('utf-8').replace('</', '<\\/')
+    return html.replace(SNAPSHOT_PLACEHOLDER, f'{SNAPSHOT_PLACEHOLDER[:-9]}{payload}</script>', 1)
+
 @app.get("/datacard/{organization}/{definition}", response_class=HTMLResponse)
-async def render_datacard(organization: str, definition: str):
+async def render_datacard(organization: str, definition: str, request: Request):
     try:
-        with open("render/datacard/render.html", "r") as f:
-            content = f.read()
-        return HTMLResponse(content=content)
+        html = load_text(RENDER_TEMPLATE_PATH)
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Datacard not found")
+    try:
+        snapshot = get_snapshot_store().get(organization, definition)
+    except Exception as e:
+        # The page fetches the snapshot itself, and reports the error
+        logger.error(f"Datacard snapshot unavailable for {organization}/{definition}: {str(e)}")
+        return HTMLResponse(content=html)
+    # The page with the datacard's data inlined: one request, no query
+    etag = f'W/"{snapshot.version}-{file_etag(RENDER_TEMPLATE_PATH)[3:-1]}"'
+    headers = {"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL}
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    return HTMLResponse(content=inline_snapshot(html, snapshot.json()), headers=headers)
+
+@app.get("/api/datacard/{organization}/{definition}/snapshot")
+async def get_datacard_snapshot(organization: str, definition: str, request: Request):
+    """The datacard's definition and chart data in one pre-built, gzip-compressed document."""
+    try:
+        snapshot = get_snapshot_store().get(organization, definition)
+    except FileNotFoundError as e:
+        logger.error(f"Datacard snapshot not found: {str(e)}")
+        raise HTTPException(status_code=404, detail="Datacard or dataset not found")
+    except ValueError as ve:
+        logger.error(f"Invalid datacard query: {str(ve)}")
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        logger.error(f"Error building datacard snapshot: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="An internal server error occurred")
+    headers = {"ETag": snapshot.etag, "Cache-Control": REVALIDATE_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+    if is_not_modified(request, snapshot.etag):
+        return Response(status_code=304, headers=headers)
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        # Stored compressed; the compression middleware leaves encoded bodies alone
+        return Response(content=snapshot.body, media_type=JSON_MEDIA_TYPE,
+                        headers=dict(headers, **{"Content-Encoding": "gzip"}))
+    return Response(content=snapshot.json(), media_type=JSON_MEDIA_TYPE, headers=headers)
 
 @app.get("/api/datacard/{organization}/{definition}")
 async def get_datacard_definition(
     organization: str,
     definition: str,
+    request: Request,
     service: DatacardService = Depends(get_datacard_service)
 ):
     try:
-        logger.debug(f"Fetching datacard definition for {organization}/{definition}")
+        logger.debug("Fetching datacard definition for %s/%s", organization, definition)
+        # The ETag follows the YAML file, so edits invalidate client caches
+        etag = file_etag(get_datacard_yaml_path(organization, definition))
+        headers = {"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL}
+        if is_not_modified(request, etag):
+            return Response(status_code=304, headers=headers)
         result = service.get_datacard(organization, definition)
-        logger.debug(f"Successfully fetched datacard definition: {result}")
-        return JSONResponse(content=result)
+        return JSONResponse(content=result, headers=headers)
     except FileNotFoundError as e:
         logger.error(f"Datacard definition not found: {str(e)}")
         raise HTTPException(status_code=404, detail="Datacard definition not found")
+    except ValueError as ve:
+        logger.error(f"Invalid datacard: {str(ve)}")
+        raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
         logger.error(f"Error fetching datacard definition: {str(e)}")
         logger.error(traceback.format_exc())
         raise HTTPException(status_code=500, detail="An internal server error occurred")
 
-# Instantiate Services for Dependency Injection
-search_service = SearchService()
-chat_service = ChatService()
-query_service = QueryService()
+@app.get("/api/datacard/{organization}/{definition}/binding")
+async def get_datacard_binding(
+    organization: str,
+    definition: str,
+    service: DatacardService = Depends(get_datacard_service)
+):
+    """The dataset a datacard is bound to, and its query as compiled for it."""
+    try:
+        return JSONResponse(content=service.binding(organization, definition).to_dict())
+    except FileNotFoundError as e:
+        logger.error(f"Datacard definition not found: {str(e)}")
+        raise HTTPException(status_code=404, detail="Datacard definition not found")
+    except ValueError as ve:
+        logger.error(f"Unbound datacard: {str(ve)}")
+        raise HTTPException(status_code=400, detail=str(ve))
+
+@app.get("/api/datacard/{organization}/{definition}/data")
+async def get_datacard_data(
+    organization: str,
+    definition: str,
+    max_points: Optional[int] = None,
+    service: DatacardService = Depends(get_datacard_service),
+    query_service: QueryService = Depends(get_query_service)
+):
+    """The datacard's series, downsampled so the payload does not grow with the data."""
+    try:
+        query = service.chart_query(organization, definition, max_points)
+        binding = service.binding(organization, definition)
+        result = query_service.execute_query_on_dataset_arrow(query, *binding.dataset, compiled=binding.sql)
+        return Response(content=encode_table(result), media_type=JSON_MEDIA_TYPE)
+    except FileNotFoundError as e:
+        logger.error(f"Datacard data not found: {str(e)}")
+        raise HTTPException(status_code=404, detail="Datacard or dataset not found")
+    except ValueError as ve:
+        logger.error(f"Invalid datacard query: {str(ve)}")
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        logger.error(f"Error in datacard data endpoint: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="An internal server error occurred")
 
 @app.post("/api/chat")
 async def chat(request: Request):
+    chat_service = get_chat_service()
     if chat_service is None:
         error_message = "Chat service is not available. Please check the server logs for more information."
         return JSONResponse(content={"error": error_message}, status_code=503)
@@ -133,32 +339,34 @@ async def chat(request: Request):
         raise HTTPException(status_code=400, detail="Invalid chat history format")
 
     try:
-        logger.debug(f"Processing message: {message}")
-        logger.debug(f"Chat history: {chat_history}")
+        logger.debug("Processing message: %s", message)
+        logger.debug("Chat history: %s", chat_history)
         response = chat_service.process_message(message, chat_history)
-        logger.debug(f"Response generated: {response}")
+        logger.debug("Response generated: %s", response)
 
         return JSONResponse(content={
             "message": response['message'],
             "retrieved_information": response['retrieved_information'],
-            "suggested_query": response['suggested_query']
+            "suggested_query": response['suggested_query'],
+            "full_result": response.get('full_result')
         })
     except Exception as e:
         logger.error(f"Error processing chat message: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="An internal server error occurred")
 
 @app.get("/api/search_dataset")
-async def search_dataset(query: str):
+async def search_dataset(query: str, search_service=Depends(get_search_service)):
     results = search_service.search_datasets(query)
     return JSONResponse(content=results)
 
 @app.get("/api/search_datacard")
-async def search_datacard(query: str):
+async def search_datacard(query: str, search_service=Depends(get_search_service)):
     results = search_service.search_datacards(query)
     return JSONResponse(content=[d.to_dict() for d in results])
 
 @app.post("/api/query_dataset")
 async def query_dataset(request: Request):
+    query_service = get_shared_query_service()
     data = await request.json()
     query = data['query']
     dataset_full_name = data['dataset']
@@ -167,16 +375,142 @@ async def query_dataset(request: Request):
     if not organization:
         raise HTTPException(status_code=400, detail="Organization not provided in the dataset name")
     
+    profile = data.get('profile') or request.query_params.get('profile') == 'true'
     try:
         # Execute the query
-        results = query_service.execute_query_on_dataset(query, organization, dataset)
-        return JSONResponse(content=results)
+        if profile:
+            results, query_profile = query_service.profile_query_on_dataset(query, organization, dataset)
+            return Response(content=encode_profiled_table(results, query_profile), media_type=JSON_MEDIA_TYPE)
+        results = query_service.execute_query_on_dataset_arrow(query, organization, dataset)
+        return Response(content=encode_table(results), media_type=JSON_MEDIA_TYPE)
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"Dataset configuration for '{dataset_full_name}' not found")
     except Exception as e:
         logger.error(f"Error querying dataset: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error querying dataset: {str(e)}")
 
+@app.post("/api/query_batch")
+async def query_batch(batch: BatchQueryRequest, query_service: QueryService = Depends(get_query_service)):
+    ids = [item.id for item in batch.queries]
+    if len(ids) != len(set(ids)):
+        raise HTTPException(status_code=400, detail="Batch query ids must be unique")
+
+    results = query_service.execute_batch(batch.queries)
+    return Response(content=encode_json({"results": results}), media_type=JSON_MEDIA_TYPE)
+
+@app.post("/api/export/{organization}/{dataset}")
+def export_dataset(
+    organization: str,
+    dataset: str,
+    query_model: QueryModel,
+    format: str = "parquet",
+    compression: Optional[str] = None,
+    service: QueryService = Depends(get_query_service)
+):
+    """
+    The query's full result as a Parquet, CSV or Arrow stream file. DuckDB
+    writes the file with COPY and it is streamed from disk, so rows are never
+    built in Python. A sync route: the export runs on the threadpool, not the
+    event loop.
+    """
+    directory = load_config().get('export', {}).get('spool_dir', DEFAULT_EXPORT_DIR)
+    path = None
+    try:
+        spec = export_format(format)
+        os.makedirs(directory, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=directory, suffix=f".{spec.extension}")
+        os.close(fd)
+        rows = service.export_query_on_dataset(query_model, organization, dataset, path, spec.name, compression)
+    except FileNotFoundError:
+        remove_file(path)
+        raise HTTPException(status_code=404, detail=f"Dataset {organization}/{dataset} not found")
+    except ValueError as ve:
+        remove_file(path)
+        logger.error(f"Invalid export: {str(ve)}")
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        remove_file(path)
+        logger.error(f"Error exporting {organization}/{dataset}: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="An internal server error occurred")
+    # The file is deleted once it has been sent
+    return FileResponse(path, media_type=spec.content_type(compression), filename=spec.filename(dataset, compression),
+                        headers={"X-Row-Count": str(rows)}, background=BackgroundTask(remove_file, path))
+
+def remove_file(path: Optional[str]):
+    if path and os.path.exists(path):
+        os.remove(path)
+
+def job_status(job) -> dict:
+    status = job.to_dict()
+    if job.status == SUCCEEDED:
+        status['result_url'] = f"/api/jobs/{job.id}/result"
+    return status
+
+@app.post("/api/jobs", status_code=202)
+async def submit_job(request: JobRequest, jobs: JobManager = Depends(get_job_manager)):
+    """Run a query in the background; poll the returned job for its progress and result."""
+    try:
+        job = jobs.submit(request.query.dict(), request.organization, request.dataset, request.format,
+                          request.compression)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Dataset {request.organization}/{request.dataset} not found")
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    return JSONResponse(content=job_status(job), status_code=202, headers={"Location": f"/api/jobs/{job.id}"})
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str, jobs: JobManager = Depends(get_job_manager)):
+    try:
+        return JSONResponse(content=job_status(jobs.get(job_id)))
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+
+@app.get("/api/jobs/{job_id}/result")
+async def get_job_result(job_id: str, jobs: JobManager = Depends(get_job_manager)):
+    """The spooled result; supports Range requests, so large downloads can be resumed."""
+    try:
+        job = jobs.get(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    if not job.finished:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    if job.error:
+        raise HTTPException(status_code=409, detail=f"Job failed: {job.error}")
+    path = jobs.result_path(job)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Job result expired")
+    return FileResponse(path, media_type=job.media_type, filename=job.filename)
+
 # Server Control
+_server: Optional["uvicorn.Server"] = None
+
+def start_server(host: str = "0.0.0.0", port: int = 8000, workers: int = 1):
+    """
+    Serve the API, optionally with several worker processes.
+
+    Each worker keeps its own in-memory DuckDB connection but binds datasets as
+    views over the same published on-disk snapshot, so N workers share one copy
+    of the data through the OS page cache. New snapshots are picked up on the
+    next query (see data_binding/snapshot.py).
+    """
+    import uvicorn
+
+    global _server
+    if workers > 1:
+        # Multiple processes need an import string so each worker can load the app
+        uvicorn.run("app:app", host=host, port=port, workers=workers)
+        return
+    _server = uvicorn.Server(uvicorn.Config(app, host=host, port=port))
+    _server.run()
+
+def stop_server():
+    if _server is not None:
+        _server.should_exit = True
+
 if __name__ == '__main__':
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Run the DataFlare API server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("DATAFLARE_WORKERS", "1")))
+    args = parser.parse_args()
+    start_server(args.host, args.port, args.workers)
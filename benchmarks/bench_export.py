@@ -0,0 +1,100 @@
+"""
+Bulk export throughput: the JSON query path versus files written by DuckDB.
+
+``json``             the rows are fetched as Arrow and encoded as the JSON
+                     response of ``/api/query_dataset``
+``parquet``/``csv``  ``QueryService.export_query_on_dataset``: DuckDB's
+                     ``COPY ... TO`` writes the file
+``arrow``            record batches streamed to an Arrow IPC file
+
+All variants read the whole unemployment dataset
+(``generators.generate_unemployment``; 50M rows is about 1.2 GB as CSV).
+Each reports wall time, rows/s, output bytes and MB/s of output. The JSON
+baseline holds the whole response in memory, so it is skipped past 5M rows.
+
+    python benchmarks/bench_export.py [rows]
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from benchmarks import generators
+from utils.serialization import encode_table
+
+DATASET = ('bench', 'unemployment_rate')
+QUERY = {'select': ['date', 'state', 'unemployment_rate']}
+JSON_MAX_ROWS = 5_000_000
+
+# name -> (format, compression)
+VARIANTS = {
+    'parquet': ('parquet', 'zstd'),
+    'parquet_snappy': ('parquet', 'snappy'),
+    'csv': ('csv', 'none'),
+    'csv_gzip': ('csv', 'gzip'),
+    'arrow': ('arrow', 'none'),
+    'arrow_lz4': ('arrow', 'lz4'),
+}
+
+
+def _report(start: float, rows: int, size: int) -> dict:
+    seconds = time.perf_counter() - start
+    return {'wall_ms': round(seconds * 1000, 1), 'rows': rows, 'rows_per_s': round(rows / seconds),
+            'bytes': size, 'mb_per_s': round(size / seconds / 1e6, 1)}
+
+
+def json_export(service) -> dict:
+    start = time.perf_counter()
+    table = service.execute_query_on_dataset_arrow(dict(QUERY), *DATASET, cache=False)
+    payload = encode_table(table)
+    return _report(start, table.num_rows, len(payload))
+
+
+def file_export(service, directory: str, format: str, compression: str) -> dict:
+    path = os.path.join(directory, f"export.{format}")
+    start = time.perf_counter()
+    rows = service.export_query_on_dataset(dict(QUERY), *DATASET, path, format, compression)
+    result = _report(start, rows, os.path.getsize(path))
+    os.remove(path)
+    return result
+
+
+def run(rows: int) -> dict:
+    """Export the generated dataset in every variant; the cwd must be the generated workspace."""
+    from api.services import QueryService
+
+    service = QueryService()
+    # Bind the snapshot once, so no variant pays the registration
+    service.execute_query_on_dataset_arrow({'select': ['count(*)']}, *DATASET)
+    results = {'rows': rows}
+    if rows <= JSON_MAX_ROWS:
+        results['json'] = json_export(service)
+    for name, (format, compression) in VARIANTS.items():
+        results[name] = file_export(service, os.getcwd(), format, compression)
+    return results
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000_000
+    workspace = tempfile.mkdtemp(prefix='dataflare-bench-export-')
+    previous = os.getcwd()
+    try:
+        generators.generate_unemployment(workspace, rows)
+        os.chdir(workspace)
+        results = run(rows)
+    finally:
+        os.chdir(previous)
+        shutil.rmtree(workspace, ignore_errors=True)
+    print(f"rows: {rows:,}")
+    for name, r in results.items():
+        if isinstance(r, dict):
+            print(f"{name + ':':16} {r['wall_ms']:10.1f} ms  {r['rows_per_s']:>12,} rows/s  "
+                  f"{r['bytes']:>14,} bytes  {r['mb_per_s']:8.1f} MB/s")
+
+
+if __name__ == '__main__':
+    main()
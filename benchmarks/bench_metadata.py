@@ -0,0 +1,61 @@
+"""
+Per-request metadata overhead: uncached ``yaml.safe_load`` versus the shared
+``MetadataCache``.
+
+Simulates the YAML work done by one ``/query`` + ``/api/datacard`` round trip
+(config, dataset definition twice, datacard definition).
+
+    python benchmarks/bench_metadata.py [iterations]
+"""
+import os
+import sys
+import time
+import yaml
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+os.chdir(project_root)
+
+from utils.config_loader import (
+    DEFAULT_CONFIG_PATH, get_dataset_yaml_path, get_datacard_yaml_path, metadata_cache, load_yaml
+)
+
+REQUEST_FILES = [
+    DEFAULT_CONFIG_PATH,
+    get_dataset_yaml_path('us_lbs', 'unemployment_rate'),
+    get_dataset_yaml_path('us_lbs', 'unemployment_rate'),
+    get_datacard_yaml_path('us_lbs', 'unemployment_rate'),
+]
+
+
+def uncached_request():
+    for path in REQUEST_FILES:
+        with open(path, 'r') as f:
+            yaml.safe_load(f)
+
+
+def cached_request():
+    for path in REQUEST_FILES:
+        load_yaml(path)
+
+
+def measure(fn, iterations: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    metadata_cache.invalidate()
+    before = measure(uncached_request, iterations)
+    after = measure(cached_request, iterations)
+    print(f"uncached: {before:8.1f} us/request")
+    print(f"cached:   {after:8.1f} us/request  ({before / after:.0f}x faster)")
+    print(f"cache:    {metadata_cache.info()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+CPU time to turn a DuckDB result into JSON response bytes.
+
+``legacy`` reproduces the previous path: fetchall, dict(zip()) per row,
+per-value isinstance check, json.dumps/json.loads round trip and a final
+json.dumps by JSONResponse. ``columnar`` is the path used by the query
+routes: dates converted by Arrow kernels, row objects written by DuckDB.
+
+    python benchmarks/bench_serialization.py [rows]
+"""
+import os
+import sys
+import json
+import time
+from datetime import datetime, date
+
+import duckdb
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from utils.serialization import encode_table
+
+QUERY = "SELECT date, state, unemployment_rate FROM unemployment"
+
+
+def make_connection(rows: int):
+    conn = duckdb.connect(':memory:')
+    conn.execute(f"""
+        CREATE TABLE unemployment AS
+        SELECT TIMESTAMP '1950-01-01' + to_months((i // 50)::INTEGER) AS date,
+               'state_' || (i % 50) AS state,
+               round(random() * 15, 1) AS unemployment_rate
+        FROM range({rows}) r(i)
+    """)
+    return conn
+
+
+def legacy(conn) -> bytes:
+    result = conn.execute(QUERY).fetchall()
+    columns = ['date', 'state', 'unemployment_rate']
+    rows = [
+        {k: (v.isoformat() if isinstance(v, (datetime, date)) else v) for k, v in dict(zip(columns, row)).items()}
+        for row in result
+    ]
+    rows = json.loads(json.dumps(rows))
+    return json.dumps(rows, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def columnar(conn) -> bytes:
+    return encode_table(conn.execute(QUERY).to_arrow_table())
+
+
+def measure(fn, conn, repeat: int = 5) -> float:
+    fn(conn)
+    start = time.process_time()
+    for _ in range(repeat):
+        fn(conn)
+    return (time.process_time() - start) / repeat
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    conn = make_connection(rows)
+    per = 100_000 / rows
+    before = measure(legacy, conn) * per
+    after = measure(columnar, conn) * per
+    print(f"legacy:   {before * 1000:8.1f} ms CPU per 100k rows")
+    print(f"columnar: {after * 1000:8.1f} ms CPU per 100k rows  ({before / after:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Time-series operators computed by the client versus in the engine, over one
+hourly series (``generators.generate_series``, 1M points by default).
+
+``client``  the full series is queried and encoded as the JSON response,
+            then the operators run in pandas, as a consumer of the raw
+            series has to
+``engine``  the query carries ``series``/``resample`` operators; DuckDB
+            evaluates them with window functions and only the final series
+            is encoded
+
+Each scenario reports wall time, rows and response bytes of both variants.
+
+    python benchmarks/bench_timeseries.py [points]
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from benchmarks import generators
+from utils.serialization import encode_table
+
+DATASET = ('bench', 'sensor_readings')
+RAW = {'select': ['ts', 'value'], 'order_by': ['ts']}
+
+# name -> (engine query, the same computation in pandas over the raw series)
+SCENARIOS = {
+    'rolling_24h': (
+        {'select': ['ts', 'value'], 'time_column': 'ts',
+         'series': [{'op': 'rolling', 'column': 'value', 'window': 24},
+                    {'op': 'pct_change', 'column': 'value', 'window': 24}]},
+        lambda s: s.to_frame().assign(rolling=s.rolling(24).mean(), change=s.pct_change(24)),
+    ),
+    'daily_rolling_7d': (
+        {'select': ['ts', 'value'], 'time_column': 'ts', 'resample': {'every': 'day', 'fill': 'forward'},
+         'series': [{'op': 'rolling', 'column': 'value', 'window': 7}]},
+        lambda s: (lambda d: d.to_frame().assign(rolling=d.rolling(7).mean()))(s.resample('D').mean().ffill()),
+    ),
+    'monthly_yoy': (
+        {'select': ['ts', 'value'], 'time_column': 'ts', 'resample': {'every': 'month', 'fill': 'linear'},
+         'series': [{'op': 'pct_change', 'column': 'value', 'window': 12, 'alias': 'yoy'}]},
+        lambda s: (lambda m: m.to_frame().assign(yoy=m.pct_change(12)))(
+            s.resample('MS').mean().interpolate('time')),
+    ),
+}
+
+
+def client(service, compute) -> dict:
+    start = time.perf_counter()
+    table = service.execute_query_on_dataset_arrow(dict(RAW), *DATASET)
+    payload = encode_table(table)
+    series = table.to_pandas().set_index('ts')['value']
+    frame = compute(series)
+    return {'wall_ms': round((time.perf_counter() - start) * 1000, 1), 'rows': table.num_rows,
+            'response_bytes': len(payload), 'result_rows': len(frame)}
+
+
+def engine(service, query) -> dict:
+    start = time.perf_counter()
+    table = service.execute_query_on_dataset_arrow(dict(query), *DATASET)
+    payload = encode_table(table)
+    return {'wall_ms': round((time.perf_counter() - start) * 1000, 1), 'rows': table.num_rows,
+            'response_bytes': len(payload), 'result_rows': table.num_rows}
+
+
+def run(points: int) -> dict:
+    """Run every scenario against a generated series; the cwd must be the generated workspace."""
+    from api.services import QueryService
+
+    service = QueryService()
+    # Bind the snapshot once, so neither variant pays the registration
+    service.execute_query_on_dataset_arrow({'select': ['count(*)']}, *DATASET)
+    results = {'points': points}
+    for name, (query, compute) in SCENARIOS.items():
+        results[name] = {'client': client(service, compute), 'engine': engine(service, query)}
+    return results
+
+
+def main():
+    points = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    workspace = tempfile.mkdtemp(prefix='dataflare-bench-timeseries-')
+    previous = os.getcwd()
+    try:
+        generators.generate_series(workspace, points)
+        os.chdir(workspace)
+        results = run(points)
+    finally:
+        os.chdir(previous)
+        shutil.rmtree(workspace, ignore_errors=True)
+    print(f"points: {points:,}")
+    for name in SCENARIOS:
+        for variant in ('client', 'engine'):
+            r = results[name][variant]
+            print(f"{name + ':':18} {variant:6} {r['wall_ms']:9.1f} ms  {r['rows']:>10,} rows  "
+                  f"{r['response_bytes']:>12,} bytes")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Throughput of the ``/query`` route with 1..N uvicorn worker processes.
+
+Every worker binds the same on-disk Parquet snapshot, so scaling should be
+close to linear until the client or the CPU count becomes the limit.
+
+    python benchmarks/bench_workers.py [max_workers] [seconds]
+"""
+import os
+import sys
+import time
+import socket
+import subprocess
+import threading
+import requests
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+QUERY_PATH = "/query/us_lbs/unemployment_rate"
+QUERY_BODY = {
+    "description": "benchmark",
+    "select": ["date", "unemployment_rate"],
+    "order_by": ["date"],
+}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_until_ready(base_url: str, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            requests.get(f"{base_url}/chat", timeout=1)
+            return
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    raise RuntimeError("Server did not start")
+
+
+def run_load(base_url: str, clients: int, seconds: float) -> float:
+    counts = [0] * clients
+    stop_at = time.time() + seconds
+
+    def client(i: int):
+        session = requests.Session()
+        while time.time() < stop_at:
+            response = session.post(f"{base_url}{QUERY_PATH}", json=QUERY_BODY)
+            response.raise_for_status()
+            counts[i] += 1
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return sum(counts) / seconds
+
+
+def main():
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    baseline = None
+    workers = 1
+    while workers <= max_workers:
+        port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, "app.py", "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers)],
+            cwd=project_root, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            wait_until_ready(base_url)
+            run_load(base_url, workers * 4, 1.0)  # warm up every worker
+            rps = run_load(base_url, workers * 4, seconds)
+            baseline = baseline or rps
+            print(f"workers={workers:3d}  {rps:9.1f} req/s  speedup={rps / baseline:5.2f}x")
+        finally:
+            server.terminate()
+            server.wait()
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Wall time of ``WorldBankGDPWorkflow.process_data`` over downloaded pages.
+
+Synthetic World Bank pages (1000 records each, every 10th value null) are
+written to disk like the download cache holds them, then turned into the
+workflow's DataFrame three ways:
+
+``legacy``    json.loads per page, then the previous row loop (a dict per
+              record with int()/float() calls) and ``pd.DataFrame(rows)``
+``columnar``  json.loads per page, then ``records_to_frame`` (per-column
+              extraction, Arrow casts)
+``duckdb``    ``read_json_pages``: parsing, extraction and casts in DuckDB
+
+    python benchmarks/bench_workflows.py [records] [--skip-legacy]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+from itertools import chain, islice
+
+import pandas as pd
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from datasets.worldbank.main_gdp_and_other_stats_gdp.workflow import WorldBankGDPWorkflow
+from workflows.columnar import records_to_frame, read_json_pages
+
+COUNTRIES = [(f"C{i:02d}", f"Country {i}") for i in range(266)]
+PER_PAGE = 1000
+
+
+def generate_records(count: int):
+    for i in range(count):
+        code, name = COUNTRIES[i % len(COUNTRIES)]
+        yield {
+            'indicator': {'id': 'NY.GDP.MKTP.CD', 'value': 'GDP (current US$)'},
+            'country': {'id': code, 'value': name},
+            'countryiso3code': code,
+            'date': str(1960 + (i // len(COUNTRIES)) % 64),
+            'value': None if i % 10 == 0 else 1e9 + i * 1.5,
+            'unit': '', 'obs_status': '', 'decimal': 0,
+        }
+
+
+def write_pages(directory: str, count: int) -> list:
+    records = generate_records(count)
+    pages = -(-count // PER_PAGE)
+    paths = []
+    for page in range(1, pages + 1):
+        path = os.path.join(directory, f'{page}.json')
+        metadata = {'page': page, 'pages': pages, 'per_page': PER_PAGE, 'total': count}
+        with open(path, 'w') as f:
+            json.dump([metadata, list(islice(records, PER_PAGE))], f)
+        paths.append(path)
+    return paths
+
+
+def parsed_records(paths):
+    for path in paths:
+        with open(path, 'rb') as f:
+            yield json.loads(f.read())[1]
+
+
+def legacy(paths, schema) -> pd.DataFrame:
+    data = []
+    for entry in chain.from_iterable(parsed_records(paths)):
+        if entry['value'] is not None:
+            data.append({
+                'country': entry['country']['value'],
+                'country_code': entry['country']['id'],
+                'year': int(entry['date']),
+                'gdp': float(entry['value'])
+            })
+    return pd.DataFrame(data)
+
+
+def columnar(paths, schema) -> pd.DataFrame:
+    return records_to_frame(chain.from_iterable(parsed_records(paths)),
+                            WorldBankGDPWorkflow.SOURCE_COLUMNS, schema, required=['gdp'])
+
+
+def duckdb_pages(paths, schema) -> pd.DataFrame:
+    return read_json_pages(paths, WorldBankGDPWorkflow.SOURCE_COLUMNS, schema, required=['gdp'])
+
+
+def run(count: int, skip_legacy: bool = False) -> dict:
+    schema = WorldBankGDPWorkflow('bench_gdp', 'http://localhost', '/').schema
+    directory = tempfile.mkdtemp(prefix='dataflare-bench-pages-')
+    try:
+        paths = write_pages(directory, count)
+        results = {'records': count}
+        variants = [('columnar', columnar), ('duckdb', duckdb_pages)]
+        if not skip_legacy:
+            variants.insert(0, ('legacy', legacy))
+        for name, fn in variants:
+            start = time.perf_counter()
+            frame = fn(paths, schema)
+            elapsed = time.perf_counter() - start
+            results[name] = {'wall_ms': round(elapsed * 1000, 1), 'records_per_s': round(count / elapsed),
+                             'rows': len(frame)}
+            del frame
+        return results
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    count = int(args[0]) if args else 1_000_000
+    results = run(count, skip_legacy='--skip-legacy' in sys.argv)
+    print(f"records:  {count:,}")
+    for name in ('legacy', 'columnar', 'duckdb'):
+        if name in results:
+            line = f"{name + ':':9} {results[name]['wall_ms']:9.1f} ms  {results[name]['records_per_s']:>12,} records/s"
+            if 'legacy' in results:
+                line += f"  ({results['legacy']['wall_ms'] / results[name]['wall_ms']:.1f}x)"
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
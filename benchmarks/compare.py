@@ -0,0 +1,52 @@
+"""
+Compare two benchmark result files written by ``benchmarks/run.py``.
+
+    python benchmarks/compare.py OLD.json NEW.json [--threshold 0.1]
+
+Exits non-zero when any timing regressed by more than the threshold.
+"""
+import sys
+import json
+import argparse
+
+LOWER_IS_BETTER = ('median_ms', 'p95_ms', 'min_ms', 'cpu_ms', 'seconds')
+
+
+def flatten(prefix: str, value, out: dict):
+    if isinstance(value, dict):
+        for key, child in value.items():
+            flatten(f"{prefix}.{key}" if prefix else key, child, out)
+    elif isinstance(value, (int, float)):
+        out[prefix] = value
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('old')
+    parser.add_argument('new')
+    parser.add_argument('--threshold', type=float, default=0.1, help='relative slowdown treated as a regression')
+    args = parser.parse_args()
+
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    old_metrics = flatten('', old['results'], {})
+    new_metrics = flatten('', new['results'], {})
+
+    print(f"{'metric':60s} {old['commit']:>12s} {new['commit']:>12s} {'change':>9s}")
+    regressions = 0
+    for name in sorted(set(old_metrics) & set(new_metrics)):
+        before, after = old_metrics[name], new_metrics[name]
+        change = (after - before) / before if before else 0.0
+        flag = ''
+        if name.endswith(LOWER_IS_BETTER) and change > args.threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        print(f"{name:60s} {before:12.3f} {after:12.3f} {change:+8.1%}{flag}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Synthetic data for the benchmark suite.
+
+Datasets are written by DuckDB's COPY straight to Parquet, so even the
+1B-row scale never materializes rows in Python. Everything is laid out like
+the real tree (``datasets/<org>/<slug>/dataset.yaml`` + ``data/data.parquet``,
+``datacards/<org>/<slug>.yml``) under a workspace directory, so services can
+run against it unchanged after ``os.chdir(workspace)``.
+"""
+import os
+import duckdb
+import yaml
+
+US_STATES = 50
+
+UNEMPLOYMENT_DATASET = {
+    'name': 'unemployment_rate',
+    'description': 'Synthetic monthly unemployment rate by state',
+    'measures': ['unemployment_rate'],
+    'dimensions': ['date', 'state'],
+    'columns': [
+        {'name': 'date', 'type': 'date'},
+        {'name': 'state', 'type': 'string'},
+        {'name': 'unemployment_rate', 'type': 'float'},
+    ],
+    'database': {'type': 'duckdb', 'file': 'data.parquet', 'table': 'unemployment_rate'},
+}
+
+GDP_DATASET = {
+    'name': 'main_gdp_and_other_stats_gdp',
+    'description': 'Synthetic GDP by country and year',
+    'measures': ['gdp'],
+    'dimensions': ['country', 'country_code', 'year'],
+    'schema': [
+        {'name': 'country', 'type': 'string'},
+        {'name': 'country_code', 'type': 'string'},
+        {'name': 'year', 'type': 'int'},
+        {'name': 'gdp', 'type': 'float'},
+    ],
+    'database': {'type': 'duckdb', 'file': 'data.parquet', 'table': 'worldbank_gdp'},
+}
+
+
+def _write_dataset(workspace: str, organization: str, slug: str, definition: dict, select_sql: str, rows: int) -> str:
+    dataset_dir = os.path.join(workspace, 'datasets', organization, slug)
+    os.makedirs(os.path.join(dataset_dir, 'data'), exist_ok=True)
+    with open(os.path.join(dataset_dir, 'dataset.yaml'), 'w') as f:
+        yaml.safe_dump(definition, f, sort_keys=False)
+    parquet_path = os.path.join(dataset_dir, 'data', 'data.parquet')
+    conn = duckdb.connect(':memory:')
+    try:
+        conn.execute(f"COPY ({select_sql.format(rows=rows)}) TO '{parquet_path}' (FORMAT PARQUET)")
+    finally:
+        conn.close()
+    return parquet_path
+
+
+def generate_unemployment(workspace: str, rows: int, organization: str = 'bench') -> str:
+    """Unemployment-rate schema: one row per (month, state), ``rows`` rows in total."""
+    return _write_dataset(workspace, organization, 'unemployment_rate', UNEMPLOYMENT_DATASET, f"""
+        SELECT (DATE '1900-01-01' + to_months((i // {US_STATES})::INTEGER)) AS date,
+               'state_' || lpad((i % {US_STATES})::VARCHAR, 2, '0') AS state,
+               round(3 + 12 * random(), 1) AS unemployment_rate
+        FROM range({{rows}}) r(i)
+    """, rows)
+
+
+def generate_gdp(workspace: str, rows: int, organization: str = 'bench') -> str:
+    """World Bank GDP schema: 250 countries with as many years as needed for ``rows`` rows."""
+    return _write_dataset(workspace, organization, 'main_gdp_and_other_stats_gdp', GDP_DATASET, """
+        SELECT 'Country ' || (i % 250) AS country,
+               'C' || lpad((i % 250)::VARCHAR, 3, '0') AS country_code,
+               (1960 + i // 250)::INTEGER AS year,
+               1e9 + random() * 1e13 AS gdp
+        FROM range({rows}) r(i)
+    """, rows)
+
+
+SERIES_DATASET = {
+    'name': 'sensor_readings',
+    'description': 'Synthetic hourly readings of one sensor',
+    'measures': ['value'],
+    'dimensions': ['ts'],
+    'columns': [
+        {'name': 'ts', 'type': 'timestamp'},
+        {'name': 'value', 'type': 'float'},
+    ],
+    'database': {'type': 'duckdb', 'file': 'data.parquet', 'table': 'sensor_readings'},
+}
+
+
+def generate_series(workspace: str, points: int, organization: str = 'bench') -> str:
+    """One hourly series of ``points`` readings (1M points is ~114 years), with a daily and a yearly cycle."""
+    return _write_dataset(workspace, organization, 'sensor_readings', SERIES_DATASET, """
+        SELECT TIMESTAMP '1900-01-01' + to_hours(i) AS ts,
+               round(100 + 10 * sin(i * 2 * pi() / 24) + 30 * sin(i * 2 * pi() / 8766) + 5 * random(), 2) AS value
+        FROM range({rows}) r(i)
+    """, points)
+
+
+def generate_catalog(workspace: str, datasets: int = 10_000, datacards: int = 10_000, organizations: int = 100):
+    """Write ``datasets`` dataset.yaml files and ``datacards`` datacard YAMLs (no data files)."""
+    topics = ['unemployment', 'gdp', 'inflation', 'population', 'cancer survival', 'housing', 'wages', 'exports']
+    for i in range(datasets):
+        topic = topics[i % len(topics)]
+        dataset_dir = os.path.join(workspace, 'datasets', f'org_{i % organizations}', f'dataset_{i}')
+        os.makedirs(dataset_dir, exist_ok=True)
+        with open(os.path.join(dataset_dir, 'dataset.yaml'), 'w') as f:
+            yaml.safe_dump({
+                'name': f'{topic} dataset {i}',
+                'description': f'Synthetic {topic} statistics, series {i}',
+                'measures': ['value'],
+                'dimensions': ['date', 'region'],
+                'database': {'type': 'duckdb', 'file': 'data.parquet', 'table': f'dataset_{i}'},
+            }, f)
+    for i in range(datacards):
+        topic = topics[i % len(topics)]
+        org_dir = os.path.join(workspace, 'datacards', f'org_{i % organizations}')
+        os.makedirs(org_dir, exist_ok=True)
+        with open(os.path.join(org_dir, f'datacard_{i}.yml'), 'w') as f:
+            yaml.safe_dump({
+                'title': f'{topic.title()} chart {i}',
+                'subtitle': f'Synthetic {topic} datacard',
+                'description': f'Tracks {topic} over time',
+                'query': {'table': f'dataset_{i}', 'select': ['date', 'value'], 'order_by': ['date']},
+                'xAxis': 'date',
+                'yAxis': 'value',
+                'chart_type': 'line',
+            }, f)
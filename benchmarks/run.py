@@ -0,0 +1,257 @@
+"""
+Benchmark suite for the query, search, serialization, time-series, export
+and chat paths, plus cold-start import time of the API and ingestion entry
+points.
+
+Writes one JSON document per run (keyed by git commit) so runs can be diffed
+with ``benchmarks/compare.py``:
+
+    python benchmarks/run.py --rows 1000000 --catalog 10000
+    python benchmarks/run.py --suites query --rows 100000000
+    python benchmarks/compare.py benchmarks/results/<old>.json benchmarks/results/<new>.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime, timezone
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from benchmarks import generators
+from benchmarks.stubs import StubLLMService
+
+SUITES = {}
+
+
+def suite(name):
+    def register(fn):
+        SUITES[name] = fn
+        return fn
+    return register
+
+
+def timed(fn, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'median_ms': round(statistics.median(samples), 3),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        'min_ms': round(samples[0], 3),
+        'runs': repeat,
+    }
+
+
+class workspace_cwd:
+    """Run services against a generated tree (they resolve datasets/ relative to cwd)."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __enter__(self):
+        from utils.config_loader import metadata_cache
+        self.previous = os.getcwd()
+        os.chdir(self.path)
+        metadata_cache.invalidate()
+        return self
+
+    def __exit__(self, *exc):
+        from utils.config_loader import metadata_cache
+        os.chdir(self.previous)
+        metadata_cache.invalidate()
+
+
+@suite('query')
+def query_suite(args, workdir: str) -> dict:
+    from api.services import QueryService
+
+    generators.generate_unemployment(workdir, args.rows)
+    generators.generate_gdp(workdir, args.rows)
+    queries = {
+        'state_series': ('unemployment_rate', {
+            'select': ['date', 'unemployment_rate'], 'where': "state = 'state_07'",
+            'order_by': ['date DESC'], 'limit': 120,
+        }),
+        'count': ('unemployment_rate', {'select': ['count(*) AS n']}),
+        'top_gdp': ('main_gdp_and_other_stats_gdp', {
+            'select': ['country', 'year', 'gdp'], 'order_by': ['gdp DESC'], 'limit': 10,
+        }),
+    }
+    results = {'rows': args.rows}
+    with workspace_cwd(workdir):
+        for name, (dataset, query) in queries.items():
+            # Cold: new service, so a fresh connection and snapshot registration
+            results[f'{name}.cold'] = timed(
+                lambda: QueryService().execute_query_on_dataset_arrow(dict(query), 'bench', dataset), args.repeat
+            )
+            service = QueryService()
+            service.execute_query_on_dataset_arrow(dict(query), 'bench', dataset)
+            results[f'{name}.warm'] = timed(
+                lambda: service.execute_query_on_dataset_arrow(dict(query), 'bench', dataset), args.repeat
+            )
+    return results
+
+
+@suite('search')
+def search_suite(args, workdir: str) -> dict:
+    from services.dataset_search_service import DatasetSearchService
+    from services.datacard_search_service import DatacardSearchService
+    from utils.config_loader import metadata_cache
+
+    generators.generate_catalog(workdir, datasets=args.catalog, datacards=args.catalog)
+    results = {'catalog_size': args.catalog}
+    with workspace_cwd(workdir):
+        datasets, datacards = DatasetSearchService(), DatacardSearchService()
+
+        def cold_dataset_search():
+            metadata_cache.invalidate()
+            datasets.search_datasets('unemployment')
+
+        results['datasets.cold'] = timed(cold_dataset_search, max(1, args.repeat // 5))
+        results['datasets.warm'] = timed(lambda: datasets.search_datasets('unemployment'), args.repeat)
+        results['datacards.warm'] = timed(lambda: datacards.search_datacards('gdp'), args.repeat)
+    return results
+
+
+@suite('serialization')
+def serialization_suite(args, workdir: str) -> dict:
+    from benchmarks.bench_serialization import make_connection, columnar, legacy
+
+    rows = min(args.rows, 1_000_000)
+    conn = make_connection(rows)
+    results = {'rows': rows}
+    for name, fn in (('columnar', columnar), ('legacy', legacy)):
+        fn(conn)
+        start = time.process_time()
+        for _ in range(3):
+            fn(conn)
+        cpu = (time.process_time() - start) / 3
+        results[name] = {'cpu_ms': round(cpu * 1000, 3), 'rows_per_s': round(rows / cpu)}
+    return results
+
+
+@suite('timeseries')
+def timeseries_suite(args, workdir: str) -> dict:
+    from benchmarks.bench_timeseries import run
+
+    points = min(args.rows, 10_000_000)
+    generators.generate_series(workdir, points)
+    with workspace_cwd(workdir):
+        return run(points)
+
+
+@suite('export')
+def export_suite(args, workdir: str) -> dict:
+    from benchmarks.bench_export import run
+
+    generators.generate_unemployment(workdir, args.rows)
+    with workspace_cwd(workdir):
+        return run(args.rows)
+
+
+@suite('workflows')
+def workflows_suite(args, workdir: str) -> dict:
+    from benchmarks.bench_workflows import run
+
+    # The row-loop baseline keeps every record alive; past 2M it needs several GB
+    records = min(args.rows, 10_000_000)
+    return run(records, skip_legacy=records > 2_000_000)
+
+
+@suite('chat')
+def chat_suite(args, workdir: str) -> dict:
+    from services.chat_service import ChatService
+
+    llm = StubLLMService({
+        'dataset': 'us_lbs/unemployment_rate',
+        'select': ['date', 'unemployment_rate'],
+        'order_by': ['date DESC'],
+        'limit': 12,
+    })
+    chat = ChatService(llm_service=llm)
+    with workspace_cwd(project_root):
+        return {'process_message': timed(lambda: chat.process_message('unemployment', []), args.repeat)}
+
+
+def import_time_ms(module: str) -> float:
+    """Cumulative ``-X importtime`` cost of ``module`` in a fresh interpreter."""
+    output = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=project_root, capture_output=True, text=True, check=True,
+    ).stderr
+    for line in reversed(output.splitlines()):
+        # "import time: self [us] | cumulative | imported package"
+        _, cumulative, name = line.split('|')
+        if name.strip() == module:
+            return int(cumulative) / 1000
+    raise RuntimeError(f"no importtime entry for {module}")
+
+
+@suite('importtime')
+def importtime_suite(args, workdir: str) -> dict:
+    runs = max(3, args.repeat // 4)
+    results = {}
+    for module in ('app', 'main'):
+        samples = sorted(import_time_ms(module) for _ in range(runs))
+        results[module] = {
+            'median_ms': round(statistics.median(samples), 3),
+            'min_ms': round(samples[0], 3),
+            'runs': runs,
+        }
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=project_root, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--suites', default=','.join(SUITES), help='comma-separated subset of: ' + ', '.join(SUITES))
+    parser.add_argument('--rows', type=int, default=1_000_000, help='rows per synthetic dataset (1M-1B)')
+    parser.add_argument('--catalog', type=int, default=10_000, help='datasets and datacards in the synthetic catalog')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--output', default=os.path.join(project_root, 'benchmarks', 'results'))
+    args = parser.parse_args()
+
+    commit = git_commit()
+    report = {
+        'commit': commit,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'results': {},
+    }
+    for name in args.suites.split(','):
+        workdir = tempfile.mkdtemp(prefix=f'dataflare-bench-{name}-')
+        try:
+            print(f"Running {name} suite...", flush=True)
+            report['results'][name] = SUITES[name](args, workdir)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    os.makedirs(args.output, exist_ok=True)
+    output_path = os.path.join(args.output, f"{datetime.now():%Y%m%d-%H%M%S}-{commit}.json")
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report['results'], indent=2))
+    print(f"Results written to {output_path}")
+
+
+if __name__ == '__main__':
+    main()
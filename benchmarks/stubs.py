@@ -0,0 +1,21 @@
+"""Offline stand-ins so chat benchmarks measure our code, not the LLM provider."""
+import time
+from typing import Dict, List
+
+
+class StubLLMService:
+    """Drop-in for ``LLMService`` returning a canned answer and query suggestion."""
+
+    def __init__(self, suggested_query: Dict, latency: float = 0.0):
+        self.suggested_query = suggested_query
+        self.latency = latency
+        self.calls = 0
+
+    def generate_response(self, message: str, chat_history: List[Dict], system_prompt: str, retrieved_info: Dict) -> Dict:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return {
+            "response": f"Here is what I found about '{message}'.",
+            "suggested_query": dict(self.suggested_query),
+        }
@@ -0,0 +1,106 @@
+import os
+import glob
+import time
+import threading
+import logging
+from typing import Any, Dict, Optional, Tuple
+import pyarrow as pa
+import pyarrow.dataset as ds
+from data_binding.database_engine import ConnectionManager
+from data_binding.pushdown import Capabilities, plan_scan, apply_residual
+from data_binding.snapshot import get_data_path, snapshot_version, SnapshotVersion
+from data_binding.result_set import ResultSet
+from utils.config_loader import load_dataset_definition
+from utils.metrics import stage, ROWS_RETURNED
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {'.parquet': 'parquet', '.csv': 'csv', '.tsv': 'csv', '.arrow': 'ipc', '.feather': 'ipc'}
+
+
+class ArrowScanConnectionManager(ConnectionManager):
+    """
+    Serves Parquet, CSV or Arrow IPC files (a file, a directory or a glob) in
+    place with a pyarrow dataset scanner, without loading them into a database.
+
+    Column projection, simple filters and limits are pushed into the scan, so
+    Parquet row groups are pruned by their statistics and only the referenced
+    columns are read; the rest of the query (expressions, aggregates, ordering)
+    runs over the scanned rows in DuckDB.
+    """
+
+    capabilities = Capabilities(projection=True, filters=True, limit=True)
+
+    def __init__(self, connection_config: Dict[str, Any]):
+        super().__init__()
+        self.connection_config = connection_config
+        # path -> (snapshot version, dataset); directories and globs are rediscovered per query
+        self.datasets: Dict[str, Tuple[SnapshotVersion, ds.Dataset]] = {}
+        self.dataset_paths: Dict[Tuple[str, str], str] = {}
+        self._lock = threading.Lock()
+
+    def get_dataset(self, path: str, file_format: Optional[str] = None) -> ds.Dataset:
+        file_format = file_format or FORMATS.get(os.path.splitext(path)[1].lower(), 'parquet')
+        if os.path.isfile(path):
+            version = snapshot_version(path)
+            cached = self.datasets.get(path)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            with stage("table_registration"):
+                dataset = ds.dataset(path, format=file_format)
+            with self._lock:
+                self.datasets[path] = (version, dataset)
+            return dataset
+        if any(char in path for char in '*?['):
+            files = sorted(glob.glob(path))
+            if not files:
+                raise FileNotFoundError(f"No files match {path}")
+            return ds.dataset(files, format=file_format)
+        if not os.path.isdir(path):
+            raise FileNotFoundError(f"Data not found: {path}")
+        return ds.dataset(path, format=file_format)
+
+    def execute_query_on_dataset(self, organization: str, dataset: str, query_model: Dict[str, Any]) -> ResultSet:
+        return ResultSet(self.execute_query_on_dataset_arrow(organization, dataset, query_model))
+
+    def execute_query_on_dataset_arrow(self, organization: str, dataset: str, query_model: Dict[str, Any]) -> pa.Table:
+        return self.profile_query_on_dataset(organization, dataset, query_model)[0]
+
+    def profile_query_on_dataset(self, organization: str, dataset: str, query_model: Dict[str, Any]) -> Tuple[pa.Table, Dict[str, Any]]:
+        stages_ms = {}
+        start = time.perf_counter()
+        database_config = load_dataset_definition(organization, dataset).get('database', {})
+        path = get_data_path(organization, dataset, database_config)
+        if path is None:
+            raise ValueError(f"Dataset {organization}/{dataset} names no data file or path")
+        self.dataset_paths[(organization, dataset)] = path
+        file_format = database_config.get('format') or {'csv': 'csv', 'parquet': 'parquet'}.get(database_config.get('type'))
+        scan = self.get_dataset(path, file_format)
+        plan = plan_scan(query_model, scan.schema, self.capabilities)
+        stages_ms['bind'] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        with stage("arrow_scan"):
+            scanner = scan.scanner(columns=plan.columns, filter=plan.filter)
+            table = scanner.head(plan.limit) if plan.limit is not None else scanner.to_table()
+        stages_ms['scan'] = (time.perf_counter() - start) * 1000
+        rows_scanned = table.num_rows
+
+        if plan.residual is not None:
+            start = time.perf_counter()
+            with stage("residual_execute"):
+                table = apply_residual(table, plan.residual)
+            stages_ms['residual'] = (time.perf_counter() - start) * 1000
+        ROWS_RETURNED.inc(table.num_rows)
+
+        return table, {
+            'sql': None,
+            'stages_ms': {name: round(value, 3) for name, value in stages_ms.items()},
+            'duckdb': None,
+            'pushdown': dict(plan.pushed, rows_scanned=rows_scanned, residual=plan.residual),
+        }
+
+    def invalidate_dataset(self, organization: str, dataset: str):
+        path = self.dataset_paths.pop((organization, dataset), None)
+        with self._lock:
+            self.datasets.pop(path, None)
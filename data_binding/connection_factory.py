@@ -1,11 +1,76 @@
-from typing import Dict, Any
+import importlib
+from typing import Any, Dict, Iterable, Optional, Union
+from utils.config_loader import load_config
+
+
+def normalize_connection_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Accept both spellings used in configs: ``driver``/``type`` for the backend
+    and ``db_path``/``database`` for the database file.
+    """
+    config = dict(config or {})
+    if not config.get('type') and config.get('driver'):
+        config['type'] = config['driver']
+    if 'database' not in config and config.get('db_path'):
+        config['database'] = config['db_path']
+    return config
+
+
+def default_backend() -> Optional[str]:
+    """Backend for connection configs that name none: ``data_binding.driver``."""
+    return normalize_connection_config(load_config().get('data_binding', {})).get('type')
+
 
 class ConnectionFactory:
+    """
+    Registry of data binding backends, by name.
+
+    Backends are registered as ``'module:Class'`` strings and imported on first
+    use, so a process only loads the engines its datasets actually use.
+    """
+
+    _backends: Dict[str, Union[str, type]] = {}
+    _aliases: Dict[str, str] = {}
+
+    @classmethod
+    def register(cls, name: str, backend: Union[str, type], aliases: Iterable[str] = ()):
+        cls._backends[name] = backend
+        for alias in aliases:
+            cls._aliases[alias] = name
+
+    @classmethod
+    def backend(cls, db_type: str) -> type:
+        name = cls._aliases.get(db_type, db_type)
+        if name not in cls._backends:
+            raise ValueError(f"Unsupported database type: {db_type}")
+        backend = cls._backends[name]
+        if isinstance(backend, str):
+            module_name, class_name = backend.split(':')
+            backend = cls._backends[name] = getattr(importlib.import_module(module_name), class_name)
+        return backend
+
+    @classmethod
+    def backends(cls) -> Dict[str, Any]:
+        """Registered backend names and the query parts each one pushes down."""
+        return {name: cls.backend(name).capabilities for name in cls._backends}
+
     @staticmethod
     def create_connection(db_type: str, config: Dict[str, Any]):
-        if db_type == 'duckdb':
-            from data_binding.duckdb import DuckDBConnectionManager
-            return DuckDBConnectionManager(config)
-        # Add other database types here as needed
-        else:
-            raise ValueError(f"Unsupported database type: {db_type}")
\ No newline at end of file
+        return ConnectionFactory.backend(db_type)(config)
+
+    @staticmethod
+    def create(config: Dict[str, Any]):
+        """
+        A connection manager for a config naming its backend as ``type`` or
+        ``driver``, falling back to the default backend.
+        """
+        config = normalize_connection_config(config)
+        config['type'] = config.get('type') or default_backend()
+        if not config['type']:
+            raise ValueError("Connection config names no database type")
+        return ConnectionFactory.create_connection(config['type'], config)
+
+
+ConnectionFactory.register('duckdb', 'data_binding.duckdb:DuckDBConnectionManager')
+ConnectionFactory.register('sqlite', 'data_binding.sqlite:SQLiteConnectionManager', aliases=['sqlite3'])
+ConnectionFactory.register('arrow', 'data_binding.arrow_scan:ArrowScanConnectionManager', aliases=['parquet', 'csv'])
@@ -1,29 +1,117 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any, Optional, Sequence, Tuple, Union
+import time
 import logging
-from data_binding.connection_factory import ConnectionFactory
+import pyarrow as pa
+from data_binding.connection_factory import ConnectionFactory, normalize_connection_config
+from data_binding.pushdown import Capabilities
+from data_binding.export import write_table
 
 logger = logging.getLogger(__name__)
 
 class ConnectionManager(ABC):
+    # Query parts the backend evaluates itself; see data_binding.pushdown
+    capabilities = Capabilities()
+
+    @staticmethod
+    def create(connection_config: Dict[str, Any]) -> 'ConnectionManager':
+        """The registered backend named by the config's ``type`` (or ``driver``)."""
+        return ConnectionFactory.create(connection_config)
+
     @abstractmethod
-    def execute_query_on_dataset(self, organization: str, dataset: str, query_model: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def execute_query_on_dataset(self, organization: str, dataset: str, query_model: Dict[str, Any]) -> Sequence[Dict[str, Any]]:
+        """The result as a sequence of JSON-compatible rows: a ResultSet, or a list on row-based backends."""
+        pass
+
+    def execute_query_on_dataset_arrow(self, organization: str, dataset: str, query_model: Dict[str, Any]) -> pa.Table:
+        # Columnar backends override this to skip building row dicts
+        result = self.execute_query_on_dataset(organization, dataset, query_model)
+        return result.to_arrow() if hasattr(result, 'to_arrow') else pa.Table.from_pylist(list(result))
+
+    def execute_sql_on_dataset_arrow(self, organization: str, dataset: str, sql: str) -> pa.Table:
+        """Run a statement already compiled for the dataset's table; only SQL backends (``capabilities.sql``) can."""
+        raise ValueError(f"The backend of {organization}/{dataset} cannot run compiled SQL")
+
+    def execute_query_with_progress(self, organization: str, dataset: str, query_model: Dict[str, Any],
+                                    on_progress: Callable[[float], None]) -> pa.Table:
+        """Run a query, reporting the fraction done to ``on_progress`` while it runs."""
+        # Backends that cannot report progress only finish
+        return self.execute_query_on_dataset_arrow(organization, dataset, query_model)
+
+    def export_query_on_dataset(self, organization: str, dataset: str, query_model: Dict[str, Any], path: str,
+                                format: str, compression: Optional[str] = None,
+                                on_progress: Optional[Callable[[float], None]] = None) -> int:
+        """Write a query's result to ``path`` in an export format; returns the rows written."""
+        # Backends without a native writer export the columnar result
+        if on_progress is not None:
+            table = self.execute_query_with_progress(organization, dataset, query_model, on_progress)
+        else:
+            table = self.execute_query_on_dataset_arrow(organization, dataset, query_model)
+        return write_table(table, path, format, compression)
+
+    def profile_query_on_dataset(self, organization: str, dataset: str, query_model: Dict[str, Any]) -> Tuple[pa.Table, Dict[str, Any]]:
+        # Backends without an engine profiler only report the Python-side time
+        start = time.perf_counter()
+        table = self.execute_query_on_dataset_arrow(organization, dataset, query_model)
+        return table, {'sql': None, 'stages_ms': {'execute': round((time.perf_counter() - start) * 1000, 3)}, 'duckdb': None}
+
+    def execute_queries_on_dataset_arrow(self, organization: str, dataset: str, query_models: List[Dict[str, Any]]) -> List[Union[pa.Table, Exception]]:
+        """Run several queries against one dataset; a failing query yields its exception in place of a result."""
+        results = []
+        for query_model in query_models:
+            try:
+                results.append(self.execute_query_on_dataset_arrow(organization, dataset, query_model))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def invalidate_dataset(self, organization: str, dataset: str):
+        """Forget anything bound for a dataset whose new version was just published."""
         pass
 
 class ConcreteConnectionManager(ConnectionManager):
     def __init__(self, database_config):
-        self.database_config = database_config
+        self.database_config = normalize_connection_config(database_config)
         self.connection_manager = None
 
+    @property
+    def capabilities(self) -> Capabilities:
+        return ConnectionFactory.backend(self.database_config.get('type')).capabilities
+
     def execute_query_on_dataset(self, organization: str, dataset: str, query_model: Dict[str, Any]):
-        logger.debug(f"Executing query on dataset: {organization}/{dataset}")
-        logger.debug(f"Query model: {query_model}")
-        logger.debug(f"Database config: {self.database_config}")
-        
-        db_type = self.database_config.get('type')
-        
+        logger.debug("Executing query on dataset: %s/%s", organization, dataset)
+        logger.debug("Query model: %s", query_model)
+
+        return self._get_connection_manager().execute_query_on_dataset(organization, dataset, query_model)
+
+    def execute_query_on_dataset_arrow(self, organization: str, dataset: str, query_model: Dict[str, Any]) -> pa.Table:
+        return self._get_connection_manager().execute_query_on_dataset_arrow(organization, dataset, query_model)
+
+    def execute_sql_on_dataset_arrow(self, organization: str, dataset: str, sql: str) -> pa.Table:
+        return self._get_connection_manager().execute_sql_on_dataset_arrow(organization, dataset, sql)
+
+    def execute_query_with_progress(self, organization: str, dataset: str, query_model: Dict[str, Any],
+                                    on_progress: Callable[[float], None]) -> pa.Table:
+        return self._get_connection_manager().execute_query_with_progress(organization, dataset, query_model, on_progress)
+
+    def export_query_on_dataset(self, organization: str, dataset: str, query_model: Dict[str, Any], path: str,
+                                format: str, compression: Optional[str] = None,
+                                on_progress: Optional[Callable[[float], None]] = None) -> int:
+        return self._get_connection_manager().export_query_on_dataset(organization, dataset, query_model, path,
+                                                                      format, compression, on_progress)
+
+    def execute_queries_on_dataset_arrow(self, organization: str, dataset: str, query_models: List[Dict[str, Any]]) -> List[Union[pa.Table, Exception]]:
+        return self._get_connection_manager().execute_queries_on_dataset_arrow(organization, dataset, query_models)
+
+    def profile_query_on_dataset(self, organization: str, dataset: str, query_model: Dict[str, Any]) -> Tuple[pa.Table, Dict[str, Any]]:
+        return self._get_connection_manager().profile_query_on_dataset(organization, dataset, query_model)
+
+    def invalidate_dataset(self, organization: str, dataset: str):
+        if self.connection_manager:
+            self.connection_manager.invalidate_dataset(organization, dataset)
+
+    def _get_connection_manager(self):
         if not self.connection_manager:
-            self.connection_manager = ConnectionFactory.create_connection(db_type, self.database_config)
-        
-        return self.connection_manager.execute_query_on_dataset(organization, dataset, query_model)
+            self.connection_manager = ConnectionFactory.create_connection(self.database_config.get('type'), self.database_config)
+        return self.connection_manager
 
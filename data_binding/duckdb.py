@@ -1,112 +1,391 @@
 import os
+import json
+import time
+import logging
+import threading
 import duckdb
-from typing import List, Any, Dict
+import pyarrow as pa
+from typing import Callable, List, Any, Dict, Optional, Tuple, Union
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from data_binding.database_engine import ConnectionManager
-from utils.config_loader import load_dataset_definition, save_dataset_definition
-from datetime import datetime, date
+from utils.config_loader import load_config, load_dataset_definition, save_dataset_definition
+from data_binding.snapshot import snapshot_version, get_data_path
+from data_binding.pushdown import FULL_SQL, build_select
+from data_binding.export import EXPORT_BATCH_ROWS, copy_options, export_format, sql_path, write_batches
+from data_binding.joins import JoinSide, compile_from, split_dataset_name
+from data_binding.result_set import ResultSet
+from data_binding.profiling import run_profiled, summarize_duckdb_profile, parquet_stats
+from utils.metrics import stage, ROWS_RETURNED
+from utils.schema import DatasetSchema, dataset_schema
+
+slow_query_logger = logging.getLogger('dataflare.slow_query')
+
+DEFAULT_SLOW_QUERY_THRESHOLD_MS = 1000
+# Seconds between reads of a tracked query's progress
+PROGRESS_POLL_INTERVAL = 0.25
+
+# File extension -> DuckDB table function for files read in place through a view
+FILE_READERS = {
+    '.parquet': 'parquet_scan',
+    '.csv': 'read_csv_auto', '.tsv': 'read_csv_auto',
+    '.json': 'read_json_auto', '.jsonl': 'read_json_auto', '.ndjson': 'read_json_auto',
+}
+SQLITE_EXTENSIONS = ('.sqlite', '.sqlite3', '.db')
+
+
+def _slow_query_threshold_ms() -> float:
+    try:
+        return load_config().get('query', {}).get('slow_query_threshold_ms', DEFAULT_SLOW_QUERY_THRESHOLD_MS)
+    except FileNotFoundError:
+        return DEFAULT_SLOW_QUERY_THRESHOLD_MS
+
 
 class DuckDBConnectionManager(ConnectionManager):
+    capabilities = FULL_SQL
+
     def __init__(self, connection_config):
         super().__init__()
         self.connection_config = connection_config
         self.connection = None
+        self.slow_query_threshold_ms = connection_config.get('slow_query_threshold_ms', _slow_query_threshold_ms())
+        # table name -> (file path, snapshot version) currently bound to it
+        self.registered_snapshots = {}
+        # table name -> typed schema, for tables registered with one
+        self.dataset_schemas: Dict[str, DatasetSchema] = {}
+        # (organization, dataset) -> table name its snapshot is bound to
+        self.dataset_tables: Dict[Tuple[str, str], str] = {}
+        # Held while tables are (re)bound on the shared connection, which
+        # dataset event handlers do from their own thread
+        self._registration_lock = threading.RLock()
 
     def get_connection(self):
         if not self.connection:
-            self.connection = duckdb.connect(self.connection_config.get('database', ':memory:'))
+            self.connection = duckdb.connect(
+                self.connection_config.get('database', ':memory:'),
+                read_only=self.connection_config.get('read_only', False)
+            )
         return self.connection
 
     def close_connection(self):
-        if self.connection:
-            self.connection.close()
-            self.connection = None
+        with self._registration_lock:
+            if self.connection:
+                self.connection.close()
+                self.connection = None
+                self.registered_snapshots = {}
 
     def register_parquet_file(self, file_path: str, table_name: str):
-        conn = self.get_connection()
-        conn.execute(f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM parquet_scan('{file_path}')")
+        # A view keeps the data on disk: every worker process scans the same
+        # Parquet snapshot through the OS page cache instead of holding a copy.
+        self.register_file_view(file_path, table_name, 'parquet_scan')
+
+    def register_file_view(self, file_path: str, table_name: str, reader: str):
+        """Bind ``table_name`` to a file, directory or glob read in place by ``reader``."""
+        version = snapshot_version(file_path)
+        with self._registration_lock:
+            if self.registered_snapshots.get(table_name) == (file_path, version):
+                return
+            conn = self.get_connection()
+            with stage("table_registration"):
+                conn.execute(f"CREATE OR REPLACE VIEW {table_name} AS SELECT * FROM {reader}('{file_path}')")
+            self.registered_snapshots[table_name] = (file_path, version)
+
+    def register_duckdb_file(self, file_path: str, table_name: str, attach_type: str = None):
+        version = snapshot_version(file_path)
+        alias = f"{table_name}_snapshot"
+        options = f"TYPE {attach_type}, READ_ONLY" if attach_type else "READ_ONLY"
+        with self._registration_lock:
+            if self.registered_snapshots.get(table_name) == (file_path, version):
+                return
+            conn = self.get_connection()
+            with stage("table_registration"):
+                conn.execute(f"DROP VIEW IF EXISTS {table_name}")
+                conn.execute(f"DETACH DATABASE IF EXISTS {alias}")
+                conn.execute(f"ATTACH '{file_path}' AS {alias} ({options})")
+                conn.execute(f"CREATE VIEW {table_name} AS SELECT * FROM {alias}.{table_name}")
+            self.registered_snapshots[table_name] = (file_path, version)
+
+    def register_sqlite_file(self, file_path: str, table_name: str):
+        # Needs DuckDB's sqlite extension, installed on first use
+        self.register_duckdb_file(file_path, table_name, attach_type='sqlite')
 
-    def register_dataset(self, organization: str, dataset_name: str, schema: List[str]):
+    def register_dataset(self, organization: str, dataset_name: str,
+                         schema: Union[List[str], List[Dict[str, Any]], DatasetSchema]):
+        """
+        Create the table for a dataset and save its definition.
+
+        ``schema`` is either raw column DDL (``["id INTEGER", ...]``) or typed
+        columns as declared in dataset.yaml (a DatasetSchema or a list of
+        column dicts); typed tables get compact column types and validated
+        inserts.
+        """
         conn = self.get_connection()
-        schema_str = ', '.join(schema)
+        raw_ddl = isinstance(schema, list) and bool(schema) and isinstance(schema[0], str)
+        typed = None if raw_ddl else dataset_schema(schema)
+        if typed is not None:
+            self.dataset_schemas[dataset_name] = typed
+            schema_str = ', '.join(typed.duckdb_columns())
+            schema = typed.to_columns()
+        else:
+            schema_str = ', '.join(schema)
         conn.execute(f"CREATE TABLE IF NOT EXISTS {dataset_name} ({schema_str})")
         # Save the dataset definition
         save_dataset_definition(organization=organization, dataset_code=dataset_name, dataset_name=dataset_name, database=dataset_name,connection_config=self.connection_config.get('database', ':memory:'), schema=schema)
 
     def add_records(self, organization: str, dataset_name: str, records: List[Dict[str, Any]]):
         conn = self.get_connection()
-        if records:
-            columns = ', '.join(records[0].keys())
-            values = [tuple(record.values()) for record in records]
-            placeholders = ', '.join(['?' for _ in records[0]])
-            query = f"INSERT INTO {dataset_name} ({columns}) VALUES ({placeholders})"
-            conn.executemany(query, values)
+        if not records:
+            return
+        typed = self.dataset_schemas.get(dataset_name)
+        if typed is not None:
+            # Validated and cast as one Arrow table, inserted in a single statement
+            table = typed.coerce(pa.Table.from_pylist(records))
+            conn.register('_ingest', table)
+            try:
+                columns = ', '.join(f'"{name}"' for name in typed.names)
+                conn.execute(f"INSERT INTO {dataset_name} ({columns}) SELECT {columns} FROM _ingest")
+            finally:
+                conn.unregister('_ingest')
+            return
+        columns = ', '.join(records[0].keys())
+        values = [tuple(record.values()) for record in records]
+        placeholders = ', '.join(['?' for _ in records[0]])
+        query = f"INSERT INTO {dataset_name} ({columns}) VALUES ({placeholders})"
+        conn.executemany(query, values)
 
     def drop_dataset(self, organization: str, dataset_name: str):
         conn = self.get_connection()
         conn.execute(f"DROP TABLE IF EXISTS {dataset_name}")
 
-    def execute_query_on_dataset(self, organization: str, dataset_name: str, query_model: Dict[str, Any]):
+    def execute_query_on_dataset(self, organization: str, dataset_name: str, query_model: Dict[str, Any]) -> ResultSet:
+        return self.execute_query(self._bind_dataset(organization, dataset_name, query_model))
+
+    def execute_query_on_dataset_arrow(self, organization: str, dataset_name: str, query_model: Dict[str, Any]) -> pa.Table:
+        return self.execute_query_arrow(self._bind_dataset(organization, dataset_name, query_model))
+
+    def execute_sql_on_dataset_arrow(self, organization: str, dataset_name: str, sql: str) -> pa.Table:
+        # Binding only re-registers the table when a new snapshot was published
+        self._bind_dataset(organization, dataset_name, {})
+        cursor = self.get_connection().cursor()
+        try:
+            return self._execute_sql(cursor, sql)
+        finally:
+            cursor.close()
+
+    def execute_query_with_progress(self, organization: str, dataset_name: str, query_model: Dict[str, Any],
+                                    on_progress: Callable[[float], None]) -> pa.Table:
+        query_model = self._bind_dataset(organization, dataset_name, query_model)
+        with stage("sql_build"):
+            query = self._build_query(query_model)
+        cursor = self.get_connection().cursor()
+        try:
+            with self._tracking_progress(cursor, on_progress):
+                return self._execute_sql(cursor, query)
+        finally:
+            cursor.close()
+
+    def export_query_on_dataset(self, organization: str, dataset_name: str, query_model: Dict[str, Any], path: str,
+                                format: str, compression: Optional[str] = None,
+                                on_progress: Optional[Callable[[float], None]] = None) -> int:
+        """
+        Write the result with ``COPY ... TO`` (Parquet, CSV), or as Arrow
+        record batches streamed to the file, so rows never reach Python.
+        """
+        spec = export_format(format)
+        # Checked before the query runs
+        spec.compression(compression)
+        query_model = self._bind_dataset(organization, dataset_name, query_model)
+        with stage("sql_build"):
+            query = self._build_query(query_model)
+            statement = None if spec.name == 'arrow' else f"COPY ({query}) TO {sql_path(path)} ({copy_options(format, compression)})"
+        cursor = self.get_connection().cursor()
+        try:
+            with self._tracking_progress(cursor, on_progress), stage("duckdb_export"):
+                if statement is None:
+                    result = cursor.execute(query)
+                    return write_batches(result.to_arrow_reader(EXPORT_BATCH_ROWS), path, compression)
+                # COPY returns the number of rows written
+                return cursor.execute(statement).fetchone()[0]
+        finally:
+            cursor.close()
+
+    @contextmanager
+    def _tracking_progress(self, cursor, on_progress: Optional[Callable[[float], None]]):
+        """Report the fraction done of the query running on ``cursor`` until the block exits."""
+        if on_progress is None:
+            yield
+            return
+        # Progress is tracked from the start, without printing a progress bar
+        cursor.execute("SET enable_progress_bar = true; SET enable_progress_bar_print = false; "
+                       "SET progress_bar_time = 0")
+        done = threading.Event()
+
+        def poll():
+            while not done.wait(PROGRESS_POLL_INTERVAL):
+                percent = cursor.query_progress()
+                # -1 until DuckDB can estimate it
+                if percent >= 0:
+                    on_progress(min(percent, 100.0) / 100)
+
+        poller = threading.Thread(target=poll, name='query-progress', daemon=True)
+        poller.start()
+        try:
+            yield
+        finally:
+            done.set()
+            poller.join()
+
+    def execute_queries_on_dataset_arrow(self, organization: str, dataset_name: str, query_models: List[Dict[str, Any]]) -> List[Union[pa.Table, Exception]]:
+        # Bind the snapshot once, then run every query on its own cursor of the
+        # shared connection; DuckDB releases the GIL while executing.
+        query_models = [self._bind_dataset(organization, dataset_name, query_model) for query_model in query_models]
+        conn = self.get_connection()
+
+        def run(query_model):
+            cursor = conn.cursor()
+            try:
+                return self.execute_query_arrow(query_model, cursor)
+            except Exception as e:
+                return e
+            finally:
+                cursor.close()
+
+        if len(query_models) <= 1:
+            return [run(query_model) for query_model in query_models]
+        max_workers = min(len(query_models), self.connection_config.get('batch_workers') or os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(run, query_models))
+
+    def invalidate_dataset(self, organization: str, dataset_name: str):
+        # The next query re-reads the definition and re-binds the snapshot
+        with self._registration_lock:
+            table_name = self.dataset_tables.pop((organization, dataset_name), None)
+            if table_name is not None:
+                self.registered_snapshots.pop(table_name, None)
+
+    def _bind_dataset(self, organization: str, dataset_name: str, query_model: Dict[str, Any]) -> Dict[str, Any]:
         # Load dataset configuration
         dataset_config = load_dataset_definition(organization, dataset_name)
         database_config = dataset_config.get('database', {})
         
-        # Register parquet file if it exists
-        parquet_file = database_config.get('file')
+        # Bind the published snapshot, or external files attached in place;
+        # re-bound only when a new snapshot is published
+        full_path = get_data_path(organization, dataset_name, database_config)
         table_name = database_config.get('table', dataset_name)
-        if parquet_file:
-            full_path = os.path.join('datasets', organization, dataset_name, 'data', parquet_file)
-            self.register_parquet_file(full_path, table_name)
+        if full_path:
+            extension = os.path.splitext(full_path)[1].lower()
+            with self._registration_lock:
+                if extension == '.duckdb':
+                    self.register_duckdb_file(full_path, table_name)
+                elif extension in SQLITE_EXTENSIONS:
+                    self.register_sqlite_file(full_path, table_name)
+                else:
+                    reader = FILE_READERS.get(extension) or FILE_READERS.get(f".{database_config.get('format', 'parquet')}")
+                    self.register_file_view(full_path, table_name, reader or 'parquet_scan')
+                self.dataset_tables[(organization, dataset_name)] = table_name
         
         # Set the table name in the query model
         query_model['table'] = table_name
+
+        if query_model.get('join'):
+            query_model['table'] = self._bind_joins(JoinSide(organization, dataset_name, table_name, dataset_config),
+                                                    query_model.pop('join'))
         
-        return self.execute_query(query_model)
+        return query_model
 
-    def execute_query(self, query_model):
-        conn = self.get_connection()
+    def _bind_joins(self, base: JoinSide, joins: List[Dict[str, Any]]) -> str:
+        # Joined datasets are bound on this connection too, so the join is one query
+        sides = []
+        for join in joins:
+            organization, dataset_name = split_dataset_name(join['dataset'])
+            table_name = self._bind_dataset(organization, dataset_name, {})['table']
+            side = JoinSide(organization, dataset_name, table_name,
+                            load_dataset_definition(organization, dataset_name), join.get('alias'))
+            sides.append((side, list(join.get('on') or []), join.get('how') or 'inner'))
+        tables = [base.table] + [side.table for side, _, _ in sides]
+        if len(set(tables)) != len(tables):
+            raise ValueError(f"Joined datasets must be bound to distinct tables, got {', '.join(tables)}")
+        return compile_from(base, sides)
+
+    def execute_query(self, query_model) -> ResultSet:
+        return ResultSet(self.execute_query_arrow(query_model))
+
+    def execute_query_arrow(self, query_model, connection=None) -> pa.Table:
+        # Without a connection the query runs on a cursor of its own: a DuckDB
+        # connection holds one pending result, so callers on other threads
+        # sharing it would fetch each other's rows.
+        start = time.perf_counter()
+        with stage("sql_build"):
+            query = self._build_query(query_model)
+        if connection is not None:
+            return self._execute_sql(connection, query, start)
+        cursor = self.get_connection().cursor()
+        try:
+            return self._execute_sql(cursor, query, start)
+        finally:
+            cursor.close()
+
+    def _execute_sql(self, conn, query: str, start: float = None) -> pa.Table:
+        built = time.perf_counter()
+        start = built if start is None else start
+        with stage("duckdb_execute"):
+            result = conn.execute(query)
+            table = result.to_arrow_table()
+        ROWS_RETURNED.inc(table.num_rows)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if elapsed_ms >= self.slow_query_threshold_ms:
+            self._log_slow_query(conn, query, table.num_rows, {
+                'sql_build': (built - start) * 1000,
+                'duckdb_execute': elapsed_ms - (built - start) * 1000,
+            })
+        return table
+
+    def profile_query_on_dataset(self, organization: str, dataset_name: str, query_model: Dict[str, Any]) -> Tuple[pa.Table, Dict[str, Any]]:
+        stages_ms = {}
+        start = time.perf_counter()
+        query_model = self._bind_dataset(organization, dataset_name, query_model)
+        stages_ms['bind'] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
         query = self._build_query(query_model)
-        result = conn.execute(query).fetchall()
-        columns = self._get_query_columns(query_model)
-        return [self._serialize_row(dict(zip(columns, row))) for row in result]
+        stages_ms['sql_build'] = (time.perf_counter() - start) * 1000
+
+        cursor = self.get_connection().cursor()
+        try:
+            start = time.perf_counter()
+            table, raw_profile = run_profiled(cursor, query)
+            stages_ms['duckdb_execute'] = (time.perf_counter() - start) * 1000
+        finally:
+            cursor.close()
+        ROWS_RETURNED.inc(table.num_rows)
+
+        snapshot = self.registered_snapshots.get(query_model['table'])
+        return table, {
+            'sql': query,
+            'stages_ms': {name: round(value, 3) for name, value in stages_ms.items()},
+            'duckdb': summarize_duckdb_profile(raw_profile),
+            'parquet': parquet_stats(self.get_connection(), snapshot[0]) if snapshot and snapshot[0].endswith('.parquet') else None,
+        }
+
+    def _log_slow_query(self, conn, query: str, rows: int, stages_ms: Dict[str, float]):
+        # EXPLAIN only plans the query, so logging never re-executes it
+        try:
+            plan = '\n'.join(row[1] for row in conn.execute(f"EXPLAIN {query}").fetchall())
+        except Exception as e:
+            plan = f"unavailable: {e}"
+        slow_query_logger.warning("%s", json.dumps({
+            'sql': query,
+            'rows': rows,
+            'total_ms': round(sum(stages_ms.values()), 3),
+            'stages_ms': {name: round(value, 3) for name, value in stages_ms.items()},
+            'plan': plan,
+        }))
 
     def _build_query(self, query_model):
-        fields = self._get_query_columns(query_model)
-        fields_str = ', '.join(fields)
-        query = f"SELECT {fields_str} FROM {query_model['table']}"
-        
-        if 'where' in query_model:
-            query += f" WHERE {query_model['where']}"
-        
-        if 'order_by' in query_model:
-            order_by = query_model['order_by']
-            if isinstance(order_by, list):
-                order_by = ', '.join(order_by)
-            query += f" ORDER BY {order_by}"
-        
-        if 'limit' in query_model:
-            query += f" LIMIT {query_model['limit']}"
-        
-        return query
-
-    def _get_query_columns(self, query_model):
-        if 'select' in query_model:
-            return query_model['select']
-        elif 'measures' in query_model or 'dimensions' in query_model:
-            measures = query_model.get('measures', [])
-            dimensions = query_model.get('dimensions', [])
-            return measures + dimensions
-        else:
-            return ['*']
+        return build_select(query_model)
 
     def _get_all_fields(self, table: str) -> List[str]:
         schema_query = f"PRAGMA table_info({table})"
         schema = self.get_connection().execute(schema_query).fetchall()
         return [col[1] for col in schema]  # col[1] is the column name
-
-    def _serialize_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
-        return {k: self._serialize_value(v) for k, v in row.items()}
-
-    def _serialize_value(self, value: Any) -> Any:
-        if isinstance(value, (datetime, date)):
-            return value.isoformat()
-        return value
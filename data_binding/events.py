@@ -0,0 +1,185 @@
+import os
+import json
+import time
+import threading
+import logging
+from typing import Any, Callable, Dict, List, Optional
+from utils.config_loader import load_config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EVENT_LOG = os.path.join('.cache', 'dataset_events.jsonl')
+# The log is restarted once it grows past this; watchers notice the new inode
+MAX_EVENT_LOG_BYTES = 1024 * 1024
+
+
+class DatasetEvent:
+    """A new version of ``organization/dataset`` was published."""
+
+    def __init__(self, organization: str, dataset: str, version: Optional[List[int]] = None,
+                 path: Optional[str] = None, published_at: Optional[float] = None):
+        self.organization = organization
+        self.dataset = dataset
+        self.version = list(version) if version else None
+        self.path = path
+        self.published_at = published_at if published_at is not None else time.time()
+
+    @property
+    def key(self) -> str:
+        return f"{self.organization}/{self.dataset}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'organization': self.organization, 'dataset': self.dataset, 'version': self.version,
+                'path': self.path, 'published_at': self.published_at}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'DatasetEvent':
+        return cls(data['organization'], data['dataset'], data.get('version'), data.get('path'), data.get('published_at'))
+
+    def __repr__(self):
+        return f"DatasetEvent({self.key}, version={self.version})"
+
+
+class InvalidationBus:
+    """
+    In-process fan-out of dataset events to the caches that depend on them.
+
+    A failing subscriber is logged and does not stop delivery to the others.
+    """
+
+    def __init__(self):
+        self._subscribers: List[Callable[[DatasetEvent], None]] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback: Callable[[DatasetEvent], None]) -> Callable[[], None]:
+        """Register ``callback``; returns a function that unsubscribes it."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+    def publish(self, event: DatasetEvent):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception:
+                logger.exception("Invalidation subscriber failed for %s", event)
+
+
+bus = InvalidationBus()
+
+
+def event_log_path() -> str:
+    try:
+        return load_config().get('invalidation', {}).get('event_log') or DEFAULT_EVENT_LOG
+    except FileNotFoundError:
+        return DEFAULT_EVENT_LOG
+
+
+def publish_dataset_event(organization: str, dataset: str, version: Optional[List[int]] = None,
+                          path: Optional[str] = None, log_path: Optional[str] = None) -> DatasetEvent:
+    """
+    Announce that a new version of a dataset was published.
+
+    The event is delivered to this process's ``bus`` and appended to the event
+    log, which API processes follow with an ``EventLogWatcher``. One short
+    ``O_APPEND`` write per event keeps concurrent publishers from interleaving.
+    """
+    event = DatasetEvent(organization, dataset, version, path)
+    log_path = log_path or event_log_path()
+    try:
+        os.makedirs(os.path.dirname(log_path) or '.', exist_ok=True)
+        if os.path.exists(log_path) and os.path.getsize(log_path) > MAX_EVENT_LOG_BYTES:
+            # Restart the log: watchers see the new inode and read it from the start
+            tmp_path = f"{log_path}.{os.getpid()}.tmp"
+            open(tmp_path, 'w').close()
+            os.replace(tmp_path, log_path)
+        fd = os.open(log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, (json.dumps(event.to_dict()) + '\n').encode('utf-8'))
+        finally:
+            os.close(fd)
+    except OSError as e:
+        # Publishing the data succeeded; a missed event only delays invalidation
+        logger.error(f"Could not record dataset event for {event.key}: {str(e)}")
+    bus.publish(event)
+    return event
+
+
+class EventLogWatcher:
+    """
+    Follow the dataset event log and publish new events on a bus.
+
+    Only events appended after ``start`` are delivered. Each poll is one
+    ``os.stat`` when nothing changed; a restarted log (new inode or smaller
+    size) is read again from the beginning.
+    """
+
+    def __init__(self, target: InvalidationBus = None, log_path: Optional[str] = None, interval: float = 0.5):
+        self.bus = target or bus
+        self.log_path = log_path or event_log_path()
+        self.interval = interval
+        self._inode: Optional[int] = None
+        self._offset = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._inode, self._offset = self._position()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='dataset-event-watcher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _position(self):
+        try:
+            st = os.stat(self.log_path)
+        except FileNotFoundError:
+            return None, 0
+        return st.st_ino, st.st_size
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Error reading dataset event log %s", self.log_path)
+
+    def poll(self) -> List[DatasetEvent]:
+        """Publish the events appended since the last poll and return them."""
+        inode, size = self._position()
+        if inode is None:
+            self._inode, self._offset = None, 0
+            return []
+        if inode != self._inode or size < self._offset:
+            self._inode, self._offset = inode, 0
+        if size == self._offset:
+            return []
+
+        with open(self.log_path, 'rb') as f:
+            f.seek(self._offset)
+            chunk = f.read(size - self._offset)
+        # A line still being written is picked up by the next poll
+        complete = chunk[:chunk.rfind(b'\n') + 1]
+        self._offset += len(complete)
+
+        events = []
+        for line in complete.splitlines():
+            try:
+                events.append(DatasetEvent.from_dict(json.loads(line)))
+            except (ValueError, KeyError):
+                logger.warning("Skipping malformed dataset event: %r", line)
+        for event in events:
+            self.bus.publish(event)
+        return events
@@ -0,0 +1,98 @@
+import os
+from typing import Optional, Tuple
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+# Rows per record batch when a result is streamed to a file
+EXPORT_BATCH_ROWS = 1 << 17
+
+
+class ExportFormat:
+    """A file format results are exported in, with the compressions it supports."""
+
+    def __init__(self, name: str, extension: str, media_type: str, compressions: Tuple[str, ...], default: str):
+        self.name = name
+        self.extension = extension
+        self.media_type = media_type
+        self.compressions = compressions
+        self.default = default
+
+    def compression(self, compression: Optional[str]) -> str:
+        compression = (compression or self.default).lower()
+        if compression not in self.compressions:
+            raise ValueError(f"Unsupported {self.name} compression '{compression}'; "
+                             f"use one of {', '.join(self.compressions)}")
+        return compression
+
+    def filename(self, stem: str, compression: Optional[str] = None) -> str:
+        # Parquet and Arrow compress inside the file; CSV is compressed whole
+        suffix = {'gzip': '.gz', 'zstd': '.zst'}.get(self.compression(compression), '') if self.name == 'csv' else ''
+        return f"{stem}.{self.extension}{suffix}"
+
+    def content_type(self, compression: Optional[str] = None) -> str:
+        if self.name == 'csv':
+            return {'gzip': 'application/gzip', 'zstd': 'application/zstd'}.get(self.compression(compression),
+                                                                               self.media_type)
+        return self.media_type
+
+
+# Already compressed; responses of these types are not compressed again
+COMPRESSED_MEDIA_TYPES = ('application/vnd.apache.parquet', 'application/gzip', 'application/zstd')
+
+EXPORT_FORMATS = {
+    'parquet': ExportFormat('parquet', 'parquet', 'application/vnd.apache.parquet',
+                            ('zstd', 'snappy', 'gzip', 'lz4', 'uncompressed'), 'zstd'),
+    'csv': ExportFormat('csv', 'csv', 'text/csv', ('none', 'gzip', 'zstd'), 'none'),
+    'arrow': ExportFormat('arrow', 'arrows', 'application/vnd.apache.arrow.stream', ('none', 'lz4', 'zstd'), 'none'),
+}
+
+
+def export_format(format: str) -> ExportFormat:
+    try:
+        return EXPORT_FORMATS[(format or '').lower()]
+    except KeyError:
+        raise ValueError(f"Unsupported export format '{format}'; use one of {', '.join(EXPORT_FORMATS)}")
+
+
+def copy_options(format: str, compression: Optional[str] = None) -> str:
+    """The options of a DuckDB ``COPY ... TO`` writing ``format``; Arrow has no COPY writer."""
+    spec = export_format(format)
+    compression = spec.compression(compression)
+    if spec.name == 'parquet':
+        return f"FORMAT parquet, COMPRESSION {compression}"
+    if spec.name == 'csv':
+        return f"FORMAT csv, HEADER true, COMPRESSION {compression}"
+    raise ValueError(f"DuckDB cannot COPY to {spec.name}; stream its record batches instead")
+
+
+def write_batches(reader: pa.RecordBatchReader, path: str, compression: Optional[str] = None) -> int:
+    """Write a stream of record batches as an Arrow IPC stream; returns the rows written."""
+    compression = EXPORT_FORMATS['arrow'].compression(compression)
+    options = pa.ipc.IpcWriteOptions(compression=None if compression == 'none' else compression)
+    rows = 0
+    with pa.OSFile(path, 'wb') as sink, pa.ipc.new_stream(sink, reader.schema, options=options) as writer:
+        for batch in reader:
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
+
+
+def write_table(table: pa.Table, path: str, format: str, compression: Optional[str] = None) -> int:
+    """Export an Arrow table, for backends without a native writer; returns the rows written."""
+    spec = export_format(format)
+    compression = spec.compression(compression)
+    if spec.name == 'parquet':
+        pq.write_table(table, path, compression='none' if compression == 'uncompressed' else compression)
+    elif spec.name == 'csv':
+        with pa.CompressedOutputStream(path, compression) if compression != 'none' else pa.OSFile(path, 'wb') as sink:
+            pa_csv.write_csv(table, sink)
+    else:
+        write_batches(pa.RecordBatchReader.from_batches(table.schema, table.to_batches(EXPORT_BATCH_ROWS)),
+                      path, compression)
+    return table.num_rows
+
+
+def sql_path(path: str) -> str:
+    """``path`` as a SQL string literal."""
+    return "'" + os.path.abspath(path).replace("'", "''") + "'"
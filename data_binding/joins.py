@@ -0,0 +1,80 @@
+from typing import Any, Dict, List, Tuple
+from utils.schema import schema_columns
+
+JOIN_TYPES = {'inner': 'JOIN', 'left': 'LEFT JOIN', 'right': 'RIGHT JOIN', 'full': 'FULL OUTER JOIN'}
+
+
+def join_keys(definition: Dict[str, Any]) -> Dict[str, str]:
+    """
+    The ``join_keys`` of a dataset definition: key name -> SQL expression over
+    the dataset's columns. Datasets declaring the same key can be joined on it,
+    e.g. ``year: year`` in one and ``year: year(date)`` in another.
+    """
+    return {str(key): str(expression) for key, expression in dict(definition.get('join_keys') or {}).items()}
+
+
+def split_dataset_name(name: str) -> Tuple[str, str]:
+    organization, _, dataset = name.partition('/')
+    if not organization or not dataset:
+        raise ValueError(f"Join dataset must be given as 'organization/dataset', got '{name}'")
+    return organization, dataset
+
+
+class JoinSide:
+    """One dataset of a join: its bound table, alias and declared join keys."""
+
+    def __init__(self, organization: str, dataset: str, table: str, definition: Dict[str, Any], alias: str = None):
+        self.organization = organization
+        self.dataset = dataset
+        self.table = table
+        self.alias = alias or table
+        self.keys = join_keys(definition)
+        self.columns = [column['name'] if isinstance(column, dict) else str(column).split()[0]
+                        for column in schema_columns(definition)]
+
+    def key(self, name: str) -> str:
+        if name not in self.keys:
+            declared = ', '.join(sorted(self.keys)) or 'none'
+            raise ValueError(f"Dataset {self.organization}/{self.dataset} declares no join key '{name}' "
+                             f"(join_keys: {declared})")
+        return self.keys[name]
+
+    def relation(self, used: List[str]) -> str:
+        # Keys that are not plain columns are computed once, as a named column
+        # of the relation, so they can be selected like any other column
+        computed = []
+        for name in used:
+            expression = self.key(name)
+            if expression == name:
+                continue
+            if name in self.columns:
+                raise ValueError(f"Join key '{name}' of {self.organization}/{self.dataset} shadows a column "
+                                 f"of the same name")
+            computed.append(f'{expression} AS "{name}"')
+        if not computed:
+            return f"{self.table} AS {self.alias}"
+        return f"(SELECT *, {', '.join(computed)} FROM {self.table}) AS {self.alias}"
+
+
+def compile_from(base: JoinSide, joins: List[Tuple[JoinSide, List[str], str]]) -> str:
+    """
+    The ``FROM`` clause joining ``base`` with each ``(side, keys, how)``.
+
+    Every side is a registered view, so the whole join runs as one DuckDB
+    query: the engine picks hash joins and pushes projections into each scan.
+    """
+    aliases = [base.alias] + [side.alias for side, _, _ in joins]
+    duplicates = sorted({alias for alias in aliases if aliases.count(alias) > 1})
+    if duplicates:
+        raise ValueError(f"Joined datasets need distinct aliases; {', '.join(duplicates)} is used twice")
+
+    base_keys = sorted({key for _, keys, _ in joins for key in keys})
+    clause = base.relation(base_keys)
+    for side, keys, how in joins:
+        if how not in JOIN_TYPES:
+            raise ValueError(f"Unsupported join type '{how}'; use one of {', '.join(JOIN_TYPES)}")
+        if not keys:
+            raise ValueError(f"Join with {side.organization}/{side.dataset} names no keys")
+        condition = ' AND '.join(f'{base.alias}."{key}" = {side.alias}."{key}"' for key in keys)
+        clause += f" {JOIN_TYPES[how]} {side.relation(keys)} ON {condition}"
+    return clause
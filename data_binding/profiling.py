@@ -0,0 +1,77 @@
+import json
+import os
+import tempfile
+from typing import Any, Dict, List, Optional
+
+
+def _operator_name(node: Dict[str, Any]) -> str:
+    # Key names changed across DuckDB releases
+    return node.get('operator_name') or node.get('operator_type') or node.get('name', '')
+
+
+def _flatten_operators(node: Dict[str, Any], depth: int, operators: List[Dict[str, Any]]):
+    for child in node.get('children', []):
+        operators.append({
+            'operator': _operator_name(child),
+            'depth': depth,
+            'time_ms': round(child.get('operator_timing', child.get('timing', 0.0)) * 1000, 3),
+            'rows': child.get('operator_cardinality', child.get('cardinality')),
+            'rows_scanned': child.get('operator_rows_scanned'),
+            'extra_info': child.get('extra_info'),
+        })
+        _flatten_operators(child, depth + 1, operators)
+
+
+def summarize_duckdb_profile(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce DuckDB's JSON profiling output to totals plus a flat operator list."""
+    operators: List[Dict[str, Any]] = []
+    _flatten_operators(raw, 0, operators)
+    latency = raw.get('latency', raw.get('timing'))
+    return {
+        'latency_ms': round(latency * 1000, 3) if latency is not None else None,
+        'cpu_time_ms': round(raw['cpu_time'] * 1000, 3) if 'cpu_time' in raw else None,
+        'rows_returned': raw.get('rows_returned'),
+        'rows_scanned': raw.get('cumulative_rows_scanned'),
+        'bytes_read': raw.get('total_bytes_read'),
+        'operators': operators,
+    }
+
+
+def run_profiled(cursor, query: str):
+    """
+    Execute ``query`` on ``cursor`` with DuckDB's JSON profiler enabled.
+
+    Returns the fetched Arrow table and the raw profile. The profiler is
+    scoped to the cursor so other queries on the connection are unaffected.
+    """
+    fd, output_path = tempfile.mkstemp(prefix='dataflare-profile-', suffix='.json')
+    os.close(fd)
+    try:
+        cursor.execute("PRAGMA enable_profiling='json'")
+        cursor.execute(f"PRAGMA profiling_output='{output_path}'")
+        table = cursor.execute(query).to_arrow_table()
+        cursor.execute("PRAGMA disable_profiling")
+        with open(output_path) as f:
+            raw = json.load(f)
+    finally:
+        os.remove(output_path)
+    return table, raw
+
+
+def parquet_stats(connection, file_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Row-group layout of a Parquet snapshot, to read alongside the profile's
+    ``rows_scanned``: scanning fewer rows than ``rows_total`` means row groups
+    were skipped through min/max statistics.
+    """
+    try:
+        row_groups, rows_total = connection.execute(f"""
+            SELECT count(*), sum(num_rows) FROM (
+                SELECT row_group_id, any_value(row_group_num_rows) AS num_rows
+                FROM parquet_metadata('{file_path}')
+                GROUP BY row_group_id
+            )
+        """).fetchone()
+    except Exception:
+        return None
+    return {'file': file_path, 'row_groups_total': row_groups, 'rows_total': rows_total}
@@ -0,0 +1,242 @@
+import re
+import json
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+import pyarrow as pa
+from data_binding.timeseries import has_series, build_series_select
+
+if TYPE_CHECKING:
+    # pyarrow.dataset roughly doubles `import app`; it is loaded by the first scan
+    import pyarrow.dataset as ds
+
+
+class Capabilities:
+    """
+    What a backend evaluates itself when it runs a query model.
+
+    SQL backends take the whole query. Scan backends declare the parts they
+    can push into the scan (column projection, simple filters, a row limit);
+    the rest of the query runs over the scanned Arrow table with ``apply_residual``.
+    """
+
+    def __init__(self, sql: bool = False, projection: bool = False, filters: bool = False,
+                 aggregates: bool = False, order_by: bool = False, limit: bool = False, joins: bool = False,
+                 windows: bool = False):
+        self.sql = sql
+        self.projection = projection
+        self.filters = filters
+        self.aggregates = aggregates
+        self.order_by = order_by
+        self.limit = limit
+        # Joins with other catalog datasets in the same query
+        self.joins = joins
+        # Time-series operators (``series``, ``resample``) compiled to window functions
+        self.windows = windows
+
+    def to_dict(self) -> Dict[str, bool]:
+        return dict(vars(self))
+
+    def __repr__(self):
+        return f"Capabilities({', '.join(name for name, value in vars(self).items() if value)})"
+
+
+FULL_SQL = Capabilities(sql=True, projection=True, filters=True, aggregates=True, order_by=True, limit=True,
+                        joins=True, windows=True)
+
+
+def query_columns(query_model: Dict[str, Any]) -> List[str]:
+    if query_model.get('select'):
+        return list(query_model['select'])
+    elif 'measures' in query_model or 'dimensions' in query_model:
+        return list(query_model.get('measures', [])) + list(query_model.get('dimensions', []))
+    return ['*']
+
+
+def build_select(query_model: Dict[str, Any], table: Optional[str] = None) -> str:
+    """The ``SELECT`` for a query model; the dialect is common to DuckDB and SQLite."""
+    if has_series(query_model):
+        # Window functions, gap filling and IGNORE NULLS: DuckDB only
+        return build_series_select(query_model, table)
+    query = f"SELECT {', '.join(query_columns(query_model))} FROM {table or query_model['table']}"
+
+    if query_model.get('where'):
+        query += f" WHERE {query_model['where']}"
+
+    if query_model.get('group_by'):
+        query += f" GROUP BY {', '.join(query_model['group_by'])}"
+
+    if query_model.get('order_by'):
+        order_by = query_model['order_by']
+        if isinstance(order_by, (list, tuple)):
+            order_by = ', '.join(order_by)
+        query += f" ORDER BY {order_by}"
+
+    if query_model.get('limit') is not None:
+        query += f" LIMIT {query_model['limit']}"
+
+    return query
+
+
+SERIES_KEYS = ('time_column', 'partition_by', 'series', 'resample')
+
+_IDENTIFIER = r'"?([A-Za-z_][A-Za-z0-9_]*)"?'
+_LITERAL = r"(-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?|'(?:[^']|'')*')"
+_COMPARISON = re.compile(rf"^\s*{_IDENTIFIER}\s*(<=|>=|<>|!=|==|=|<|>)\s*{_LITERAL}\s*$")
+_IN_LIST = re.compile(rf"^\s*{_IDENTIFIER}\s+(NOT\s+)?IN\s*\(\s*({_LITERAL}(?:\s*,\s*{_LITERAL})*)\s*\)\s*$", re.I)
+_NULL_CHECK = re.compile(rf"^\s*{_IDENTIFIER}\s+IS\s+(NOT\s+)?NULL\s*$", re.I)
+_OPERATORS = {
+    '=': lambda field, value: field == value, '==': lambda field, value: field == value,
+    '!=': lambda field, value: field != value, '<>': lambda field, value: field != value,
+    '<': lambda field, value: field < value, '<=': lambda field, value: field <= value,
+    '>': lambda field, value: field > value, '>=': lambda field, value: field >= value,
+}
+
+
+def _literal(text: str) -> Any:
+    if text.startswith("'"):
+        return text[1:-1].replace("''", "'")
+    return float(text) if any(c in text for c in '.eE') else int(text)
+
+
+def _conjuncts(where: Optional[str]) -> List[str]:
+    """Split ``where`` on its top-level ANDs; a top-level OR keeps it whole."""
+    if not where:
+        return []
+    # Blank out string literals so only the predicate structure is inspected
+    masked = re.sub(r"'(?:[^']|'')*'", lambda m: "'" + '_' * (len(m.group()) - 2) + "'", where)
+    parts, start, depth, in_between = [], 0, 0, False
+    for match in re.finditer(r"\(|\)|\b(?:AND|OR|BETWEEN)\b", masked, re.I):
+        token = match.group().upper()
+        if token == '(':
+            depth += 1
+        elif token == ')':
+            depth -= 1
+        elif depth:
+            continue
+        elif token == 'OR':
+            return [where]
+        elif token == 'BETWEEN':
+            in_between = True
+        elif in_between:
+            # The AND of `x BETWEEN a AND b`
+            in_between = False
+        else:
+            parts.append(where[start:match.start()].strip())
+            start = match.end()
+    parts.append(where[start:].strip())
+    return parts
+
+
+def _scalar(value: Any, field_type: pa.DataType) -> pa.Scalar:
+    scalar = pa.scalar(value)
+    if pa.types.is_dictionary(field_type):
+        field_type = field_type.value_type
+    return scalar if scalar.type == field_type else scalar.cast(field_type)
+
+
+def filter_expression(conjunct: str, schema: pa.Schema) -> Optional['ds.Expression']:
+    """A pyarrow expression for one simple predicate, or None if it cannot be pushed down."""
+    import pyarrow.compute as pc
+    try:
+        match = _COMPARISON.match(conjunct)
+        if match and match.group(1) in schema.names:
+            name, op, literal = match.groups()
+            return _OPERATORS[op](pc.field(name), _scalar(_literal(literal), schema.field(name).type))
+        match = _IN_LIST.match(conjunct)
+        if match and match.group(1) in schema.names:
+            name, negated = match.group(1), match.group(2)
+            values = [_literal(value) for value in re.findall(_LITERAL, match.group(3))]
+            value_type = schema.field(name).type
+            value_type = value_type.value_type if pa.types.is_dictionary(value_type) else value_type
+            expression = pc.field(name).isin(pa.array(values).cast(value_type))
+            return ~expression if negated else expression
+        match = _NULL_CHECK.match(conjunct)
+        if match and match.group(1) in schema.names:
+            expression = pc.field(match.group(1)).is_null()
+            return ~expression if match.group(2) else expression
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError, ValueError, OverflowError):
+        pass
+    return None
+
+
+class ScanPlan:
+    """How a query model is split between a scan backend and the residual query."""
+
+    def __init__(self, columns: Optional[List[str]], filter: Optional['ds.Expression'],
+                 limit: Optional[int], residual: Optional[Dict[str, Any]], pushed: Dict[str, Any]):
+        self.columns = columns
+        self.filter = filter
+        self.limit = limit
+        self.residual = residual
+        self.pushed = pushed
+
+
+def plan_scan(query_model: Dict[str, Any], schema: pa.Schema, capabilities: Capabilities) -> ScanPlan:
+    """
+    Push as much of ``query_model`` into a scan as ``capabilities`` allow.
+
+    Simple predicates (``col <op> literal``, ``IN``, ``IS [NOT] NULL``) of a
+    flat ``AND`` chain become a scan filter; the scan reads only the columns
+    the query mentions; a limit is pushed when nothing else runs after the
+    scan. Whatever is left is returned as ``residual``.
+    """
+    select = query_columns(query_model)
+    # Computed columns and aggregates always run in the residual query
+    plain_select = all(column == '*' or column in schema.names for column in select)
+
+    filters, residual_where = [], []
+    for conjunct in _conjuncts(query_model.get('where')):
+        expression = filter_expression(conjunct, schema) if capabilities.filters else None
+        if expression is None:
+            residual_where.append(conjunct)
+        else:
+            filters.append(expression)
+
+    order_by = query_model.get('order_by')
+    group_by = list(query_model.get('group_by') or [])
+    limit = query_model.get('limit')
+    series = has_series(query_model)
+    needs_residual = (bool(residual_where) or not plain_select or bool(group_by) or series
+                      or (bool(order_by) and not capabilities.order_by))
+    pushed_limit = limit if capabilities.limit and not needs_residual else None
+
+    columns = None
+    if capabilities.projection and '*' not in select:
+        if needs_residual:
+            text = ' '.join(select + residual_where + group_by + list(order_by or []))
+            if series:
+                text += ' ' + json.dumps([query_model.get(key) for key in SERIES_KEYS])
+            columns = [name for name in schema.names if re.search(rf'\b{re.escape(name)}\b', text)]
+            # e.g. count(*) names no column, but still needs every row
+            columns = columns or schema.names[:1] or None
+        else:
+            columns = select
+
+    residual = None
+    if needs_residual or (limit is not None and pushed_limit is None):
+        residual = {'select': select, 'where': ' AND '.join(f'({c})' for c in residual_where) or None,
+                    'group_by': group_by, 'order_by': order_by, 'limit': limit}
+        if series:
+            residual.update({key: query_model.get(key) for key in SERIES_KEYS})
+
+    expression = None
+    for part in filters:
+        expression = part if expression is None else expression & part
+    pushed = {'columns': columns, 'filters': len(filters), 'limit': pushed_limit}
+    return ScanPlan(columns, expression, pushed_limit, residual, pushed)
+
+
+_residual = threading.local()
+
+
+def apply_residual(table: pa.Table, residual: Dict[str, Any]) -> pa.Table:
+    """Run the part of a query a backend could not evaluate over its Arrow output, in DuckDB."""
+    import duckdb
+    connection = getattr(_residual, 'connection', None)
+    if connection is None:
+        connection = _residual.connection = duckdb.connect()
+    connection.register('scan', table)
+    try:
+        return connection.execute(build_select(residual, 'scan')).to_arrow_table()
+    finally:
+        connection.unregister('scan')
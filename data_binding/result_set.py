@@ -0,0 +1,133 @@
+from collections.abc import Sequence
+from typing import Any, Dict, Iterable, Iterator, List
+import pyarrow as pa
+import pyarrow.compute as pc
+from utils.serialization import encode_json, encode_table, table_to_records, to_json_compatible
+from utils.metrics import stage
+
+# Rows converted to dicts at a time while iterating
+ROW_BATCH = 4096
+
+
+def _records(table: pa.Table) -> List[Dict[str, Any]]:
+    return to_json_compatible(table).to_pylist()
+
+
+def _json_values(values: pa.Array) -> list:
+    return to_json_compatible(pa.table({'value': values})).column('value').to_pylist()
+
+
+class ResultSet(Sequence):
+    """
+    A query result held as Arrow columns plus their schema.
+
+    It reads as the list of row dicts the query API returns (JSON-compatible:
+    dates and timestamps as ISO strings), but rows are only built when they
+    are read. Iteration converts one batch at a time, and slices share the
+    table's buffers. Prompts get ``head``/``summary`` rather than every row.
+    ``to_columnar_json`` encodes the column names once instead of per row.
+    """
+
+    def __init__(self, table: pa.Table):
+        self.table = table
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> 'ResultSet':
+        return cls(pa.Table.from_pylist(list(records)))
+
+    @property
+    def schema(self) -> pa.Schema:
+        return self.table.schema
+
+    @property
+    def column_names(self) -> List[str]:
+        return self.table.column_names
+
+    @property
+    def num_rows(self) -> int:
+        return self.table.num_rows
+
+    @property
+    def nbytes(self) -> int:
+        return self.table.nbytes
+
+    def __len__(self) -> int:
+        return self.table.num_rows
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.num_rows)
+            if step == 1:
+                return ResultSet(self.table.slice(start, max(0, stop - start)))
+            return ResultSet(self.table.take(pa.array(range(start, stop, step), type=pa.int64())))
+        if index < 0:
+            index += self.num_rows
+        if not 0 <= index < self.num_rows:
+            raise IndexError("ResultSet index out of range")
+        return _records(self.table.slice(index, 1))[0]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for offset in range(0, self.num_rows, ROW_BATCH):
+            yield from _records(self.table.slice(offset, ROW_BATCH))
+
+    def __eq__(self, other):
+        if isinstance(other, ResultSet):
+            return self.table.equals(other.table)
+        if isinstance(other, list):
+            return len(other) == self.num_rows and self.to_records() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"ResultSet({self.num_rows} rows: {', '.join(self.column_names)})"
+
+    def column(self, name: str) -> list:
+        """One column's JSON-compatible values."""
+        return _json_values(self.table.column(name))
+
+    def head(self, rows: int = 10) -> 'ResultSet':
+        return self[:rows]
+
+    def summary(self) -> Dict[str, Any]:
+        """Row count and, per column, its type, null count and range (or distinct count for text)."""
+        columns = []
+        for name, column in zip(self.column_names, self.table.columns):
+            described = {'name': name, 'type': str(column.type), 'nulls': column.null_count}
+            column_type = column.type
+            if pa.types.is_dictionary(column_type):
+                column, column_type = column.cast(column_type.value_type), column_type.value_type
+            if (pa.types.is_integer(column_type) or pa.types.is_floating(column_type)
+                    or pa.types.is_decimal(column_type) or pa.types.is_temporal(column_type)):
+                if column.null_count < len(column):
+                    bounds = pc.min_max(column)
+                    low, high = _json_values(pa.array([bounds['min'].as_py(), bounds['max'].as_py()],
+                                                      type=column.type))
+                    described.update(min=low, max=high)
+            elif pa.types.is_string(column_type) or pa.types.is_large_string(column_type):
+                described['distinct'] = pc.count_distinct(column).as_py()
+            columns.append(described)
+        return {'rows': self.num_rows, 'columns': columns}
+
+    def to_arrow(self) -> pa.Table:
+        return self.table
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        return table_to_records(self.table)
+
+    def to_json(self) -> bytes:
+        """A JSON array of row objects, as the query routes return."""
+        return encode_table(self.table)
+
+    def to_columnar(self) -> Dict[str, Any]:
+        compatible = to_json_compatible(self.table)
+        return {
+            'columns': self.column_names,
+            'types': [str(field.type) for field in self.schema],
+            'data': [column.to_pylist() for column in compatible.columns],
+        }
+
+    def to_columnar_json(self) -> bytes:
+        """``{"columns", "types", "data"}`` with ``data`` one array per column."""
+        with stage("serialization"):
+            return encode_json(self.to_columnar())
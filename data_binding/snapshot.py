@@ -0,0 +1,98 @@
+import os
+import shutil
+import uuid
+import logging
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+import pyarrow as pa
+import pyarrow.parquet as pq
+from utils.schema import storage_table
+from data_binding.events import publish_dataset_event
+
+logger = logging.getLogger(__name__)
+
+SnapshotVersion = Tuple[int, int, int]
+
+
+def get_dataset_data_dir(organization: str, dataset: str) -> str:
+    return os.path.join('datasets', organization, dataset, 'data')
+
+
+def get_snapshot_path(organization: str, dataset: str, file_name: str = 'data.parquet') -> str:
+    return os.path.join(get_dataset_data_dir(organization, dataset), file_name)
+
+
+def get_data_path(organization: str, dataset: str, database_config: Dict[str, Any]) -> Optional[str]:
+    """
+    Where a dataset's data is read from: ``database.path`` (a file, directory or
+    glob anywhere, read in place) or ``database.file`` under its data directory.
+    """
+    if database_config.get('path'):
+        return database_config['path']
+    if database_config.get('file'):
+        return get_snapshot_path(organization, dataset, database_config['file'])
+    return None
+
+
+def snapshot_version(file_path: str) -> Optional[SnapshotVersion]:
+    """
+    Identify the snapshot currently published at ``file_path``.
+
+    Publishing always swaps in a new inode, so ``(inode, mtime, size)`` changes
+    whenever a new snapshot lands. Returns None if nothing is published yet.
+    """
+    try:
+        st = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+@contextmanager
+def atomic_snapshot(target: str) -> Iterator[str]:
+    """
+    Yield a temporary path next to ``target``; once the block exits cleanly the
+    file written there replaces ``target`` with ``os.replace``. On error the
+    temporary file is removed and the live snapshot is left untouched.
+    """
+    os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+    tmp_path = os.path.join(os.path.dirname(target), f".{os.path.basename(target)}.{uuid.uuid4().hex}.tmp")
+    try:
+        yield tmp_path
+        os.replace(tmp_path, target)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def publish_snapshot(source: Any, organization: str, dataset: str, file_name: str = 'data.parquet') -> str:
+    """
+    Atomically publish a new read-only snapshot of a dataset.
+
+    The snapshot is written next to the live file and moved into place with
+    ``os.replace``, so API workers never observe a partially written file: scans
+    already running keep reading the old inode, new queries see the new one.
+    A dataset event is then published so API caches drop what they hold for it.
+
+    Args:
+        source: A pandas DataFrame, a pyarrow Table (written with its
+            physical types, see ``utils.schema.storage_table``), or the path of
+            a Parquet file to copy.
+        organization (str): Organization slug.
+        dataset (str): Dataset slug.
+        file_name (str): File name under the dataset's ``data`` directory.
+
+    Returns:
+        str: The path of the published snapshot.
+    """
+    target = get_snapshot_path(organization, dataset, file_name)
+    with atomic_snapshot(target) as tmp_path:
+        if isinstance(source, (str, os.PathLike)):
+            shutil.copyfile(source, tmp_path)
+        elif isinstance(source, pa.Table):
+            pq.write_table(storage_table(source), tmp_path)
+        else:
+            source.to_parquet(tmp_path, index=False)
+    logger.info("Published snapshot for %s/%s at %s", organization, dataset, target)
+    publish_dataset_event(organization, dataset, snapshot_version(target), target)
+    return target
@@ -0,0 +1,137 @@
+import sqlite3
+import threading
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import pyarrow as pa
+from data_binding.database_engine import ConnectionManager
+from data_binding.pushdown import Capabilities, build_select
+from data_binding.snapshot import get_data_path, snapshot_version, SnapshotVersion
+from data_binding.result_set import ResultSet
+from utils.config_loader import load_dataset_definition
+from utils.metrics import stage, ROWS_RETURNED
+
+logger = logging.getLogger(__name__)
+
+
+def _declared_type(declared: str) -> Optional[pa.DataType]:
+    """The Arrow type of a declared SQLite column type, by SQLite's affinity rules; None when values decide."""
+    declared = (declared or '').upper()
+    if 'INT' in declared:
+        return pa.int64()
+    if 'CHAR' in declared or 'CLOB' in declared or 'TEXT' in declared:
+        return pa.string()
+    if 'REAL' in declared or 'FLOA' in declared or 'DOUB' in declared:
+        return pa.float64()
+    # BLOB, NUMERIC and untyped columns hold whatever was stored
+    return None
+
+
+def _value_type(values: Sequence[Any]) -> Optional[pa.DataType]:
+    kinds = {type(value) for value in values if value is not None}
+    if not kinds:
+        return None
+    if kinds <= {int}:
+        return pa.int64()
+    if kinds <= {int, float}:
+        return pa.float64()
+    if kinds <= {bytes}:
+        return pa.binary()
+    # Text, or a mix SQLite allows in one column
+    return pa.string()
+
+
+def _column(values: Sequence[Any], declared: Optional[pa.DataType]) -> pa.Array:
+    column_type = _value_type(values) or declared or pa.string()
+    if column_type == pa.string():
+        values = [value if value is None or isinstance(value, str) else str(value) for value in values]
+    return pa.array(values, column_type)
+
+
+class SQLiteConnectionManager(ConnectionManager):
+    """
+    Serves datasets stored as SQLite files, queried in place.
+
+    The whole query model is compiled to SQL, so filters, aggregates, ordering
+    and limits all run inside SQLite. Files are opened read-only, and reopened
+    when a new snapshot is published at their path. Each file is its own
+    database, so other catalog datasets cannot be joined.
+    """
+
+    capabilities = Capabilities(sql=True, projection=True, filters=True, aggregates=True, order_by=True, limit=True)
+
+    def __init__(self, connection_config: Dict[str, Any]):
+        super().__init__()
+        self.connection_config = connection_config
+        # file path -> (snapshot version, connection)
+        self.connections: Dict[str, Tuple[SnapshotVersion, sqlite3.Connection]] = {}
+        # (organization, dataset) -> file path it is served from
+        self.dataset_files: Dict[Tuple[str, str], str] = {}
+        self._lock = threading.Lock()
+
+    def get_connection(self, file_path: str) -> sqlite3.Connection:
+        version = snapshot_version(file_path)
+        if version is None:
+            raise FileNotFoundError(f"SQLite database not found: {file_path}")
+        with self._lock:
+            current = self.connections.get(file_path)
+            if current is not None and current[0] == version:
+                return current[1]
+            if current is not None:
+                current[1].close()
+            with stage("table_registration"):
+                connection = sqlite3.connect(f"file:{file_path}?mode=ro", uri=True, check_same_thread=False)
+            self.connections[file_path] = (version, connection)
+            return connection
+
+    def close_connection(self):
+        with self._lock:
+            for _, connection in self.connections.values():
+                connection.close()
+            self.connections = {}
+
+    def execute_query_on_dataset(self, organization: str, dataset: str, query_model: Dict[str, Any]) -> ResultSet:
+        return ResultSet(self.execute_query_on_dataset_arrow(organization, dataset, query_model))
+
+    def execute_query_on_dataset_arrow(self, organization: str, dataset: str, query_model: Dict[str, Any]) -> pa.Table:
+        file_path, table = self._bind_dataset(organization, dataset)
+        with stage("sql_build"):
+            query = build_select(dict(query_model, table=table))
+        return self._execute_sql(file_path, query, table)
+
+    def execute_sql_on_dataset_arrow(self, organization: str, dataset: str, sql: str) -> pa.Table:
+        file_path, table = self._bind_dataset(organization, dataset)
+        return self._execute_sql(file_path, sql, table)
+
+    def _bind_dataset(self, organization: str, dataset: str) -> Tuple[str, str]:
+        database_config = load_dataset_definition(organization, dataset).get('database', {})
+        file_path = get_data_path(organization, dataset, database_config) or self.connection_config.get('database')
+        self.dataset_files[(organization, dataset)] = file_path
+        return file_path, database_config.get('table', dataset)
+
+    def _execute_sql(self, file_path: str, query: str, table: str) -> pa.Table:
+        """
+        Run ``query`` and type its columns from their values: SQLite has no
+        result types. Columns without values take the type ``table`` declares
+        for them; mixed and unknown columns are text.
+        """
+        connection = self.get_connection(file_path)
+        with stage("sqlite_execute"), self._lock:
+            cursor = connection.execute(query)
+            rows = cursor.fetchall()
+            names = [column[0] for column in cursor.description]
+        columns: List[Sequence[Any]] = list(zip(*rows)) if rows else [()] * len(names)
+        declared = {}
+        if any(_value_type(values) is None for values in columns):
+            with self._lock:
+                declared = {row[1]: _declared_type(row[2])
+                            for row in connection.execute(f'PRAGMA table_info("{table}")').fetchall()}
+        result = pa.table({name: _column(values, declared.get(name)) for name, values in zip(names, columns)})
+        ROWS_RETURNED.inc(result.num_rows)
+        return result
+
+    def invalidate_dataset(self, organization: str, dataset: str):
+        file_path = self.dataset_files.pop((organization, dataset), None)
+        with self._lock:
+            current = self.connections.pop(file_path, None)
+        if current is not None:
+            current[1].close()
@@ -0,0 +1,211 @@
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# Aggregates usable as rolling window functions and as resample aggregates
+FUNCTIONS = {
+    'avg': 'avg', 'mean': 'avg', 'sum': 'sum', 'min': 'min', 'max': 'max', 'count': 'count',
+    'median': 'median', 'stddev': 'stddev_samp', 'first': 'first', 'last': 'last',
+}
+OPERATORS = ('rolling', 'lag', 'lead', 'delta', 'pct_change')
+# Resample unit -> (date_trunc part, grid step); units of a day or more are bucketed to DATE
+UNITS = {
+    'minute': ('minute', "INTERVAL '1 minute'"), 'hour': ('hour', "INTERVAL '1 hour'"),
+    'day': ('day', "INTERVAL '1 day'"), 'week': ('week', "INTERVAL '7 days'"),
+    'month': ('month', "INTERVAL '1 month'"), 'quarter': ('quarter', "INTERVAL '3 months'"),
+    'year': ('year', "INTERVAL '1 year'"),
+}
+FILLS = ('null', 'zero', 'forward', 'backward', 'linear')
+
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def has_series(query_model: Dict[str, Any]) -> bool:
+    return bool(query_model.get('series') or query_model.get('resample'))
+
+
+def _name(value: str, role: str) -> str:
+    if not isinstance(value, str) or not _IDENTIFIER.match(value):
+        raise ValueError(f"{role} must be a column name, got {value!r}")
+    return value
+
+
+def _output_name(column: str) -> str:
+    """The name a select item is exposed under: its alias, or the column itself."""
+    match = re.search(r'\s+AS\s+"?([A-Za-z_][A-Za-z0-9_]*)"?\s*$', column, re.I)
+    return match.group(1) if match else column.strip().strip('"')
+
+
+def _function(name: str) -> str:
+    if name not in FUNCTIONS:
+        raise ValueError(f"Unsupported series function '{name}'; use one of {', '.join(FUNCTIONS)}")
+    return FUNCTIONS[name]
+
+
+def _default_alias(operator: Dict[str, Any]) -> str:
+    op, column, window = operator['op'], operator['column'], operator.get('window')
+    window = 1 if window is None else window
+    if op == 'rolling':
+        return f"{column}_rolling_{operator.get('function') or 'avg'}_{window}"
+    return f"{column}_{op}_{window}"
+
+
+def _window(partition_by: List[str], time_column: str, frame: str = '') -> str:
+    partition = f"PARTITION BY {', '.join(partition_by)} " if partition_by else ''
+    return f"OVER ({partition}ORDER BY {time_column}{' ' + frame if frame else ''})"
+
+
+def series_expression(operator: Dict[str, Any], time_column: str, partition_by: List[str]) -> Tuple[str, str]:
+    """The window expression of one series operator and the column it is returned as."""
+    op = operator.get('op')
+    if op not in OPERATORS:
+        raise ValueError(f"Unsupported series operator '{op}'; use one of {', '.join(OPERATORS)}")
+    column = _name(operator.get('column'), f"Column of the {op} operator")
+    alias = _name(operator.get('alias') or _default_alias(operator), f"Alias of the {op} operator")
+    window = 1 if operator.get('window') is None else operator['window']
+    if not isinstance(window, int) or window < 1:
+        raise ValueError(f"The window of the {op} operator must be a positive number of rows, got {window!r}")
+
+    if op == 'rolling':
+        function = _function(operator.get('function') or 'avg')
+        frame = _window(partition_by, time_column, f"ROWS BETWEEN {window - 1} PRECEDING AND CURRENT ROW")
+        min_periods = operator.get('min_periods')
+        min_periods = window if min_periods is None else min_periods
+        expression = f"{function}({column}) {frame}"
+        if min_periods > 1:
+            # Like pandas, windows with fewer non-null values than min_periods are null
+            expression = f"CASE WHEN count({column}) {frame} >= {min_periods} THEN {expression} END"
+    else:
+        over = _window(partition_by, time_column)
+        shifted = f"{'lead' if op == 'lead' else 'lag'}({column}, {window}) {over}"
+        expression = {
+            'lag': shifted, 'lead': shifted,
+            'delta': f"{column} - {shifted}",
+            'pct_change': f"({column} - {shifted}) / nullif({shifted}, 0)",
+        }[op]
+    return expression, alias
+
+
+def _fill(column: str, fill: str, partition_by: List[str], time_column: str) -> str:
+    if fill == 'null':
+        return column
+    if fill == 'zero':
+        return f"coalesce({column}, 0)"
+    before = _window(partition_by, time_column, "ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW")
+    after = _window(partition_by, time_column, "ROWS BETWEEN CURRENT ROW AND UNBOUNDED FOLLOWING")
+    if fill == 'forward':
+        return f"last_value({column} IGNORE NULLS) {before}"
+    return f"first_value({column} IGNORE NULLS) {after}"
+
+
+def _resample(query_model: Dict[str, Any], time_column: str, partition_by: List[str],
+              value_columns: List[str]) -> List[Tuple[str, str]]:
+    """CTEs bucketing ``source`` to the resample unit, gridded and filled when asked."""
+    resample = query_model['resample']
+    unit = resample.get('every')
+    if unit not in UNITS:
+        raise ValueError(f"Unsupported resample unit '{unit}'; use one of {', '.join(UNITS)}")
+    part, step = UNITS[unit]
+    aggregate = _function(resample.get('aggregate') or 'avg')
+    columns = [_name(column, "Resampled column") for column in resample.get('columns') or value_columns]
+    if not columns:
+        raise ValueError("resample needs the columns to aggregate, in resample.columns or select")
+    fill = resample.get('fill')
+    if fill is not None and fill not in FILLS:
+        raise ValueError(f"Unsupported fill '{fill}'; use one of {', '.join(FILLS)}")
+
+    bucket = f"date_trunc('{part}', {time_column})"
+    if unit not in ('minute', 'hour'):
+        bucket = f"CAST({bucket} AS DATE)"
+    keys = [time_column] + partition_by
+    ctes = [('bucketed', f"SELECT {bucket} AS {time_column}, {''.join(p + ', ' for p in partition_by)}"
+                         f"{', '.join(f'{aggregate}({c}) AS {c}' for c in columns)} "
+                         f"FROM source GROUP BY {', '.join(str(i + 1) for i in range(len(keys)))}")]
+    if fill is None:
+        return ctes
+
+    # Every period between a series' first and last bucket, so row offsets are periods
+    grid_time = f"unnest(generate_series(lo, hi, {step}))"
+    grid_time = f"CAST({grid_time} AS {'TIMESTAMP' if unit in ('minute', 'hour') else 'DATE'})"
+    partitions = ''.join(p + ', ' for p in partition_by)
+    group = f" GROUP BY {', '.join(partition_by)}" if partition_by else ''
+    ctes.append(('bounds', f"SELECT {partitions}min({time_column}) AS lo, max({time_column}) AS hi "
+                           f"FROM bucketed{group}"))
+    ctes.append(('grid', f"SELECT {partitions}{grid_time} AS {time_column} FROM bounds"))
+    on = ' AND '.join(f"g.{key} = b.{key}" for key in keys)
+    gridded = ', '.join(f"g.{key}" for key in keys) + ''.join(f", b.{c}" for c in columns)
+    ctes.append(('gridded', f"SELECT {gridded} FROM grid g LEFT JOIN bucketed b ON {on}"))
+
+    if fill != 'linear':
+        filled = ', '.join(f"{_fill(c, fill, partition_by, time_column)} AS {c}" for c in columns)
+        ctes.append(('filled', f"SELECT {', '.join(keys)}, {filled} FROM gridded"))
+        return ctes
+
+    # Linear in time between the nearest non-null buckets on either side
+    before = _window(partition_by, time_column, "ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW")
+    after = _window(partition_by, time_column, "ROWS BETWEEN CURRENT ROW AND UNBOUNDED FOLLOWING")
+    neighbours = []
+    for c in columns:
+        at = f"CASE WHEN {c} IS NOT NULL THEN epoch({time_column}) END"
+        neighbours += [f"last_value({c} IGNORE NULLS) {before} AS _{c}_prev",
+                       f"last_value({at} IGNORE NULLS) {before} AS _{c}_prev_at",
+                       f"first_value({c} IGNORE NULLS) {after} AS _{c}_next",
+                       f"first_value({at} IGNORE NULLS) {after} AS _{c}_next_at"]
+    ctes.append(('neighbours', f"SELECT *, {', '.join(neighbours)} FROM gridded"))
+    filled = ', '.join(
+        f"coalesce({c}, _{c}_prev + (_{c}_next - _{c}_prev) * (epoch({time_column}) - _{c}_prev_at) "
+        f"/ nullif(_{c}_next_at - _{c}_prev_at, 0)) AS {c}" for c in columns)
+    ctes.append(('filled', f"SELECT {', '.join(keys)}, {filled} FROM neighbours"))
+    return ctes
+
+
+def build_series_select(query_model: Dict[str, Any], table: Optional[str] = None) -> str:
+    """
+    Compile a query model with ``series`` operators and/or ``resample`` into
+    one statement of CTEs, so the engine returns only the final series:
+
+    ``source``    the selected columns, after ``where``
+    ``bucketed``  resampled to ``resample.every`` with ``resample.aggregate``
+    ``filled``    every period between the first and last bucket, with gaps
+                  filled as ``resample.fill`` says
+    final         the source columns plus one window expression per operator,
+                  ordered by ``partition_by`` and ``time_column``
+
+    Windows count rows, so ``window: 12`` over a monthly series is a year;
+    resampling with a fill makes that hold across gaps.
+    """
+    if query_model.get('group_by'):
+        raise ValueError("series and resample cannot be combined with group_by; use resample.aggregate")
+    time_column = _name(query_model.get('time_column'), "time_column")
+    partition_by = [_name(column, "partition_by") for column in query_model.get('partition_by') or []]
+    operators = list(query_model.get('series') or [])
+
+    select = list(query_model.get('select') or [])
+    if select and '*' not in select:
+        names = [_output_name(column) for column in select]
+        # The time and partition columns, and the columns operated on, are always returned
+        required = [time_column] + partition_by + [op.get('column') for op in operators]
+        select += [column for column in dict.fromkeys(required) if column and column not in names]
+    source = f"SELECT {', '.join(select) or '*'} FROM {table or query_model['table']}"
+    if query_model.get('where'):
+        source += f" WHERE {query_model['where']}"
+    ctes = [('source', source)]
+
+    frame = 'source'
+    if query_model.get('resample'):
+        keys = {time_column, *partition_by}
+        value_columns = [name for name in map(_output_name, select) if name not in keys and name != '*']
+        value_columns += [op['column'] for op in operators if op.get('column') not in value_columns + list(keys)]
+        ctes += _resample(query_model, time_column, partition_by, value_columns)
+        frame = ctes[-1][0]
+
+    expressions = [series_expression(operator, time_column, partition_by) for operator in operators]
+    query = "WITH " + ', '.join(f"{name} AS ({sql})" for name, sql in ctes)
+    query += f" SELECT *{''.join(f', {expression} AS {alias}' for expression, alias in expressions)} FROM {frame}"
+
+    order_by = query_model.get('order_by') or partition_by + [time_column]
+    if isinstance(order_by, (list, tuple)):
+        order_by = ', '.join(order_by)
+    query += f" ORDER BY {order_by}"
+    if query_model.get('limit') is not None:
+        query += f" LIMIT {query_model['limit']}"
+    return query
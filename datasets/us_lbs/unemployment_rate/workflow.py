@@ -1,10 +1,13 @@
 # datasets/us_labor/unemployment_rate/workflow.py
 
 from workflows.base_workflow import BaseWorkflow
-import requests
-import pandas as pd
+from workflows.columnar import records_to_table, apply_schema, iter_batches
+import pyarrow as pa
+import pyarrow.compute as pc
 
 class USLaborUnemploymentRateWorkflow(BaseWorkflow):
+    SOURCE_COLUMNS = {'year': 'year', 'period': 'period', 'value': 'value'}
+
     def __init__(self, name, api_url, api_key):
         super().__init__(name)
         self.api_url = api_url
@@ -18,23 +21,13 @@ class USLaborUnemploymentRateWorkflow(BaseWorkflow):
             "endyear": "2023",
             "registrationkey": self.api_key
         }
-        response = requests.post(self.api_url, json=data, headers=headers)
+        response = self.http_post(self.api_url, json_body=data, headers=headers)
         return response.json()['Results']['series'][0]['data']
 
     def process_data(self, raw_data):
-        data = []
-        for entry in raw_data:
-            data.append({
-                'date': f"{entry['year']}-{entry['period'][1:]}",
-                'unemployment_rate': float(entry['value'])
-            })
-        df = pd.DataFrame(data)
-        df['date'] = pd.to_datetime(df['date'], format='%Y-%m')
-        return df.sort_values('date')
-
-    def run(self):
-        self.log_start()
-        raw_data = self.fetch_data()
-        processed_data = self.process_data(raw_data)
-        self.log_end()
-        return processed_data
\ No newline at end of file
+        table = pa.concat_tables(records_to_table(batch, self.SOURCE_COLUMNS) for batch in iter_batches(raw_data))
+        # "2023" + "M07" -> 2023-07-01, computed column-wise
+        month = pc.utf8_slice_codeunits(table['period'], 1)
+        date = pc.strptime(pc.binary_join_element_wise(table['year'], month, '01', '-'), format='%Y-%m-%d', unit='s')
+        result = apply_schema(pa.table({'date': date, 'unemployment_rate': table['value']}), self.schema)
+        return result.sort_by('date').to_pandas(date_as_object=False)
@@ -13,12 +13,10 @@ class TestWorldBankGDPWorkflow(unittest.TestCase):
             endpoint="country/all/indicator/NY.GDP.MKTP.CD"
         )
 
-    @patch('datasets.worldbank.main_gdp_and_other_stats_gdp.workflow.requests.get')
-    def test_fetch_data(self, mock_get):
-        # Mock the API response
-        mock_response = MagicMock()
-        mock_response.json.return_value = [
-            {},  # Metadata
+    @patch('datasets.worldbank.main_gdp_and_other_stats_gdp.workflow.WorldBankGDPWorkflow.http_get_pages')
+    def test_fetch_data(self, mock_get_pages):
+        # Mock the downloaded pages (records of each page, in order)
+        mock_get_pages.return_value = [
             [
                 {
                     "country": {"id": "USA", "value": "United States"},
@@ -32,10 +30,9 @@ class TestWorldBankGDPWorkflow(unittest.TestCase):
                 }
             ]
         ]
-        mock_get.return_value = mock_response
 
         # Call the method
-        result = self.workflow.fetch_data()
+        result = [record for page in self.workflow.fetch_data() for record in page]
 
         # Assert the result
         self.assertEqual(len(result), 2)
@@ -1,10 +1,18 @@
 # datasets/worldbank/gdp/workflow.py
 
 from workflows.base_workflow import BaseWorkflow
-import requests
-import pandas as pd
+from workflows.columnar import records_to_frame, read_json_pages
+from workflows.pagination import PageStream
 
 class WorldBankGDPWorkflow(BaseWorkflow):
+    # Output column -> path in the API record
+    SOURCE_COLUMNS = {
+        'country': 'country.value',
+        'country_code': 'country.id',
+        'year': 'date',
+        'gdp': 'value',
+    }
+
     def __init__(self, name, base_url, endpoint):
         super().__init__(name)
         self.base_url = base_url
@@ -12,24 +20,12 @@ class WorldBankGDPWorkflow(BaseWorkflow):
 
     def fetch_data(self):
         url = f"{self.base_url}{self.endpoint}"
-        response = requests.get(url, params={'format': 'json', 'per_page': 1000})
-        return response.json()[1]  # World Bank API returns metadata in [0] and data in [1]
+        # World Bank API returns metadata (incl. the page count) in [0] and data in [1]
+        return self.http_get_pages(url, params={'format': 'json', 'per_page': 1000})
 
     def process_data(self, raw_data):
-        data = []
-        for entry in raw_data:
-            if entry['value'] is not None:
-                data.append({
-                    'country': entry['country']['value'],
-                    'country_code': entry['country']['id'],
-                    'year': int(entry['date']),
-                    'gdp': float(entry['value'])
-                })
-        return pd.DataFrame(data)
-
-    def run(self):
-        self.log_start()
-        raw_data = self.fetch_data()
-        processed_data = self.process_data(raw_data)
-        self.log_end()
-        return processed_data
\ No newline at end of file
+        # Columnar, with dtypes from dataset.yaml; rows without a GDP value are dropped.
+        # Downloaded pages are parsed by DuckDB straight from the download cache.
+        if isinstance(raw_data, PageStream):
+            return read_json_pages(raw_data.paths, self.SOURCE_COLUMNS, self.schema, required=['gdp'])
+        return records_to_frame(raw_data, self.SOURCE_COLUMNS, self.schema, required=['gdp'])
@@ -1,6 +1,6 @@
 import yaml
-import json
 from typing import Dict, Any
+from utils.config_loader import load_yaml
 
 class DatacardBinding:
     @staticmethod
@@ -19,9 +19,8 @@ class DatacardBinding:
             yaml.YAMLError: If there's an error parsing the YAML file.
         """
         try:
-            with open(f"{dataset_location}/dataset.yaml", 'r') as file:
-                yaml_content = yaml.safe_load(file)
-                return json.loads(json.dumps(yaml_content))  # Ensure JSON compatibility
+            # Cached and read-only; shared by every caller until the file changes
+            return load_yaml(f"{dataset_location}/dataset.yaml")
         except FileNotFoundError:
             raise FileNotFoundError(f"dataset.yaml not found in {dataset_location}")
         except yaml.YAMLError as e:
@@ -1,32 +1,45 @@
 import logging
 import json
-from typing import List, Dict
+from utils.metrics import stage
+from typing import List, Dict, Optional, Union
 from services.llm_service import LLMService
 from services.dataset_search_service import DatasetSearchService
 from services.datacard_search_service import DatacardSearchService
 from api.services import QueryService
 from api.query import QueryModel
+from data_binding.result_set import ResultSet
+from api.result_summary import summarize_result, DEFAULT_MAX_BYTES, DEFAULT_TOP_K
 from services.search_service import SearchService
+from utils.serialization import encode_json
+from utils.config_loader import load_config
 
 logger = logging.getLogger(__name__)
 
+# Results up to this many rows are shown whole; larger ones are summarized,
+# with this many rows as a sample
+PREVIEW_ROWS = 20
+
 class ChatService:
-    def __init__(self):
+    def __init__(self, llm_service: Optional[LLMService] = None, query_service: Optional[QueryService] = None):
         logger.debug("Initializing ChatService")
         self.dataset_search_service = DatasetSearchService()
         self.datacard_search_service = DatacardSearchService()
-        self.llm_service = LLMService(self.dataset_search_service, self.datacard_search_service)
+        self.llm_service = llm_service or LLMService(self.dataset_search_service, self.datacard_search_service)
         self.system_prompt = """
         You are an AI assistant for a data analysis platform. Your role is to help users understand and query datasets.
         When a user asks about data or statistics, always provide information about relevant datasets, including their measures and dimensions.
         Be proactive in suggesting ways to analyze or visualize the data based on the available measures and dimensions.
         If a user's query is vague, ask for clarification and suggest potential analyses they might be interested in.
         """
-        self.query_service = QueryService()
+        self.query_service = query_service or QueryService()
         self.search_service = SearchService()
+        config = load_config().get('chat', {})
+        self.preview_rows = config.get('preview_rows', PREVIEW_ROWS)
+        self.summary_max_bytes = config.get('summary_max_bytes', DEFAULT_MAX_BYTES)
+        self.summary_top_k = config.get('summary_top_k', DEFAULT_TOP_K)
 
     def process_message(self, message: str, chat_history: List[Dict]) -> Dict:
-        logger.debug(f"Processing message: {message}")
+        logger.debug("Processing message: %s", message)
         try:
             # Retrieve relevant information
             retrieved_info = self._retrieve_relevant_info(message)
@@ -49,15 +62,17 @@ class ChatService:
             return {
                 "message": final_response,
                 "retrieved_information": json.dumps(retrieved_info),
-                "suggested_query": json.dumps(suggested_query)
+                "suggested_query": json.dumps(suggested_query),
+                "full_result": self._full_result(suggested_query, query_results)
             }
         except Exception as e:
             logger.error(f"Error in process_message: {str(e)}", exc_info=True)
             raise
 
     def _retrieve_relevant_info(self, message: str) -> Dict:
-        datasets = self.dataset_search_service.search_datasets(message)
-        datacards = self.datacard_search_service.search_datacards(message)
+        with stage("retrieval"):
+            datasets = self.dataset_search_service.search_datasets(message)
+            datacards = self.datacard_search_service.search_datacards(message)
         return {
             "datasets": [self._format_dataset(d) for d in datasets],
             "datacards": [self._format_datacard(d) for d in datacards]
@@ -81,7 +96,7 @@ class ChatService:
             "datacard_slug": datacard.get('datacard_slug', '')
         }
 
-    def _execute_query(self, suggested_query: Dict) -> Dict:
+    def _execute_query(self, suggested_query: Dict) -> Union[ResultSet, Dict]:
         try:
             query_model = QueryModel(**suggested_query)
             dataset_full_name = suggested_query.get('dataset', '')
@@ -100,23 +115,51 @@ class ChatService:
             logger.error(f"Error executing query: {str(e)}", exc_info=True)
             return {"error": str(e)}
 
-    def _generate_final_response(self, ai_response: str, suggested_query: Dict, query_results: Dict) -> str:
+    def _generate_final_response(self, ai_response: str, suggested_query: Dict,
+                                 query_results: Optional[Union[ResultSet, Dict]]) -> str:
         final_response = ai_response
 
         if suggested_query:
             final_response += "\n\nBased on your question, I've prepared a query to get more specific data:"
             final_response += f"\n```\n{json.dumps(suggested_query, indent=2)}\n```"
 
-        if query_results:
-            if "error" in query_results:
-                final_response += f"\n\nUnfortunately, there was an error executing the query: {query_results['error']}"
-            else:
-                final_response += "\n\nHere are the results of the query:"
-                final_response += f"\n```\n{json.dumps(query_results, indent=2)}\n```"
-                final_response += "\n\nLet me know if you'd like me to explain these results or if you have any questions about the data."
+        if isinstance(query_results, dict):
+            final_response += f"\n\nUnfortunately, there was an error executing the query: {query_results['error']}"
+        elif query_results and len(query_results) <= self.preview_rows:
+            final_response += "\n\nHere are the results of the query:"
+            final_response += f"\n```\n{json.dumps(query_results.to_records(), indent=2)}\n```"
+            final_response += "\n\nLet me know if you'd like me to explain these results or if you have any questions about the data."
+        elif query_results:
+            # The summary's size is bounded, however many rows the query returned
+            summary = summarize_result(query_results, max_bytes=self.summary_max_bytes,
+                                       sample_rows=self.preview_rows, top_k=self.summary_top_k)
+            final_response += (f"\n\nThe query returned {len(query_results)} rows, too many to show here. "
+                               f"Here is a summary of them, with the first {len(summary['sample'])} rows as a sample:")
+            # Compact, as measured against summary_max_bytes
+            final_response += f"\n```\n{encode_json(summary).decode('utf-8')}\n```"
+            full_result = self._full_result(suggested_query, query_results)
+            if full_result:
+                final_response += (f"\n\nThe full result can be downloaded by posting the query above to "
+                                   f"`{full_result['export_url']}`, or submitted as a background job at "
+                                   f"`{full_result['job_url']}`.")
 
         return final_response
 
+    def _full_result(self, suggested_query: Dict, query_results: Optional[Union[ResultSet, Dict]]) -> Optional[Dict]:
+        """Where the rows a summarized result left out can be fetched: the export endpoint, or a background job."""
+        if not isinstance(query_results, ResultSet) or len(query_results) <= self.preview_rows:
+            return None
+        organization, _, dataset = suggested_query.get('dataset', '').partition('/')
+        if not organization or not dataset:
+            return None
+        query = {key: value for key, value in suggested_query.items() if key != 'dataset'}
+        return {
+            "rows": len(query_results),
+            "export_url": f"/api/export/{organization}/{dataset}?format=csv",
+            "job_url": "/api/jobs",
+            "job_request": {"organization": organization, "dataset": dataset, "query": query, "format": "csv"},
+        }
+
     def _remove_retrieved_info(self, response: str) -> str:
         # Remove the "Retrieved Information" section from the response
         retrieved_info_index = response.find("Retrieved Information:")
@@ -1,5 +1,5 @@
 import os
-import yaml
+from utils.config_loader import load_yaml
 from typing import List, Dict
 import re
 import logging
@@ -18,12 +18,11 @@ class DatacardSearchService:
                 for datacard_file in os.listdir(org_path):
                     if datacard_file.endswith('.yml'):
                         datacard_path = os.path.join(org_path, datacard_file)
-                        with open(datacard_path, 'r') as f:
-                            datacard_info = yaml.safe_load(f)
-                            datacard_info['organization'] = org
-                            datacard_info['datacard_slug'] = os.path.splitext(datacard_file)[0]
-                            if query.lower() in datacard_info.get('title', '').lower() or query.lower() in datacard_info.get('description', '').lower():
-                                results.append(datacard_info)
+                        datacard_info = dict(load_yaml(datacard_path))
+                        datacard_info['organization'] = org
+                        datacard_info['datacard_slug'] = os.path.splitext(datacard_file)[0]
+                        if query.lower() in datacard_info.get('title', '').lower() or query.lower() in datacard_info.get('description', '').lower():
+                            results.append(datacard_info)
         return results
 
     def _tokenize(self, text: str) -> List[str]:
@@ -1,5 +1,5 @@
 import os
-import yaml
+from utils.config_loader import load_yaml
 from typing import List, Dict
 import re
 import logging
@@ -20,10 +20,9 @@ class DatasetSearchService:
                     if os.path.isdir(dataset_path):
                         yaml_path = os.path.join(dataset_path, 'dataset.yaml')
                         if os.path.exists(yaml_path):
-                            with open(yaml_path, 'r') as f:
-                                dataset_info = yaml.safe_load(f)
-                                dataset_info['organization'] = org
-                                dataset_info['dataset_slug'] = dataset_slug
-                                if query.lower() in dataset_info.get('name', '').lower() or query.lower() in dataset_info.get('description', '').lower():
-                                    results.append(dataset_info)
+                            dataset_info = dict(load_yaml(yaml_path))
+                            dataset_info['organization'] = org
+                            dataset_info['dataset_slug'] = dataset_slug
+                            if query.lower() in dataset_info.get('name', '').lower() or query.lower() in dataset_info.get('description', '').lower():
+                                results.append(dataset_info)
         return results
\ No newline at end of file
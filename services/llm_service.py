@@ -1,8 +1,8 @@
 import os
-import anthropic
 from typing import List, Dict
 import json
 import logging
+from utils.metrics import stage
 
 logger = logging.getLogger(__name__)
 
@@ -10,6 +10,8 @@ class LLMService:
     def __init__(self, dataset_search_service, datacard_search_service):
         self.dataset_search_service = dataset_search_service
         self.datacard_search_service = datacard_search_service
+        # Imported here so loading the app doesn't pay for the SDK import
+        import anthropic
         self.client = anthropic.Client(api_key=os.getenv("ANTHROPIC_API_KEY"))
         logger.debug("LLMService initialized")
         self.query_format_instructions = """
@@ -33,10 +35,12 @@ class LLMService:
         3. The "measures" and "dimensions" fields must never be empty.
         4. If you're unsure about which measure or dimension to use, include the most relevant ones based on the user's question.
         5. For time-series data, always include a dimension with type date or time field as a dimension.
+        6. To combine two datasets, add "join": [{"dataset": "organization/dataset_name", "on": ["join_key"]}] using join keys listed for both datasets, and prefix fields with their table name.
+        7. For moving averages, changes over time or resampling, set "time_column" to the date field and add "series": [{"op": "rolling" | "delta" | "pct_change", "column": "measure", "window": periods}] and/or "resample": {"every": "month", "fill": "forward"} instead of returning the full series.
         """
 
     def generate_response(self, message: str, chat_history: List[Dict], system_prompt: str, retrieved_info: Dict) -> Dict:
-        logger.debug(f"Generating response for message: {message}")
+        logger.debug("Generating response for message: %s", message)
         
         try:
             # Format the relevant information
@@ -68,10 +72,11 @@ class LLMService:
                 "messages": self._build_messages(message, chat_history),
             }
 
-            logger.debug(f"Payload for LLM request: {json.dumps(payload, indent=2)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Payload for LLM request: %s", json.dumps(payload, indent=2))
 
             response = self._make_llm_request(payload)
-            logger.debug(f"LLM response: {response}")
+            logger.debug("LLM response: %s", response)
 
             # Parse the LLM response to extract the suggested query
             suggested_query = self._extract_query_from_response(response)
@@ -108,6 +113,8 @@ class LLMService:
                     f"  Measures: {', '.join(dataset['measures'])}",
                     f"  Dimensions: {', '.join(dataset['dimensions'])}"
                 ]
+                if dataset.get('join_keys'):
+                    dataset_info.append(f"  Join keys: {', '.join(dataset['join_keys'])}")
                 formatted_info.extend(dataset_info)
         
         if 'datacards' in relevant_info:
@@ -138,7 +145,8 @@ class LLMService:
 
     def _make_llm_request(self, payload: dict) -> str:
         try:
-            response = self.client.messages.create(**payload)
+            with stage("llm_call"):
+                response = self.client.messages.create(**payload)
             content = response.content[0].text
             
             if response.stop_reason == 'stop_sequence':
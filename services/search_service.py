@@ -1,5 +1,5 @@
 import os
-import yaml
+from utils.config_loader import load_yaml
 from typing import List, Dict
 from models.datacard import Datacard
 from models.dataset import Dataset, Column
@@ -25,8 +25,7 @@ class SearchService:
         # Load dataset metadata from a YAML file (assuming it exists)
         metadata_path = os.path.join(dataset_path, "metadata.yml")
         if os.path.exists(metadata_path):
-            with open(metadata_path, 'r') as f:
-                metadata = yaml.safe_load(f)
+            metadata = load_yaml(metadata_path)
         else:
             metadata = {"description": f"Dataset found in {dataset_path}"}
 
@@ -59,8 +58,7 @@ class SearchService:
                     similarity = SequenceMatcher(None, query.lower(), file.lower()).ratio()
                     if similarity > 0.6:  # You can adjust this threshold
                         datacard_path = os.path.join(root, file)
-                        with open(datacard_path, 'r') as f:
-                            datacard_data = yaml.safe_load(f)
+                        datacard_data = load_yaml(datacard_path)
                         datacard = Datacard(
                             name=file[:-4],  # Remove .yml extension
                             description=datacard_data.get('subtitle', 'No description available'),
@@ -0,0 +1,114 @@
+import os
+import sqlite3
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from api.services import QueryService
+from data_binding.connection_factory import ConnectionFactory
+from data_binding.database_engine import ConnectionManager
+from data_binding.pushdown import Capabilities, plan_scan
+
+ROWS = {"id": list(range(1, 1001)), "region": ["north", "south"] * 500, "amount": [float(i) for i in range(1, 1001)]}
+QUERY = {"select": ["region", "sum(amount) AS total"], "where": "id > 900 AND region = 'north'",
+         "group_by": ["region"], "order_by": ["region"]}
+
+
+def write_definition(name, database):
+    os.makedirs(f"datasets/acme/{name}", exist_ok=True)
+    lines = "".join(f"  {key}: {value}\n" for key, value in database.items())
+    with open(f"datasets/acme/{name}/dataset.yaml", "w") as f:
+        f.write(f"name: {name}\ndatabase:\n{lines}")
+
+
+@pytest.fixture
+def sources(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    table = pa.table(ROWS)
+    external = tmp_path / "external"
+    external.mkdir()
+    # Ten row groups, so the id filter can skip most of them
+    pq.write_table(table, external / "sales.parquet", row_group_size=100)
+    table.to_pandas().to_csv(external / "sales.csv", index=False)
+    connection = sqlite3.connect(external / "sales.sqlite")
+    connection.execute("CREATE TABLE sales (id INTEGER, region TEXT, amount REAL)")
+    connection.executemany("INSERT INTO sales VALUES (?, ?, ?)", zip(*ROWS.values()))
+    connection.commit()
+    connection.close()
+
+    write_definition("duck_parquet", {"type": "duckdb", "path": external / "sales.parquet", "table": "sales"})
+    write_definition("duck_csv", {"driver": "duckdb", "path": external / "sales.csv", "table": "sales"})
+    write_definition("arrow", {"type": "arrow", "path": external / "sales.parquet"})
+    write_definition("sqlite", {"type": "sqlite", "path": external / "sales.sqlite", "table": "sales"})
+    return external
+
+
+@pytest.mark.parametrize("dataset", ["duck_parquet", "duck_csv", "arrow", "sqlite"])
+def test_every_backend_answers_the_same_query(sources, dataset):
+    result = QueryService().execute_query_on_dataset(QUERY, "acme", dataset)
+    assert result == [{"region": "north", "total": float(sum(range(901, 1001, 2)))}]
+
+
+def test_backends_without_sql_refuse_compiled_statements(sources):
+    manager = QueryService()._get_dataset_connection_manager("acme", "arrow")
+
+    with pytest.raises(ValueError, match="cannot run compiled SQL"):
+        manager.execute_sql_on_dataset_arrow("acme", "arrow", "SELECT 1")
+
+
+def test_arrow_scanner_pushes_filters_projection_and_limit(sources):
+    service = QueryService()
+    table, profile = service.profile_query_on_dataset(
+        {"select": ["id", "amount"], "where": "id > 900 AND region = 'north'", "limit": 5}, "acme", "arrow")
+
+    assert table.column("id").to_pylist() == [901, 903, 905, 907, 909]
+    assert profile["pushdown"]["filters"] == 2
+    assert profile["pushdown"]["columns"] == ["id", "amount"]
+    assert profile["pushdown"]["limit"] == 5 and profile["pushdown"]["residual"] is None
+    assert profile["pushdown"]["rows_scanned"] == 5
+
+
+def test_unpushable_parts_run_as_residual():
+    schema = pa.schema([("id", pa.int64()), ("region", pa.string()), ("amount", pa.float64())])
+    plan = plan_scan({"select": ["region", "avg(amount)"], "where": "id >= 10 AND lower(region) = 'x'",
+                      "group_by": ["region"], "limit": 3},
+                     schema, Capabilities(projection=True, filters=True, limit=True))
+
+    assert plan.pushed["filters"] == 1 and plan.limit is None
+    # `id` is only filtered on, in the scan
+    assert plan.columns == ["region", "amount"]
+    assert plan.residual["where"] == "(lower(region) = 'x')" and plan.residual["limit"] == 3
+
+
+@pytest.mark.parametrize("dataset", ["duck_parquet", "arrow", "sqlite"])
+def test_queries_naming_no_column_still_see_every_row(sources, dataset):
+    result = QueryService().execute_query_on_dataset({"select": ["count(*) AS n"]}, "acme", dataset)
+    assert result == [{"n": 1000}]
+
+
+def test_sqlite_results_are_typed_without_rows_and_with_mixed_values(sources):
+    connection = sqlite3.connect(sources / "sales.sqlite")
+    connection.execute("CREATE TABLE notes (id INTEGER, body TEXT, amount REAL, anything)")
+    connection.executemany("INSERT INTO notes VALUES (?, ?, ?, ?)", [(1, "a", 1.5, 7), (2, "b", 2.0, "seven")])
+    connection.commit()
+    connection.close()
+    write_definition("notes", {"type": "sqlite", "path": sources / "sales.sqlite", "table": "notes"})
+    service = QueryService()
+
+    empty = service.execute_query_on_dataset_arrow({"select": ["id", "body", "amount"], "where": "id > 10"},
+                                                   "acme", "notes")
+    mixed = service.execute_query_on_dataset_arrow({"select": ["id", "anything"], "order_by": ["id"]},
+                                                   "acme", "notes")
+
+    assert empty.num_rows == 0
+    assert empty.schema.types == [pa.int64(), pa.string(), pa.float64()]
+    assert mixed.column("anything").to_pylist() == ["7", "seven"] and mixed.column("id").type == pa.int64()
+
+
+def test_registry_and_config_spellings():
+    manager = ConnectionManager.create({"driver": "duckdb", "db_path": ":memory:"})
+    assert manager.connection_config["database"] == ":memory:"
+    assert ConnectionFactory.backend("parquet") is ConnectionFactory.backend("arrow")
+    assert ConnectionFactory.backends()["sqlite"].aggregates
+    assert not ConnectionFactory.backends()["arrow"].aggregates
+    with pytest.raises(ValueError, match="Unsupported database type"):
+        ConnectionFactory.create_connection("oracle", {})
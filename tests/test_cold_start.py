@@ -0,0 +1,25 @@
+import os
+import subprocess
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def imported_modules(module):
+    code = f"import sys, {module}; print('\\n'.join(sys.modules))"
+    output = subprocess.run([sys.executable, '-c', code], cwd=project_root,
+                            capture_output=True, text=True, check=True).stdout
+    return set(output.split())
+
+
+def test_app_import_defers_llm_sdk_and_server():
+    modules = imported_modules('app')
+    assert 'anthropic' not in modules
+    assert 'uvicorn' not in modules
+    assert 'services.chat_service' not in modules
+
+
+def test_ingestion_cli_does_not_import_web_app():
+    modules = imported_modules('main')
+    assert 'app' not in modules
+    assert 'fastapi' not in modules
@@ -0,0 +1,58 @@
+import json
+import os
+import pytest
+from utils.config_loader import MetadataCache, FrozenDict, thaw
+
+
+@pytest.fixture
+def yaml_file(tmp_path):
+    path = tmp_path / "dataset.yaml"
+    path.write_text("name: test\ncolumns:\n  - name: date\n    type: date\n")
+    return str(path)
+
+
+def test_cache_returns_same_instance(yaml_file):
+    cache = MetadataCache()
+    first = cache.get(yaml_file)
+    second = cache.get(yaml_file)
+
+    assert first is second
+    assert cache.info() == {"hits": 1, "misses": 1, "entries": 1}
+
+
+def test_cache_reloads_when_file_changes(yaml_file):
+    cache = MetadataCache()
+    assert cache.get(yaml_file)["name"] == "test"
+
+    with open(yaml_file, "w") as f:
+        f.write("name: changed\n")
+    st = os.stat(yaml_file)
+    os.utime(yaml_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    assert cache.get(yaml_file)["name"] == "changed"
+    assert cache.misses == 2
+
+
+def test_signature_follows_the_file(yaml_file, tmp_path):
+    cache = MetadataCache()
+    signature = cache.signature(yaml_file)
+
+    os.utime(yaml_file, ns=(0, 1_000_000))
+    assert cache.signature(yaml_file) not in (None, signature)
+    assert cache.signature(str(tmp_path / "missing.yaml")) is None
+    with pytest.raises(FileNotFoundError):
+        cache.get(str(tmp_path / "missing.yaml"))
+
+
+def test_cached_values_are_read_only(yaml_file):
+    value = MetadataCache().get(yaml_file)
+
+    assert isinstance(value, FrozenDict)
+    with pytest.raises(TypeError):
+        value["name"] = "other"
+    assert isinstance(value["columns"], tuple)
+
+    copy = thaw(value)
+    copy["name"] = "other"
+    assert value["name"] == "test"
+    assert json.loads(json.dumps(value))["columns"][0]["type"] == "date"
@@ -0,0 +1,113 @@
+import os
+import datetime
+import pyarrow as pa
+import pytest
+from fastapi.testclient import TestClient
+import app as app_module
+from api.datacard_index import DatacardIndex, DatacardBindingError
+from api.services import QueryService, DatacardService
+from data_binding.snapshot import publish_snapshot
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write("datasets/acme/jobs/dataset.yaml",
+          "name: jobs\ncolumns:\n  - name: date\n    type: date\n  - name: rate\n    type: double\n"
+          "database:\n  type: duckdb\n  file: data.parquet\n  table: job_rates\n")
+    publish_snapshot(pa.table({
+        "date": [datetime.date(2000, 1, 1) + datetime.timedelta(days=i) for i in range(10)],
+        "rate": [float(i) for i in range(10)],
+    }), "acme", "jobs")
+    # Bound through its query's table, from another organization
+    write("datacards/reports/job_rates.yml",
+          "title: Job rates\nquery:\n  table: job_rates\n  select: [date, rate AS value]\n  order_by: [date DESC]\n"
+          "xAxis: date\nyAxis: value\n")
+    # Bound explicitly
+    write("datacards/acme/headline.yml",
+          "title: Headline\ndataset: acme/jobs\nquery:\n  select: [date, rate]\n  limit: 3\n")
+    return tmp_path
+
+
+def test_datacards_bind_by_dataset_key_then_table(catalog):
+    index = DatacardIndex()
+
+    assert index.build() == {}
+    binding = index.resolve("reports", "job_rates")
+    assert binding.dataset == ("acme", "jobs") and "table" not in binding.query
+    assert binding.sql == "SELECT date, rate AS value FROM job_rates ORDER BY date DESC"
+    assert index.resolve("acme", "headline").query["description"] == "Headline"
+    assert sorted(index.datacards_for("acme", "jobs")) == [("acme", "headline"), ("reports", "job_rates")]
+
+
+def test_unbound_and_invalid_datacards_are_reported(catalog):
+    write("datacards/acme/orphan.yml", "title: Orphan\nquery:\n  table: nowhere\n  select: [x]\n")
+    write("datacards/acme/typo.yml", "dataset: acme/jobs\nquery:\n  select: [date, rates]\nxAxis: date\nyAxis: rate\n")
+    index = DatacardIndex()
+
+    problems = index.build()
+
+    assert set(problems) == {"acme/orphan", "acme/typo"}
+    assert "not bound to any dataset" in problems["acme/orphan"]
+    assert "uses rates, rate (yAxis)" in problems["acme/typo"]
+    with pytest.raises(DatacardBindingError):
+        index.resolve("acme", "typo")
+    with pytest.raises(FileNotFoundError):
+        index.resolve("acme", "missing")
+
+
+def test_resolve_is_a_lookup_until_the_datacard_changes(catalog):
+    index = DatacardIndex()
+    index.build()
+    binding = index.resolve("acme", "headline")
+    assert index.resolve("acme", "headline") is binding
+
+    write("datacards/acme/headline.yml", "title: Headline, rebound\ndataset: acme/jobs\nquery:\n  select: [rate]\n")
+
+    rebound = index.resolve("acme", "headline")
+    assert rebound is not binding and rebound.sql == "SELECT rate FROM job_rates"
+
+
+def test_datacard_data_runs_the_precompiled_query(catalog, monkeypatch):
+    compiled = []
+    execute = QueryService.execute_query_on_dataset_arrow
+
+    def spy(self, *args, **kwargs):
+        compiled.append(kwargs.get("compiled"))
+        return execute(self, *args, **kwargs)
+
+    monkeypatch.setattr(QueryService, "execute_query_on_dataset_arrow", spy)
+    monkeypatch.setattr(app_module, "get_datacard_index", lambda: DatacardIndex())
+    client = TestClient(app_module.app)
+
+    response = client.get("/api/datacard/reports/job_rates/data")
+
+    assert response.status_code == 200
+    assert [row["value"] for row in response.json()][:2] == [9.0, 8.0]
+    assert compiled == ["SELECT date, rate AS value FROM job_rates ORDER BY date DESC"]
+    # The definition is served as written; the binding separately
+    definition = client.get("/api/datacard/reports/job_rates").json()
+    assert "dataset" not in definition and definition["query"]["table"] == "job_rates"
+    binding = client.get("/api/datacard/reports/job_rates/binding").json()
+    assert binding["dataset"] == "acme/jobs" and "table" not in binding["query"]
+    assert binding["sql"] == compiled[0]
+    assert DatacardService(index=DatacardIndex()).chart_query("acme", "headline")["limit"] == 3
+
+
+def test_unbound_datacards_still_serve_their_definition(catalog, monkeypatch):
+    write("datacards/acme/orphan.yml", "title: Orphan\nquery:\n  table: nowhere\n  select: [x]\n")
+    monkeypatch.setattr(app_module, "get_datacard_index", lambda: DatacardIndex())
+    client = TestClient(app_module.app)
+
+    definition = client.get("/api/datacard/acme/orphan")
+    binding = client.get("/api/datacard/acme/orphan/binding")
+
+    assert definition.status_code == 200 and definition.json()["query"]["table"] == "nowhere"
+    assert binding.status_code == 400 and "not bound to any dataset" in binding.json()["detail"]
+    assert client.get("/api/datacard/acme/missing/binding").status_code == 404
@@ -0,0 +1,124 @@
+import os
+import gzip
+import json
+import threading
+import datetime
+import pyarrow as pa
+import pytest
+from fastapi.testclient import TestClient
+import app as app_module
+from api.datacard_snapshots import DatacardSnapshotStore
+from api.services import QueryService, DatacardService
+from data_binding.events import DatasetEvent
+from data_binding.snapshot import publish_snapshot
+
+
+class CountingQueryService(QueryService):
+    def __init__(self):
+        super().__init__()
+        self.executed = 0
+
+    def execute_query_on_dataset_arrow(self, *args, **kwargs):
+        self.executed += 1
+        return super().execute_query_on_dataset_arrow(*args, **kwargs)
+
+
+def publish(values):
+    start = datetime.date(2000, 1, 1)
+    publish_snapshot(pa.table({
+        "date": [start + datetime.timedelta(days=i) for i in range(len(values))],
+        "rate": values,
+    }), "acme", "jobs")
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("datasets/acme/jobs")
+    with open("datasets/acme/jobs/dataset.yaml", "w") as f:
+        f.write("name: jobs\ndatabase:\n  type: duckdb\n  file: data.parquet\n  table: jobs\n")
+    os.makedirs("datacards/acme")
+    with open("datacards/acme/jobs.yml", "w") as f:
+        f.write("title: Jobs </script> report\nquery:\n  select: [date, rate]\n  order_by: [date]\n"
+                "xAxis: date\nyAxis: rate\nchart_type: line\nmax_points: 100\n")
+    publish([float(i % 17) for i in range(5000)])
+    return tmp_path
+
+
+@pytest.fixture
+def store(catalog):
+    return DatacardSnapshotStore(DatacardService(), CountingQueryService(), directory=str(catalog / "snapshots"))
+
+
+def test_snapshot_holds_definition_and_downsampled_data(store):
+    snapshot = store.get("acme", "jobs")
+
+    document = json.loads(gzip.decompress(snapshot.body))
+    assert document["version"] == snapshot.version
+    assert document["datacard"]["title"] == "Jobs </script> report"
+    assert len(document["data"]) == 100 and set(document["data"][0]) == {"date", "rate"}
+    assert os.listdir(store.directory + "/acme") == [f"jobs.{snapshot.version}.json.gz"]
+
+
+def test_views_run_no_query_until_the_data_changes(store, catalog):
+    first = store.get("acme", "jobs")
+    assert store.get("acme", "jobs") is first
+    # Another process finds the artifact on disk
+    other = DatacardSnapshotStore(DatacardService(), CountingQueryService(), directory=store.directory)
+    assert other.get("acme", "jobs").body == first.body and other.query_service.executed == 0
+
+    publish([1.0, 2.0, 3.0])
+    store.on_dataset_event(DatasetEvent("acme", "jobs"))
+
+    assert store.query_service.executed == 2
+    rebuilt = store.get("acme", "jobs")
+    assert rebuilt.version != first.version and store.query_service.executed == 2
+    assert [row["rate"] for row in json.loads(rebuilt.json())["data"]] == [1.0, 2.0, 3.0]
+    assert os.listdir(store.directory + "/acme") == [f"jobs.{rebuilt.version}.json.gz"]
+
+
+def test_snapshot_endpoint_and_inlined_page(store, monkeypatch):
+    monkeypatch.setattr(app_module, "get_snapshot_store", lambda: store)
+    client = TestClient(app_module.app)
+
+    response = client.get("/api/datacard/acme/jobs/snapshot")
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()["data"]) == 100
+    etag = response.headers["etag"]
+    assert client.get("/api/datacard/acme/jobs/snapshot", headers={"If-None-Match": etag}).status_code == 304
+
+    page = client.get("/datacard/acme/jobs")
+    assert page.status_code == 200
+    inlined = page.text.split('<script id="datacard-snapshot" type="application/json">')[1].split("</script>")[0]
+    assert json.loads(inlined)["datacard"]["title"] == "Jobs </script> report"
+    assert client.get("/datacard/acme/jobs", headers={"If-None-Match": page.headers["etag"]}).status_code == 304
+    # Every view is served from the one artifact
+    assert store.query_service.executed == 1
+    assert client.get("/api/datacard/acme/missing/snapshot").status_code == 404
+
+
+def test_rebuilds_run_concurrently_with_queries(store):
+    # Dataset events rebuild snapshots on the event watcher thread, through the
+    # connection request handlers query
+    done, errors = threading.Event(), []
+
+    def rebuild():
+        while not done.is_set():
+            try:
+                store.query_service.invalidate_dataset("acme", "jobs")
+                store.build("acme", "jobs")
+            except Exception as e:
+                errors.append(e)
+
+    watcher = threading.Thread(target=rebuild)
+    watcher.start()
+    try:
+        for _ in range(300):
+            table = store.query_service.execute_query_on_dataset_arrow({"select": ["rate"], "limit": 7},
+                                                                       "acme", "jobs", cache=False)
+            assert table.column_names == ["rate"] and table.num_rows == 7
+    finally:
+        done.set()
+        watcher.join()
+    assert errors == []
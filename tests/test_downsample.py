@@ -0,0 +1,104 @@
+import os
+import datetime
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from fastapi.testclient import TestClient
+from app import app
+from api.downsample import lttb, min_max, downsample_table
+from api.query import QueryBuilder
+from api.services import QueryService
+
+DAYS = 20_000
+
+
+def reference_lttb(x, y, threshold):
+    # The point-by-point algorithm from Steinarsson's thesis
+    every = (len(x) - 2) / (threshold - 2)
+    selected, a = [0], 0
+    for i in range(threshold - 2):
+        start, end = int(i * every) + 1, int((i + 1) * every) + 1
+        next_start, next_end = end, min(int((i + 2) * every) + 1, len(x))
+        if i == threshold - 3:
+            next_start, next_end = len(x) - 1, len(x)
+        mean_x, mean_y = np.mean(x[next_start:next_end]), np.mean(y[next_start:next_end])
+        areas = [abs((x[a] - mean_x) * (y[j] - y[a]) - (x[a] - x[j]) * (mean_y - y[a])) for j in range(start, end)]
+        a = start + int(np.argmax(areas))
+        selected.append(a)
+    return selected + [len(x) - 1]
+
+
+def test_lttb_matches_the_reference_algorithm():
+    rng = np.random.default_rng(7)
+    x, y = np.arange(5000, dtype=float), rng.random(5000)
+
+    assert lttb(x, y, 100).tolist() == reference_lttb(x, y, 100)
+
+
+def test_min_max_keeps_every_spike():
+    y = np.sin(np.arange(100_000) / 500)
+    y[[123, 45_678]] = [40.0, -40.0]
+
+    indices = min_max(np.arange(len(y), dtype=float), y, 500)
+
+    assert len(indices) <= 500 and {0, 123, 45_678, len(y) - 1} <= set(indices.tolist())
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_downsample_table_orders_by_x_and_keeps_nulls_out():
+    dates = [datetime.date(2000, 1, 1) + datetime.timedelta(days=i) for i in range(1000)]
+    values = [None if i % 7 == 0 else float(i % 50) for i in range(1000)]
+    table = pa.table({"date": dates[::-1], "value": values[::-1]})
+
+    result = downsample_table(table, "date", "value", 50)
+
+    assert result.num_rows == 50
+    assert result.column("date")[0].as_py() == dates[0] and result.column("date")[-1].as_py() == dates[-1]
+    assert result.column("date").to_pylist() == sorted(result.column("date").to_pylist())
+    assert result.column("value").null_count <= 2
+
+
+def test_small_results_are_returned_whole():
+    table = pa.table({"x": [1, 2, 3], "y": [3.0, 1.0, 2.0]})
+    assert downsample_table(table, "x", "y", 1000) is table
+    with pytest.raises(ValueError, match="must be numeric"):
+        downsample_table(pa.table({"x": list(range(10)), "y": ["a"] * 10}), "x", "y", 5)
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    days = np.arange(DAYS)
+    pq.write_table(pa.table({
+        "date": pa.array(days.astype("datetime64[D]")),
+        "value": np.sin(days / 300) * 10 + (days % 13),
+    }), tmp_path / "daily.parquet")
+    os.makedirs("datasets/acme/daily_value")
+    with open("datasets/acme/daily_value/dataset.yaml", "w") as f:
+        f.write(f"name: daily_value\ndatabase:\n  type: duckdb\n  path: {tmp_path / 'daily.parquet'}\n  table: daily\n")
+    os.makedirs("datacards/acme")
+    with open("datacards/acme/daily_value.yml", "w") as f:
+        f.write("title: Daily value\nquery:\n  select: [date, value]\n  order_by: [date]\n"
+                "xAxis: date\nyAxis: value\nchart_type: line\nmax_points: 300\n")
+    return tmp_path
+
+
+def test_query_model_downsamples_on_the_query_path(catalog):
+    query = QueryBuilder().select("date", "value").order_by("date").downsample("date", "value", 200, "minmax").build()
+
+    rows = QueryService().execute_query_on_dataset(query, "acme", "daily_value")
+
+    assert 100 < len(rows) <= 200
+    assert rows[0]["date"] == "1970-01-01" and rows[-1]["date"] == "2024-10-03"
+
+
+def test_datacard_data_is_downsampled_on_its_axes(catalog):
+    client = TestClient(app)
+
+    default = client.get("/api/datacard/acme/daily_value/data")
+    wide = client.get("/api/datacard/acme/daily_value/data", params={"max_points": 1200})
+
+    assert default.status_code == 200 and len(default.json()) == 300
+    assert len(wide.json()) == 1200
+    assert set(default.json()[0]) == {"date", "value"}
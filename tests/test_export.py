@@ -0,0 +1,113 @@
+import io
+import os
+import gzip
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+import pytest
+from fastapi.testclient import TestClient
+from app import app
+from api.services import QueryService
+from data_binding.export import copy_options
+from data_binding.snapshot import publish_snapshot
+
+ROWS = 50_000
+QUERY = {"select": ["id", "value"], "where": "id % 2 = 0", "order_by": ["id"]}
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("datasets/acme/events")
+    with open("datasets/acme/events/dataset.yaml", "w") as f:
+        f.write("name: events\ndatabase:\n  type: duckdb\n  file: data.parquet\n  table: events\n")
+    publish_snapshot(pa.table({"id": list(range(ROWS)), "value": [float(i % 97) for i in range(ROWS)]}),
+                     "acme", "events")
+    return tmp_path
+
+
+@pytest.mark.parametrize("format,compression", [
+    ("parquet", None), ("parquet", "snappy"), ("csv", None), ("csv", "gzip"), ("arrow", "zstd"),
+])
+def test_export_writes_every_format(catalog, format, compression):
+    path = str(catalog / f"out.{format}")
+
+    rows = QueryService().export_query_on_dataset(dict(QUERY), "acme", "events", path, format, compression)
+
+    if format == "parquet":
+        table = pq.read_table(path)
+    elif format == "csv":
+        with (gzip.open(path) if compression else open(path, "rb")) as f:
+            table = pa_csv.read_csv(io.BytesIO(f.read()))
+    else:
+        table = pa.ipc.open_stream(path).read_all()
+    assert rows == table.num_rows == ROWS // 2
+    assert table.column("id").to_pylist()[:3] == [0, 2, 4]
+
+
+def test_export_options_are_validated():
+    assert copy_options("csv", "gzip") == "FORMAT csv, HEADER true, COMPRESSION gzip"
+    with pytest.raises(ValueError, match="Unsupported export format"):
+        copy_options("xlsx")
+    with pytest.raises(ValueError, match="Unsupported parquet compression"):
+        copy_options("parquet", "brotli9")
+
+
+def test_backends_without_copy_export_from_arrow(catalog):
+    connection = sqlite3.connect(catalog / "events.db")
+    connection.execute("CREATE TABLE events (id INTEGER, value REAL)")
+    connection.executemany("INSERT INTO events VALUES (?, ?)", [(i, i / 2) for i in range(10)])
+    connection.commit()
+    connection.close()
+    os.makedirs("datasets/acme/legacy")
+    with open("datasets/acme/legacy/dataset.yaml", "w") as f:
+        f.write(f"name: legacy\ndatabase:\n  type: sqlite\n  path: {catalog / 'events.db'}\n  table: events\n")
+
+    rows = QueryService().export_query_on_dataset(dict(QUERY), "acme", "legacy", str(catalog / "out.csv"), "csv")
+
+    assert rows == 5 and pa_csv.read_csv(catalog / "out.csv").column("id").to_pylist() == [0, 2, 4, 6, 8]
+
+
+def test_export_endpoint_streams_the_file(catalog):
+    client = TestClient(app)
+
+    response = client.post("/api/export/acme/events", params={"format": "parquet"}, json=QUERY)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.parquet"
+    assert "content-encoding" not in response.headers
+    assert response.headers["x-row-count"] == str(ROWS // 2)
+    assert 'filename="events.parquet"' in response.headers["content-disposition"]
+    assert pq.read_table(io.BytesIO(response.content)).num_rows == ROWS // 2
+    # The spooled file is removed once sent
+    assert os.listdir(".cache/exports") == []
+    for encoding in ("br", "gzip"):
+        # Small enough to be sent as one chunk, which the compressors would otherwise encode
+        gzipped = client.post("/api/export/acme/events", params={"format": "csv", "compression": "gzip"},
+                              json={**QUERY, "limit": 5000}, headers={"Accept-Encoding": encoding})
+        assert gzipped.headers["content-type"] == "application/gzip"
+        assert "content-encoding" not in gzipped.headers
+        assert gzip.decompress(gzipped.content).startswith(b"id,value")
+    assert client.post("/api/export/acme/events", params={"format": "xml"}, json=QUERY).status_code == 400
+    assert client.post("/api/export/acme/nowhere", json=QUERY).status_code == 404
+
+
+def test_downsampled_exports_run_concurrently_with_queries(catalog):
+    # Exports and jobs run on worker threads, binding and querying the connection request handlers use
+    service = QueryService()
+    downsampled = {**QUERY, "downsample": {"x": "id", "y": "value", "max_points": 100}}
+
+    def export(index):
+        service.invalidate_dataset("acme", "events")
+        return service.export_query_on_dataset(dict(downsampled), "acme", "events",
+                                               str(catalog / f"out{index}.csv"), "csv")
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        exports = [pool.submit(export, index) for index in range(40)]
+        for _ in range(200):
+            table = service.execute_query_on_dataset_arrow({"select": ["id"], "limit": 7}, "acme", "events",
+                                                           cache=False)
+            assert table.column_names == ["id"] and table.num_rows == 7
+        assert [future.result() for future in exports] == [100] * 40
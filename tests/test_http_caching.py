@@ -0,0 +1,59 @@
+import pytest
+from fastapi.testclient import TestClient
+from app import app, static_files, templates
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def test_hashed_static_assets_are_immutable(client):
+    url = static_files.url_for("js/chat.js")
+    assert "?v=" in url
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert "immutable" in response.headers["cache-control"]
+
+    response = client.get("/static/js/chat.js")
+    assert response.headers["cache-control"] == "no-cache"
+    assert "etag" in response.headers
+
+
+def test_chat_page_links_hashed_assets():
+    html = templates.env.get_template("chat.html").render()
+    assert static_files.url_for("js/chat.js") in html
+    assert static_files.url_for("css/chat.css") in html
+
+
+def test_datacard_definition_revalidates_with_etag(client):
+    response = client.get("/api/datacard/us_lbs/unemployment_rate")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    response = client.get("/api/datacard/us_lbs/unemployment_rate", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+def test_large_query_responses_are_gzipped(client):
+    body = {"dataset": "us_lbs/unemployment_rate", "query": {"select": ["date", "unemployment_rate"]}}
+    response = client.post("/api/query_dataset", json=body, headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()) == 48
+
+
+def test_brotli_preferred_when_available(client):
+    pytest.importorskip("brotli")
+    body = {"dataset": "us_lbs/unemployment_rate", "query": {"select": ["date", "unemployment_rate"]}}
+    response = client.post("/api/query_dataset", json=body, headers={"Accept-Encoding": "br, gzip"})
+    assert response.headers["content-encoding"] == "br"
+    assert len(response.json()) == 48
+
+
+def test_small_responses_are_not_compressed(client):
+    body = {"dataset": "us_lbs/unemployment_rate", "query": {"select": ["date"], "limit": 1}}
+    response = client.post("/api/query_dataset", json=body, headers={"Accept-Encoding": "br, gzip"})
+    assert "content-encoding" not in response.headers
@@ -0,0 +1,108 @@
+import os
+import pandas as pd
+import pyarrow as pa
+import pytest
+from api.result_cache import QueryResultCache
+from api.services import QueryService
+from data_binding.events import InvalidationBus, EventLogWatcher, publish_dataset_event, bus
+from data_binding.snapshot import publish_snapshot
+from utils.config_loader import load_dataset_definition, metadata_cache
+
+QUERY = {"select": ["id", "amount"], "order_by": ["id"]}
+
+
+@pytest.fixture
+def datasets(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for name in ("sales", "costs"):
+        os.makedirs(f"datasets/acme/{name}")
+        with open(f"datasets/acme/{name}/dataset.yaml", "w") as f:
+            f.write(f"name: {name}\ndatabase:\n  type: duckdb\n  file: data.parquet\n  table: {name}\n")
+        publish_snapshot(pd.DataFrame({"id": [1], "amount": [1.0]}), "acme", name)
+    return tmp_path
+
+
+@pytest.fixture
+def service(datasets):
+    service = QueryService(result_cache=QueryResultCache())
+    unsubscribe = bus.subscribe(service.on_dataset_event)
+    yield service
+    unsubscribe()
+
+
+def amounts(service, dataset):
+    return service.execute_query_on_dataset_arrow(QUERY, "acme", dataset).column("amount").to_pylist()
+
+
+def test_watcher_delivers_only_new_complete_events(tmp_path):
+    log_path = str(tmp_path / "events.jsonl")
+    publish_dataset_event("acme", "old", log_path=log_path)
+    received = []
+    local_bus = InvalidationBus()
+    local_bus.subscribe(received.append)
+    watcher = EventLogWatcher(local_bus, log_path)
+    watcher.start()
+    watcher.stop()
+
+    publish_dataset_event("acme", "sales", version=[1, 2, 3], log_path=log_path)
+    with open(log_path, "a") as f:
+        f.write('{"organization": "acme", "data')  # still being written
+    assert [event.key for event in watcher.poll()] == ["acme/sales"]
+    assert received[0].version == [1, 2, 3]
+    assert watcher.poll() == []
+
+    # A restarted log is read from the beginning
+    os.replace(str(tmp_path / "events.jsonl"), str(tmp_path / "old.jsonl"))
+    publish_dataset_event("acme", "costs", log_path=log_path)
+    assert [event.key for event in watcher.poll()] == ["acme/costs"]
+
+
+def test_publishing_invalidates_only_the_affected_dataset(service):
+    assert amounts(service, "sales") == [1.0]
+    assert amounts(service, "costs") == [1.0]
+    assert amounts(service, "sales") == [1.0]
+    assert service.result_cache.hits == 1
+
+    publish_snapshot(pd.DataFrame({"id": [1, 2], "amount": [1.0, 2.0]}), "acme", "sales")
+
+    assert service.result_cache.info()["entries"] == 1
+    assert amounts(service, "sales") == [1.0, 2.0]
+    assert amounts(service, "costs") == [1.0]
+    assert service.result_cache.hits == 2
+
+
+def test_events_from_another_process_reach_the_api(service):
+    amounts(service, "sales")
+    api_bus = InvalidationBus()
+    api_bus.subscribe(service.on_dataset_event)
+    watcher = EventLogWatcher(api_bus, ".cache/dataset_events.jsonl")
+    watcher.start()
+    watcher.stop()
+
+    # Stand-in for a workflow process: rewrite the snapshot, then append the event
+    pd.DataFrame({"id": [7], "amount": [7.0]}).to_parquet("datasets/acme/sales/data/data.parquet.tmp", index=False)
+    os.replace("datasets/acme/sales/data/data.parquet.tmp", "datasets/acme/sales/data/data.parquet")
+    with open(".cache/dataset_events.jsonl", "a") as f:
+        f.write('{"organization": "acme", "dataset": "sales"}\n')
+
+    assert amounts(service, "sales") == [1.0]  # not announced yet
+    watcher.poll()
+    assert amounts(service, "sales") == [7.0]
+
+
+def test_stale_result_is_not_cached_after_invalidation():
+    cache = QueryResultCache()
+    key = cache.key("acme", "sales", {"select": ["id"], "description": "ids"})
+    generation = cache.generation([("acme", "sales")])
+    cache.invalidate_dataset("acme", "sales")  # published while the query ran
+    cache.put(key, pa.table({"id": [1]}), generation)
+    assert cache.get(key) is None
+
+
+def test_catalog_entries_of_the_dataset_are_dropped(datasets):
+    load_dataset_definition("acme", "sales")
+    load_dataset_definition("acme", "costs")
+
+    assert metadata_cache.invalidate_directory("datasets/acme/sales") == 1
+    assert metadata_cache.invalidate_directory("datasets/acme/sales") == 0
+    assert metadata_cache.invalidate_directory("datasets/acme/costs") == 1
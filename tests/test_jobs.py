@@ -0,0 +1,157 @@
+import os
+import io
+import time
+import threading
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+import pytest
+from fastapi.testclient import TestClient
+import app as app_module
+from api.jobs import JobManager
+from api.query import QueryBuilder
+from api.services import QueryService
+from data_binding.snapshot import publish_snapshot
+
+ROWS = 20_000
+
+
+@pytest.fixture
+def jobs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("datasets/acme/events")
+    with open("datasets/acme/events/dataset.yaml", "w") as f:
+        f.write("name: events\ndatabase:\n  type: duckdb\n  file: data.parquet\n  table: events\n")
+    publish_snapshot(pa.table({"id": list(range(ROWS)), "value": [float(i % 97) for i in range(ROWS)]}),
+                     "acme", "events")
+    return JobManager(QueryService(), directory=str(tmp_path / "spool"), workers=2, ttl_seconds=60)
+
+
+def wait(jobs, job_id, timeout=10.0):
+    deadline = time.time() + timeout
+    job = jobs.get(job_id)
+    while not job.finished and time.time() < deadline:
+        time.sleep(0.02)
+        job = jobs.get(job_id)
+    return job
+
+
+def test_job_spools_its_result_and_reports_progress(jobs):
+    query = QueryBuilder().select("id", "value").where("value > 50").order_by("id").build().dict()
+
+    job = wait(jobs, jobs.submit(query, "acme", "events").id)
+
+    assert job.status == "succeeded" and job.progress == 1.0
+    result = pq.read_table(jobs.result_path(job))
+    assert job.rows == result.num_rows == sum(1 for i in range(ROWS) if i % 97 > 50)
+    assert job.bytes == os.path.getsize(jobs.result_path(job))
+    # Another process polls the record in the spool
+    other = JobManager(QueryService(), directory=jobs.directory)
+    assert other.get(job.id).to_dict() == job.to_dict()
+
+
+class SteppingQueryService:
+    """Reports progress in steps, reading the job's record between them as another process would."""
+
+    def __init__(self, directory):
+        self.observer = JobManager(QueryService(), directory=directory)
+        self.seen = []
+
+    def export_query_on_dataset(self, query, organization, dataset, path, format, compression, on_progress):
+        job_id = os.path.basename(path).split(".")[0]
+        for fraction in (0.005, 0.25, 0.5):
+            on_progress(fraction)
+            self.seen.append(self.observer.get(job_id).progress)
+        with open(path, "w") as f:
+            f.write("id\n1\n")
+        return 1
+
+
+def test_progress_is_persisted_for_other_processes(jobs):
+    service = SteppingQueryService(jobs.directory)
+    stepping = JobManager(service, directory=jobs.directory, workers=1)
+
+    job = wait(stepping, stepping.submit({"select": ["id"]}, "acme", "events", format="csv").id)
+
+    assert job.status == "succeeded"
+    # The first step is under the save threshold
+    assert service.seen == [0.0, 0.25, 0.5]
+    stepping.stop()
+
+
+class BlockingQueryService:
+    def __init__(self):
+        self.started, self.release = threading.Event(), threading.Event()
+
+    def export_query_on_dataset(self, query, organization, dataset, path, format, compression, on_progress):
+        self.started.set()
+        self.release.wait(10)
+        with open(path, "w") as f:
+            f.write("id\n1\n")
+        return 1
+
+
+def test_stop_fails_queued_jobs_and_lets_running_ones_finish(jobs):
+    service = BlockingQueryService()
+    blocking = JobManager(service, directory=jobs.directory, workers=1)
+    running = blocking.submit({"select": ["id"]}, "acme", "events", format="csv")
+    queued = blocking.submit({"select": ["id"]}, "acme", "events", format="csv")
+    service.started.wait(10)
+
+    blocking.stop()
+    service.release.set()
+
+    assert wait(blocking, running.id).status == "succeeded"
+    cancelled = JobManager(QueryService(), directory=jobs.directory).get(queued.id)
+    assert cancelled.status == "failed" and "shut down" in cancelled.error
+    with pytest.raises(RuntimeError):
+        blocking.submit({"select": ["id"]}, "acme", "events")
+
+
+def test_failed_and_unknown_jobs(jobs):
+    failed = wait(jobs, jobs.submit({"select": ["missing_column"]}, "acme", "events").id)
+
+    assert failed.status == "failed" and "missing_column" in failed.error
+    with pytest.raises(ValueError, match="Unsupported export format"):
+        jobs.submit({"select": ["id"]}, "acme", "events", format="xlsx")
+    with pytest.raises(FileNotFoundError):
+        jobs.submit({"select": ["id"]}, "acme", "nowhere")
+    with pytest.raises(KeyError):
+        jobs.get("../../etc/passwd")
+
+
+def test_expired_results_are_collected(jobs):
+    job = wait(jobs, jobs.submit({"select": ["id"]}, "acme", "events", format="csv").id)
+    path = jobs.result_path(job)
+
+    assert jobs.collect_garbage(now=job.finished_at + 30) == 0 and os.path.exists(path)
+    assert jobs.collect_garbage(now=job.finished_at + 61) == 1
+    assert os.listdir(jobs.directory) == []
+    with pytest.raises(KeyError):
+        jobs.get(job.id)
+
+
+@pytest.fixture
+def client(jobs):
+    app_module.app.dependency_overrides[app_module.get_job_manager] = lambda: jobs
+    yield TestClient(app_module.app)
+    app_module.app.dependency_overrides.clear()
+
+
+def test_job_api_serves_status_and_ranged_downloads(jobs, client):
+    response = client.post("/api/jobs", json={"organization": "acme", "dataset": "events", "format": "csv",
+                                              "query": {"select": ["id", "value"], "order_by": ["id"]}})
+    assert response.status_code == 202
+    status = client.get(response.headers["location"]).json()
+    assert status["status"] in ("queued", "running", "succeeded")
+    job = wait(jobs, status["id"])
+    status = client.get(f"/api/jobs/{job.id}").json()
+
+    full = client.get(status["result_url"])
+    assert full.status_code == 200 and full.headers["content-type"].startswith("text/csv")
+    assert pa_csv.read_csv(io.BytesIO(full.content)).num_rows == ROWS
+    part = client.get(status["result_url"], headers={"Range": "bytes=0-9"})
+    assert part.status_code == 206 and part.content == full.content[:10]
+    assert client.get("/api/jobs/0123456789abcdef0123456789abcdef").status_code == 404
+    assert client.post("/api/jobs", json={"organization": "acme", "dataset": "events", "format": "xlsx",
+                                          "query": {"select": ["id"]}}).status_code == 400
@@ -0,0 +1,94 @@
+import os
+import shutil
+import datetime
+import pyarrow as pa
+import pytest
+from api.query import QueryBuilder
+from api.result_cache import QueryResultCache
+from api.services import QueryService
+from data_binding.snapshot import publish_snapshot
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GDP = "worldbank/main_gdp_and_other_stats_gdp"
+UNEMPLOYMENT = "us_lbs/unemployment_rate"
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    # The real dataset.yaml files, with small snapshots
+    monkeypatch.chdir(tmp_path)
+    for name in (GDP, UNEMPLOYMENT):
+        os.makedirs(f"datasets/{name}")
+        shutil.copy(os.path.join(PROJECT_ROOT, "datasets", name, "dataset.yaml"), f"datasets/{name}/dataset.yaml")
+    with open(f"datasets/{GDP}/dataset.yaml") as f:
+        definition = f.read().replace("file: worldbank_gdp.duckdb", "file: data.parquet")
+    with open(f"datasets/{GDP}/dataset.yaml", "w") as f:
+        f.write(definition)
+
+    publish_snapshot(pa.table({
+        "country": ["United States", "United States", "Italy"],
+        "country_code": ["USA", "USA", "ITA"],
+        "year": pa.array([2021, 2022, 2022], pa.int16()),
+        "gdp": [23.3e12, 25.4e12, 2.0e12],
+    }), "worldbank", "main_gdp_and_other_stats_gdp")
+    publish_snapshot(pa.table({
+        "date": [datetime.date(2021, 1, 1), datetime.date(2021, 7, 1), datetime.date(2022, 1, 1), datetime.date(2023, 1, 1)],
+        "unemployment_rate": pa.array([6.0, 5.0, 4.0, 3.5], pa.float32()),
+    }), "us_lbs", "unemployment_rate")
+    return tmp_path
+
+
+def gdp_versus_unemployment():
+    return (QueryBuilder()
+            .select("unemployment_rate.year", "avg(unemployment_rate) AS unemployment", "max(gdp) AS gdp")
+            .join(GDP, "year", "country_code")
+            .group_by("unemployment_rate.year")
+            .order_by("unemployment_rate.year")
+            .build())
+
+
+def test_join_on_declared_keys(catalog):
+    rows = QueryService().execute_query_on_dataset(gdp_versus_unemployment(), "us_lbs", "unemployment_rate")
+
+    assert rows == [{"year": 2021, "unemployment": 5.5, "gdp": 23.3e12},
+                    {"year": 2022, "unemployment": 4.0, "gdp": 25.4e12}]
+
+
+def test_join_runs_as_one_hash_join(catalog):
+    table, profile = QueryService().profile_query_on_dataset(gdp_versus_unemployment(), "us_lbs", "unemployment_rate")
+
+    assert table.num_rows == 2
+    operators = [op["operator"] for op in profile["duckdb"]["operators"]]
+    assert any("HASH_JOIN" in op for op in operators)
+    # Only the referenced columns of the GDP snapshot are read
+    gdp_scan = next(op for op in profile["duckdb"]["operators"]
+                    if "main_gdp_and_other_stats_gdp" in str(op["extra_info"].get("Filename(s)")))
+    assert sorted(gdp_scan["extra_info"]["Projections"]) == ["country_code", "gdp", "year"]
+
+
+def test_left_join_keeps_unmatched_rows(catalog):
+    query = QueryBuilder().select("date", "gdp").join(GDP, "year", "country_code", how="left", alias="g").order_by("date").build()
+
+    rows = QueryService().execute_query_on_dataset(query, "us_lbs", "unemployment_rate")
+
+    assert [row["gdp"] for row in rows] == [23.3e12, 23.3e12, 25.4e12, None]
+
+
+@pytest.mark.parametrize("join, message", [
+    ({"dataset": GDP, "on": ["date"]}, "declares no join key 'date'"),
+    ({"dataset": GDP, "on": ["year"], "how": "cross"}, "Unsupported join type"),
+    ({"dataset": "unemployment_rate", "on": ["year"]}, "organization/dataset"),
+])
+def test_invalid_joins_are_rejected(catalog, join, message):
+    with pytest.raises(ValueError, match=message):
+        QueryService().execute_query_on_dataset({"select": ["*"], "join": [join]}, "us_lbs", "unemployment_rate")
+
+
+def test_cached_join_is_dropped_when_either_dataset_changes(catalog):
+    service = QueryService(result_cache=QueryResultCache())
+    service.execute_query_on_dataset_arrow(gdp_versus_unemployment(), "us_lbs", "unemployment_rate")
+    assert service.result_cache.info()["entries"] == 1
+
+    service.invalidate_dataset("worldbank", "main_gdp_and_other_stats_gdp")
+
+    assert service.result_cache.info()["entries"] == 0
@@ -0,0 +1,43 @@
+from fastapi.testclient import TestClient
+from app import app
+from utils.metrics import Registry, STAGE_LATENCY, ROWS_RETURNED
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    histogram = registry.histogram("test_seconds", "Test", ("stage",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, stage="a")
+    histogram.observe(0.5, stage="a")
+    histogram.observe(5, stage="a")
+
+    text = registry.render()
+
+    assert 'test_seconds_bucket{stage="a",le="0.1"} 1' in text
+    assert 'test_seconds_bucket{stage="a",le="1.0"} 2' in text
+    assert 'test_seconds_bucket{stage="a",le="+Inf"} 3' in text
+    assert 'test_seconds_count{stage="a"} 3' in text
+
+
+def test_cache_hit_ratio():
+    registry = Registry()
+    registry.register_cache("demo", lambda: {"hits": 3, "misses": 1})
+
+    assert 'dataflare_cache_hit_ratio{cache="demo"} 0.75' in registry.render()
+
+
+def test_metrics_endpoint_reports_routes_and_stages():
+    client = TestClient(app)
+    rows_before = ROWS_RETURNED.value()
+    executes_before = STAGE_LATENCY.count(stage="duckdb_execute")
+
+    response = client.post("/query/us_lbs/unemployment_rate",
+                           json={"description": "metrics", "select": ["date", "unemployment_rate"], "limit": 5})
+    assert response.status_code == 200
+
+    text = client.get("/metrics").text
+    assert 'route="/query/{organization}/{dataset}"' in text
+    assert 'dataflare_http_response_bytes_total{method="POST",route="/query/{organization}/{dataset}"}' in text
+    assert 'stage="serialization"' in text
+    assert 'dataflare_cache_hit_ratio{cache="metadata"}' in text
+    assert ROWS_RETURNED.value() == rows_before + 5
+    assert STAGE_LATENCY.count(stage="duckdb_execute") == executes_before + 1
@@ -0,0 +1,45 @@
+import json
+import logging
+from fastapi.testclient import TestClient
+from app import app
+from data_binding.duckdb import DuckDBConnectionManager
+
+QUERY = {"description": "profile", "select": ["date", "unemployment_rate"], "where": "unemployment_rate > 5", "limit": 3}
+
+
+def test_query_profile_returns_sql_plan_and_stage_timings():
+    client = TestClient(app)
+
+    response = client.post("/query/us_lbs/unemployment_rate?profile=true", json=QUERY)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["data"]) == 3
+    profile = body["profile"]
+    assert profile["sql"].startswith("SELECT date, unemployment_rate FROM unemployment_rate WHERE")
+    assert {"bind", "sql_build", "duckdb_execute", "serialization"} <= set(profile["stages_ms"])
+    assert any("SCAN" in op["operator"] for op in profile["duckdb"]["operators"])
+    assert profile["parquet"]["rows_total"] == 48
+
+
+def test_query_dataset_profile_flag():
+    client = TestClient(app)
+    body = {"dataset": "us_lbs/unemployment_rate", "query": QUERY, "profile": True}
+
+    response = client.post("/api/query_dataset", json=body)
+
+    assert response.status_code == 200
+    assert "profile" in response.json()
+
+
+def test_slow_queries_are_logged(caplog):
+    manager = DuckDBConnectionManager({"slow_query_threshold_ms": 0})
+
+    with caplog.at_level(logging.WARNING, logger="dataflare.slow_query"):
+        manager.execute_query_on_dataset("us_lbs", "unemployment_rate", dict(QUERY))
+
+    entry = json.loads(caplog.records[-1].getMessage())
+    assert entry["sql"].startswith("SELECT date, unemployment_rate")
+    assert entry["rows"] == 3
+    assert "duckdb_execute" in entry["stages_ms"]
+    assert entry["plan"]
@@ -34,7 +34,7 @@ def test_query_builder(query_service):
 
     assert len(result) == 2
     assert all("name" in item and "email" in item for item in result)
-    print(f"Query builder result: {json.dumps(result, indent=2)}")
+    print(f"Query builder result: {json.dumps(result.to_records(), indent=2)}")
 
 def test_query_chaining(query_service):
     query_builder = (QueryBuilder()
@@ -49,13 +49,13 @@ def test_query_chaining(query_service):
     assert len(result) == 1  # Only Charlie should be over 30
     assert "name" in result[0] and "email" in result[0]
     assert result[0]["name"] == "Charlie"
-    print(f"Query chaining result: {json.dumps(result, indent=2)}")
+    print(f"Query chaining result: {json.dumps(result.to_records(), indent=2)}")
 
 def test_empty_query(query_service):
     query_builder = QueryBuilder().from_table("users")
     result = query_service.execute_query(query_builder.build())
     assert len(result) == 3  # Should return all data when no fields are specified
-    print(f"Empty query result: {json.dumps(result, indent=2)}")
+    print(f"Empty query result: {json.dumps(result.to_records(), indent=2)}")
 
 def test_simple_query(query_service):
     query_builder = (QueryBuilder()
@@ -63,7 +63,7 @@ def test_simple_query(query_service):
         .select("name", "email")
     )
     result = query_service.execute_query(query_builder.build())
-    print(f"Simple query result: {json.dumps(result, indent=2)}")
+    print(f"Simple query result: {json.dumps(result.to_records(), indent=2)}")
 
     assert len(result) == 3
     assert all("name" in item and "email" in item for item in result)
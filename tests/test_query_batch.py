@@ -0,0 +1,35 @@
+from fastapi.testclient import TestClient
+from app import app
+
+
+def test_query_batch_returns_results_keyed_by_id():
+    client = TestClient(app)
+    body = {"queries": [
+        {"id": "latest", "organization": "us_lbs", "dataset": "unemployment_rate",
+         "query": {"select": ["date", "unemployment_rate"], "order_by": ["date DESC"], "limit": 3}},
+        {"id": "count", "organization": "us_lbs", "dataset": "unemployment_rate",
+         "query": {"select": ["count(*) AS n"]}},
+        {"id": "bad_column", "organization": "us_lbs", "dataset": "unemployment_rate",
+         "query": {"select": ["no_such_column"]}},
+        {"id": "missing", "organization": "nobody", "dataset": "nothing",
+         "query": {"select": ["x"]}},
+    ]}
+
+    response = client.post("/api/query_batch", json=body)
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert len(results["latest"]["data"]) == 3
+    assert results["latest"]["data"][0]["date"] >= results["latest"]["data"][1]["date"]
+    assert results["count"]["data"] == [{"n": 48}]
+    assert "error" in results["bad_column"]
+    assert "error" in results["missing"]
+
+
+def test_query_batch_rejects_duplicate_ids():
+    client = TestClient(app)
+    item = {"id": "a", "organization": "us_lbs", "dataset": "unemployment_rate", "query": {"select": ["date"]}}
+
+    response = client.post("/api/query_batch", json={"queries": [item, item]})
+
+    assert response.status_code == 400
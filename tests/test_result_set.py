@@ -0,0 +1,63 @@
+import json
+import datetime
+import pyarrow as pa
+import pytest
+from data_binding.result_set import ResultSet
+from utils.serialization import table_to_records
+from data_binding.database_engine import ConnectionManager
+
+ROWS = 10_000
+
+
+@pytest.fixture
+def result():
+    start = datetime.date(2000, 1, 1)
+    return ResultSet(pa.table({
+        "date": [start + datetime.timedelta(days=i) for i in range(ROWS)],
+        "state": [f"state_{i % 50:02d}" for i in range(ROWS)],
+        "rate": [None if i == 3 else float(i % 13) for i in range(ROWS)],
+    }))
+
+
+def test_reads_as_the_rows_the_api_returns(result):
+    records = table_to_records(result.table)
+
+    assert len(result) == ROWS and result == records
+    assert result[0] == {"date": "2000-01-01", "state": "state_00", "rate": 0.0}
+    assert result[-1] == records[-1]
+    assert list(result) == records
+    with pytest.raises(IndexError):
+        result[ROWS]
+
+
+def test_slices_share_the_columns(result):
+    window = result[100:110]
+
+    assert isinstance(window, ResultSet) and len(window) == 10
+    assert window.table.column("rate").chunk(0).buffers()[1].address == \
+        result.table.column("rate").chunk(0).buffers()[1].address
+    assert window == table_to_records(result.table)[100:110]
+    assert result[::5000] == [result[0], result[5000]]
+    assert result.head(3) == result[:3]
+
+
+def test_summary_and_columnar_json(result):
+    summary = result.summary()
+
+    assert summary["rows"] == ROWS
+    date, state, rate = summary["columns"]
+    assert (date["min"], date["max"]) == ("2000-01-01", "2027-05-18")
+    assert state["distinct"] == 50
+    assert (rate["nulls"], rate["min"], rate["max"]) == (1, 0.0, 12.0)
+    columnar = json.loads(result.head(2).to_columnar_json())
+    assert columnar == {"columns": ["date", "state", "rate"], "types": ["date32[day]", "string", "double"],
+                        "data": [["2000-01-01", "2000-01-02"], ["state_00", "state_01"], [0.0, 1.0]]}
+
+
+def test_duckdb_returns_result_sets(result):
+    manager = ConnectionManager.create({"type": "duckdb"})
+    # Queries run on cursors of their own, which see tables but not registered Arrow objects
+    manager.get_connection().from_arrow(result.table).create("rates")
+    rows = manager.execute_query({"table": "rates", "select": ["state", "rate"], "order_by": ["date"]})
+    assert isinstance(rows, ResultSet) and rows.column_names == ["state", "rate"] and len(rows) == ROWS
+
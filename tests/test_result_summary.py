@@ -0,0 +1,59 @@
+import json
+import datetime
+import pyarrow as pa
+import pytest
+from data_binding.result_set import ResultSet
+from api.result_summary import summarize_result
+from utils.serialization import encode_json
+from services.chat_service import ChatService
+
+QUERY = {"dataset": "us_lbs/unemployment_rate", "select": ["date", "state", "unemployment_rate"]}
+
+
+def rates(months: int, states: int = 50) -> ResultSet:
+    start = datetime.date(2000, 1, 1)
+    return ResultSet(pa.table({
+        "date": [start + datetime.timedelta(days=30 * (i // states)) for i in range(months * states)],
+        "state": [f"state_{i % states:02d}" + ("x" * 200 if i % states == 0 else "") for i in range(months * states)],
+        "unemployment_rate": [None if i == 1 else 4.0 + 0.01 * (i // states) for i in range(months * states)],
+    }))
+
+
+def test_summary_stats_come_from_duckdb():
+    summary = summarize_result(rates(240), top_k=3)
+
+    assert summary["rows"] == 12_000
+    date, state, rate = summary["columns"]
+    assert (date["min"], date["max"]) == ("2000-01-01", "2019-08-19")
+    assert state["distinct"] == 50 and len(state["top"]) == 3 and state["top"][0]["rows"] == 240
+    assert len(state["top"][0]["value"]) == 80
+    assert rate["nulls"] == 1 and rate["min"] == 4.0 and rate["max"] == pytest.approx(6.39)
+    assert rate["quantiles"]["p50"] == pytest.approx(5.2)
+    trend = summary["trend"]["measures"]["unemployment_rate"]
+    assert trend["slope_per_day"] == pytest.approx(0.01 / 30) and trend["r2"] == pytest.approx(1.0)
+    assert len(summary["sample"]) == 20
+
+
+@pytest.mark.parametrize("months", [10, 1_000, 20_000])
+def test_summary_size_is_bounded(months):
+    summary = summarize_result(rates(months), max_bytes=2048)
+
+    assert len(encode_json(summary)) <= 2048
+    assert summary["rows"] == months * 50 and len(summary["columns"]) == 3
+
+
+def test_chat_summarizes_large_results_and_links_the_full_data():
+    chat = ChatService(llm_service=object())
+    small, large = rates(1)[:10], rates(1_000)
+
+    assert json.loads(chat._generate_final_response("", QUERY, small).split("```")[-2]) == small.to_records()
+    message = chat._generate_final_response("", QUERY, large)
+    assert "The query returned 50000 rows" in message
+    summary = message.split("```")[-2].strip()
+    assert len(summary.encode("utf-8")) <= chat.summary_max_bytes and json.loads(summary)["rows"] == 50_000
+    assert "`/api/export/us_lbs/unemployment_rate?format=csv`" in message
+    full_result = chat._full_result(QUERY, large)
+    assert full_result["job_request"] == {"organization": "us_lbs", "dataset": "unemployment_rate",
+                                          "query": {"select": ["date", "state", "unemployment_rate"]},
+                                          "format": "csv"}
+    assert chat._full_result(QUERY, small) is None
@@ -0,0 +1,84 @@
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from utils.serialization import table_to_records
+from data_binding.duckdb import DuckDBConnectionManager
+from data_binding.snapshot import publish_snapshot
+from utils.schema import DatasetSchema, SchemaError
+
+GDP_COLUMNS = [
+    {'name': 'country', 'type': 'string', 'encoding': 'dictionary', 'nullable': False},
+    {'name': 'year', 'type': 'int16'},
+    {'name': 'gdp', 'type': 'float'},
+    {'name': 'growth', 'type': 'float32'},
+]
+
+
+def raw_table(**overrides):
+    columns = {
+        'country': ['Italy', 'France', 'Italy'],
+        'year': ['2021', '2021', '2022'],
+        'gdp': [2.1e12, 2.9e12, 2.2e12],
+        'growth': [0.7, 6.4, 3.7],
+    }
+    columns.update(overrides)
+    return pa.table(columns)
+
+
+def test_coerce_casts_to_compact_physical_types():
+    table = DatasetSchema.from_columns(GDP_COLUMNS).coerce(raw_table())
+
+    assert table.schema.field('country').type == pa.dictionary(pa.int32(), pa.string())
+    assert table.schema.field('year').type == pa.int16()
+    assert table.schema.field('gdp').type == pa.float64()
+    assert table.schema.field('growth').type == pa.float32()
+    assert table.column('year').to_pylist() == [2021, 2021, 2022]
+
+
+@pytest.mark.parametrize('table, message', [
+    (raw_table(year=['2021', '2021', '70000']), "'year' cannot be stored as int16"),
+    (raw_table(country=['Italy', None, 'Italy']), "'country' is not nullable"),
+    (raw_table().drop(['growth']), "missing ['growth']"),
+    (raw_table().append_column('extra', pa.array([1, 2, 3])), "unexpected ['extra']"),
+])
+def test_coerce_rejects_invalid_data(table, message):
+    with pytest.raises(SchemaError, match=message.replace('[', r'\[').replace(']', r'\]')):
+        DatasetSchema.from_columns(GDP_COLUMNS).coerce(table)
+
+
+def test_unknown_type_is_rejected():
+    with pytest.raises(SchemaError):
+        DatasetSchema.from_columns([{'name': 'x', 'type': 'decimal128'}])
+
+
+def test_typed_duckdb_table_and_validated_inserts(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = DuckDBConnectionManager({'database': ':memory:', 'slow_query_threshold_ms': 1000})
+    manager.register_dataset('test_org', 'gdp', GDP_COLUMNS)
+
+    manager.add_records('test_org', 'gdp', raw_table().to_pylist())
+
+    types = dict(manager.get_connection().execute("SELECT column_name, data_type FROM information_schema.columns WHERE table_name = 'gdp'").fetchall())
+    assert types == {'country': 'VARCHAR', 'year': 'SMALLINT', 'gdp': 'DOUBLE', 'growth': 'FLOAT'}
+    assert manager.get_connection().execute("SELECT count(*) FROM gdp").fetchone()[0] == 3
+    with pytest.raises(SchemaError):
+        manager.add_records('test_org', 'gdp', raw_table(year=['1', '2', 'x']).to_pylist())
+
+
+def test_snapshot_keeps_physical_types(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    table = DatasetSchema.from_columns(GDP_COLUMNS).coerce(raw_table())
+
+    path = publish_snapshot(table, 'test_org', 'gdp')
+
+    parquet = pq.ParquetFile(path)
+    assert parquet.schema_arrow.field('year').type == pa.int16()
+    assert parquet.schema_arrow.field('growth').type == pa.float32()
+    # Strings are dictionary-encoded by Parquet itself
+    assert 'RLE_DICTIONARY' in parquet.metadata.row_group(0).column(0).encodings
+
+
+def test_float32_serializes_without_widening_noise():
+    table = DatasetSchema.from_columns(GDP_COLUMNS).coerce(raw_table())
+    assert [row['growth'] for row in table_to_records(table)] == [0.7, 6.4, 3.7]
+    assert table_to_records(table)[0]['country'] == 'Italy'
@@ -0,0 +1,75 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+import duckdb
+import pyarrow as pa
+from utils.serialization import encode_table, table_to_records
+
+
+def test_temporal_and_decimal_columns_match_isoformat():
+    table = pa.table({
+        "ts": pa.array([datetime(2020, 1, 1), None], pa.timestamp("us")),
+        "ts_micro": pa.array([datetime(2020, 1, 1, 0, 0, 0, 1500), datetime(2020, 1, 2)], pa.timestamp("us")),
+        "day": pa.array([date(2021, 3, 4), date(2021, 3, 5)]),
+        "amount": pa.array([Decimal("1.25"), Decimal("2.50")], pa.decimal128(10, 2)),
+        "name": ["a", "b"],
+    })
+
+    records = table_to_records(table)
+
+    assert records[0] == {
+        "ts": datetime(2020, 1, 1).isoformat(),
+        "ts_micro": datetime(2020, 1, 1, 0, 0, 0, 1500).isoformat(),
+        "day": "2021-03-04",
+        "amount": 1.25,
+        "name": "a",
+    }
+    assert records[1]["ts"] is None
+    # Each value is formatted on its own: no fraction padding from other rows
+    assert records[1]["ts_micro"] == datetime(2020, 1, 2).isoformat()
+
+
+def test_nanosecond_and_timezone_aware_timestamps_match_isoformat():
+    table = pa.table({
+        "ts_nano": pa.array([1_577_836_800_000_000_001, 1_577_836_800_500_000_000], pa.timestamp("ns")),
+        "ts_tz": pa.array([datetime(2020, 1, 1, 12, 30), datetime(2020, 1, 1, 12, 30, 0, 250000)],
+                          pa.timestamp("ms", "Asia/Kolkata")),
+    })
+
+    records = table_to_records(table)
+
+    assert [r["ts_nano"] for r in records] == ["2020-01-01T00:00:00.000000001", "2020-01-01T00:00:00.500000"]
+    assert [r["ts_tz"] for r in records] == [value.isoformat() for value in table.column("ts_tz").to_pylist()]
+    assert records[0]["ts_tz"] == "2020-01-01T18:00:00+05:30"
+
+
+def test_encode_table_produces_row_objects():
+    table = duckdb.connect().execute(
+        "SELECT DATE '2020-01-01' + i::INTEGER AS day, i * 1.5 AS value FROM range(3) r(i)"
+    ).to_arrow_table()
+
+    rows = json.loads(encode_table(table))
+
+    assert rows == [
+        {"day": "2020-01-01", "value": 0.0},
+        {"day": "2020-01-02", "value": 1.5},
+        {"day": "2020-01-03", "value": 3.0},
+    ]
+
+
+def test_encode_table_matches_the_records():
+    table = pa.table({
+        "text": ['a "quoted" \\ path\n', "\x01 café", None],
+        "value": [float("nan"), float("inf"), 0.1 + 0.2],
+        "count": pa.array([1, None, 3], pa.int64()),
+        "flag": [True, False, None],
+        "day": pa.array([date(2021, 3, 4), None, date(2021, 3, 6)]),
+    })
+
+    rows = json.loads(encode_table(table))
+
+    # No JSON form for NaN and infinities
+    assert [row["value"] for row in rows] == [None, None, 0.1 + 0.2]
+    assert [{k: v for k, v in row.items() if k != "value"} for row in rows] == \
+        [{k: v for k, v in record.items() if k != "value"} for record in table_to_records(table)]
+    assert encode_table(table.slice(0, 0)) == b"[]"
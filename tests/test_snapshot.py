@@ -0,0 +1,42 @@
+import os
+import pandas as pd
+import pytest
+from data_binding.duckdb import DuckDBConnectionManager
+from data_binding.snapshot import publish_snapshot, get_snapshot_path, snapshot_version
+
+
+@pytest.fixture
+def dataset_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("datasets/acme/sales")
+    with open("datasets/acme/sales/dataset.yaml", "w") as f:
+        f.write("name: sales\ndatabase:\n  type: duckdb\n  file: data.parquet\n  table: sales\n")
+    return tmp_path
+
+
+def query_all(manager):
+    return manager.execute_query_on_dataset("acme", "sales", {"select": ["id", "amount"], "order_by": ["id"]})
+
+
+def test_publish_snapshot_is_atomic_and_versioned(dataset_dir):
+    path = publish_snapshot(pd.DataFrame({"id": [1], "amount": [1.0]}), "acme", "sales")
+    first = snapshot_version(path)
+    publish_snapshot(pd.DataFrame({"id": [1, 2], "amount": [1.0, 2.0]}), "acme", "sales")
+
+    assert path == get_snapshot_path("acme", "sales")
+    assert snapshot_version(path) != first
+    assert os.listdir(os.path.dirname(path)) == ["data.parquet"]
+
+
+def test_connection_manager_hot_swaps_new_snapshot(dataset_dir):
+    manager = DuckDBConnectionManager({})
+    publish_snapshot(pd.DataFrame({"id": [1], "amount": [1.5]}), "acme", "sales")
+    assert query_all(manager) == [{"id": 1, "amount": 1.5}]
+
+    # Unchanged snapshot: the view is reused, not re-created
+    registered = dict(manager.registered_snapshots)
+    query_all(manager)
+    assert manager.registered_snapshots == registered
+
+    publish_snapshot(pd.DataFrame({"id": [1, 2], "amount": [1.5, 3.0]}), "acme", "sales")
+    assert query_all(manager) == [{"id": 1, "amount": 1.5}, {"id": 2, "amount": 3.0}]
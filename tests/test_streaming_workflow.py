@@ -0,0 +1,91 @@
+import time
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from workflows.base_workflow import BaseWorkflow
+from workflows.streaming_workflow import StreamingWorkflow, bounded_prefetch
+from workflow_manager.manager import WorkflowManager
+
+
+class CounterStream(StreamingWorkflow):
+    def __init__(self, name, output_path, chunks=5, chunk_rows=100, fail_at=None):
+        super().__init__(name)
+        self._output_path = output_path
+        self.chunks = chunks
+        self.chunk_rows = chunk_rows
+        self.fail_at = fail_at
+
+    @property
+    def output_path(self):
+        return self._output_path
+
+    def fetch_chunks(self):
+        for i in range(self.chunks):
+            if i == self.fail_at:
+                raise ConnectionError("source went away")
+            yield list(range(i * self.chunk_rows, (i + 1) * self.chunk_rows))
+
+    def process_chunk(self, raw_chunk):
+        return pa.table({'n': pa.array(raw_chunk, pa.int64())})
+
+
+class ListBatch(BaseWorkflow):
+    def fetch_data(self):
+        return [1, 2, 3]
+
+    def process_data(self, raw_data):
+        return pd.DataFrame({'n': raw_data})
+
+
+def test_chunks_are_written_as_row_groups(tmp_path):
+    path = str(tmp_path / 'data.parquet')
+    workflow = CounterStream('counter', path)
+
+    assert workflow.run() == path
+
+    parquet = pq.ParquetFile(path)
+    assert parquet.metadata.num_row_groups == 5
+    assert parquet.read().column('n').to_pylist() == list(range(500))
+    assert workflow.rows_written == 500 and workflow.chunks_written == 5
+
+
+def test_failed_run_keeps_previous_snapshot(tmp_path):
+    path = str(tmp_path / 'data.parquet')
+    CounterStream('counter', path, chunks=2).run()
+
+    with pytest.raises(ConnectionError):
+        CounterStream('counter', path, chunks=5, fail_at=3).run()
+
+    assert pq.read_table(path).num_rows == 200
+    assert list(tmp_path.iterdir()) == [tmp_path / 'data.parquet']
+
+
+def test_prefetch_applies_backpressure():
+    produced = []
+
+    def source():
+        for i in range(20):
+            produced.append(i)
+            yield i
+
+    lead = []
+    for consumed, item in enumerate(bounded_prefetch(source(), depth=2), start=1):
+        time.sleep(0.01)  # slow consumer
+        lead.append(len(produced) - consumed)
+
+    # Queue depth, plus one chunk blocked in put() and one being handed over
+    assert max(lead) <= 3
+
+
+def test_manager_runs_batch_and_streaming_workflows(tmp_path):
+    manager = WorkflowManager()
+    manager.add_workflow(ListBatch('batch'))
+    manager.add_workflow(CounterStream('stream', str(tmp_path / 'data.parquet'), chunks=2))
+
+    results = manager.run_all_workflows()
+
+    assert results['batch']['n'].tolist() == [1, 2, 3]
+    assert pq.read_table(results['stream']).num_rows == 200
+    styles = {entry['name']: entry['style'] for entry in manager.get_workflow_metadata()}
+    assert styles == {'batch': 'batch', 'stream': 'streaming'}
@@ -0,0 +1,129 @@
+import os
+import sqlite3
+import datetime
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from api.query import QueryBuilder
+from api.services import QueryService
+
+MONTHS = [datetime.date(2020 + m // 12, m % 12 + 1, 1) for m in range(24)]
+
+
+def write_definition(name, database):
+    os.makedirs(f"datasets/acme/{name}", exist_ok=True)
+    lines = "".join(f"  {key}: {value}\n" for key, value in database.items())
+    with open(f"datasets/acme/{name}/dataset.yaml", "w") as f:
+        f.write(f"name: {name}\ndatabase:\n{lines}")
+
+
+@pytest.fixture
+def series(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # Two monthly series; `north` misses March and April 2020
+    rows = [(month, "south", float(i + 1)) for i, month in enumerate(MONTHS)]
+    rows += [(month, "north", float(10 * (i + 1))) for i, month in enumerate(MONTHS) if i not in (2, 3)]
+    # Daily readings within a month, for resampling
+    rows += [(datetime.date(2020, 1, day), "daily", float(day)) for day in (1, 2, 3)]
+    dates, regions, values = zip(*rows)
+    pq.write_table(pa.table({"date": list(dates), "region": list(regions), "value": list(values)}),
+                   tmp_path / "sales.parquet")
+    write_definition("duck", {"type": "duckdb", "path": tmp_path / "sales.parquet", "table": "sales"})
+    write_definition("arrow", {"type": "arrow", "path": tmp_path / "sales.parquet"})
+    return tmp_path
+
+
+def run(query, dataset="duck"):
+    return QueryService().execute_query_on_dataset(query, "acme", dataset)
+
+
+def test_rolling_average_and_year_over_year_change(series):
+    query = (QueryBuilder()
+             .select("date", "value")
+             .where("region = 'south'")
+             .series("date", {"op": "rolling", "column": "value", "window": 3},
+                     {"op": "pct_change", "column": "value", "window": 12, "alias": "yoy"})
+             .build())
+
+    rows = run(query)
+
+    assert len(rows) == 24
+    assert [row["value_rolling_avg_3"] for row in rows[:4]] == [None, None, 2.0, 3.0]
+    assert rows[12]["yoy"] == pytest.approx((13 - 1) / 1)
+    assert all(row["yoy"] is None for row in rows[:12])
+
+
+def test_operators_run_per_partition(series):
+    query = {"select": ["date", "region", "value"], "where": "region IN ('north', 'south')",
+             "time_column": "date", "partition_by": ["region"],
+             "series": [{"op": "delta", "column": "value"}, {"op": "lead", "column": "value", "alias": "next"},
+                        {"op": "rolling", "column": "value", "window": 2, "function": "sum", "min_periods": 1}]}
+
+    rows = run(query)
+
+    north = [row for row in rows if row["region"] == "north"]
+    assert rows[0]["region"] == "north" and len(north) == 22
+    assert [row["value_delta_1"] for row in north[:3]] == [None, 10.0, 30.0]
+    assert north[0]["next"] == 20.0 and north[-1]["next"] is None
+    assert north[0]["value_rolling_sum_2"] == 10.0
+
+
+@pytest.mark.parametrize("fill, march", [(None, None), ("null", None), ("zero", 0.0), ("forward", 20.0),
+                                         ("backward", 50.0), ("linear", pytest.approx(20.0 + 30.0 * 29 / 90))])
+def test_resample_fills_missing_periods(series, fill, march):
+    query = {"select": ["date", "value"], "where": "region = 'north' AND date < DATE '2020-07-01'",
+             "time_column": "date", "resample": {"every": "month", "fill": fill}}
+
+    rows = run(query)
+
+    by_date = {row["date"]: row["value"] for row in rows}
+    if fill is None:
+        assert "2020-03-01" not in by_date and len(rows) == 4
+    else:
+        assert len(rows) == 6 and by_date["2020-03-01"] == march
+
+
+def test_resample_aggregates_buckets_before_the_operators(series):
+    query = (QueryBuilder()
+             .select("date", "value")
+             .where("region = 'daily'")
+             .series("date", {"op": "lag", "column": "value"})
+             .resample("quarter", aggregate="sum")
+             .build())
+
+    assert run(query) == [{"date": "2020-01-01", "value": 6.0, "value_lag_1": None}]
+
+
+def test_arrow_backend_runs_operators_in_the_residual(series):
+    query = {"select": ["date", "value"], "where": "region = 'south'", "time_column": "date",
+             "series": [{"op": "pct_change", "column": "value", "window": 12}], "limit": 2, "order_by": ["date DESC"]}
+
+    table, profile = QueryService().profile_query_on_dataset(query, "acme", "arrow")
+
+    assert run(query, "arrow") == run(query)
+    assert table.num_rows == 2
+    # The filter still prunes the scan; the window runs over the 24 matching rows
+    assert profile["pushdown"]["filters"] == 1 and profile["pushdown"]["rows_scanned"] == 24
+    assert profile["pushdown"]["columns"] == ["date", "value"]
+
+
+@pytest.mark.parametrize("query, message", [
+    ({"select": ["value"], "series": [{"op": "lag", "column": "value"}]}, "time_column"),
+    ({"time_column": "date", "series": [{"op": "ewm", "column": "value"}]}, "Unsupported series operator"),
+    ({"time_column": "date", "series": [{"op": "lag", "column": "value", "window": 0}]}, "positive number"),
+    ({"time_column": "date", "resample": {"every": "fortnight"}, "select": ["date", "value"]}, "resample unit"),
+    ({"time_column": "date", "resample": {"every": "month"}, "group_by": ["region"]}, "group_by"),
+])
+def test_invalid_series_queries_are_rejected(series, query, message):
+    with pytest.raises(ValueError, match=message):
+        run(query)
+
+
+def test_backends_without_window_functions_reject_series(series):
+    connection = sqlite3.connect(series / "sales.sqlite")
+    connection.execute("CREATE TABLE sales (date TEXT, value REAL)")
+    connection.close()
+    write_definition("sqlite", {"type": "sqlite", "path": series / "sales.sqlite", "table": "sales"})
+
+    with pytest.raises(ValueError, match="cannot run series"):
+        run({"time_column": "date", "series": [{"op": "lag", "column": "value"}]}, "sqlite")
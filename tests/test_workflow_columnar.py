@@ -0,0 +1,44 @@
+import json
+from utils.schema import DatasetSchema
+from workflows.columnar import records_to_frame, read_json_pages
+
+COLUMNS = {'country': 'country.value', 'country_code': 'country.id', 'year': 'date', 'gdp': 'value'}
+SCHEMA = DatasetSchema.from_columns([
+    {'name': 'country', 'type': 'string', 'encoding': 'dictionary'},
+    {'name': 'country_code', 'type': 'string'},
+    {'name': 'year', 'type': 'int16'},
+    {'name': 'gdp', 'type': 'float'},
+])
+RECORDS = [
+    {'country': {'id': 'USA', 'value': 'United States'}, 'date': '2022', 'value': 25462700000000},
+    {'country': {'id': 'JPN', 'value': 'Japan'}, 'date': '2022', 'value': None},
+    {'country': {'id': 'CHN', 'value': 'China'}, 'date': '2021', 'value': 17963170000000.5},
+]
+
+
+def test_records_to_frame_casts_to_schema_and_drops_required_nulls():
+    frame = records_to_frame(iter(RECORDS), COLUMNS, SCHEMA, required=['gdp'])
+
+    assert list(frame.columns) == ['country', 'country_code', 'year', 'gdp']
+    assert frame['country_code'].tolist() == ['USA', 'CHN']
+    assert str(frame['year'].dtype) == 'int16' and str(frame['gdp'].dtype) == 'float64'
+    assert str(frame['country'].dtype) == 'category'
+
+
+def test_read_json_pages_matches_records_path(tmp_path):
+    paths = []
+    for page, records in enumerate([RECORDS[:2], RECORDS[2:]], start=1):
+        path = tmp_path / f'{page}.json'
+        path.write_text(json.dumps([{'page': page, 'pages': 2}, records]))
+        paths.append(str(path))
+
+    from_pages = read_json_pages(paths, COLUMNS, SCHEMA, required=['gdp'])
+    from_records = records_to_frame(RECORDS, COLUMNS, SCHEMA, required=['gdp'])
+
+    assert from_pages.to_dict('records') == from_records.to_dict('records')
+
+
+def test_empty_input_keeps_schema_columns():
+    frame = records_to_frame([], COLUMNS, SCHEMA)
+    assert list(frame.columns) == list(COLUMNS) and len(frame) == 0
+    assert str(frame['year'].dtype) == 'int16'
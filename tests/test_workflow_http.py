@@ -0,0 +1,124 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pandas as pd
+import pytest
+from workflows.base_workflow import BaseWorkflow
+from workflows.http import HttpClient, DownloadCache
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # Shared across requests: set by the test, read by the handler
+    state = {'body': b'', 'etag': '"v1"', 'requests': [], 'not_modified': 0}
+
+    def do_GET(self):
+        state = self.state
+        state['requests'].append(dict(self.headers))
+        if self.headers.get('If-None-Match') == state['etag']:
+            state['not_modified'] += 1
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('ETag', state['etag'])
+        self.send_header('Content-Length', str(len(state['body'])))
+        self.end_headers()
+        self.wfile.write(state['body'])
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    StubHandler.state = {'body': json.dumps([{'x': 1}, {'x': 2}]).encode(), 'etag': '"v1"',
+                         'requests': [], 'not_modified': 0}
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", StubHandler.state
+    server.shutdown()
+    server.server_close()
+
+
+class CountingWorkflow(BaseWorkflow):
+    def __init__(self, name, url, cache_dir):
+        super().__init__(name)
+        self.url = url
+        self._cache_dir = cache_dir
+        self.processed = 0
+
+    @property
+    def cache_dir(self):
+        return self._cache_dir
+
+    def fetch_data(self):
+        return self.http_get(f"{self.url}/data").json()
+
+    def process_data(self, raw_data):
+        self.processed += 1
+        return pd.DataFrame(raw_data)
+
+
+def test_conditional_request_served_from_cache(stub_server, tmp_path):
+    url, state = stub_server
+    client = HttpClient(DownloadCache(str(tmp_path)))
+
+    first = client.get(f"{url}/data")
+    second = client.get(f"{url}/data")
+
+    assert not first.from_cache and second.from_cache
+    assert second.content == first.content and second.sha256 == first.sha256
+    assert state['requests'][1]['If-None-Match'] == '"v1"'
+    assert state['not_modified'] == 1
+
+
+def test_run_skips_processing_when_payload_unchanged(stub_server, tmp_path):
+    url, state = stub_server
+    workflow = CountingWorkflow('counting', url, str(tmp_path))
+
+    first = workflow.run()
+    second = workflow.run()
+
+    assert workflow.processed == 1
+    assert workflow.skipped
+    pd.testing.assert_frame_equal(first, second)
+
+    # A new upstream version is downloaded and processed again
+    state['body'], state['etag'] = json.dumps([{'x': 3}]).encode(), '"v2"'
+    third = workflow.run()
+    assert workflow.processed == 2 and not workflow.skipped
+    assert third['x'].tolist() == [3]
+
+
+def test_unchanged_content_under_new_etag_is_still_skipped(stub_server, tmp_path):
+    url, state = stub_server
+    workflow = CountingWorkflow('counting', url, str(tmp_path))
+    workflow.run()
+
+    state['etag'] = '"v2"'  # same bytes, new validator
+    workflow.run()
+
+    assert workflow.processed == 1 and workflow.skipped
+
+
+class RenamingWorkflow(CountingWorkflow):
+    def process_data(self, raw_data):
+        self.processed += 1
+        return pd.DataFrame(raw_data).rename(columns={'x': 'value'})
+
+
+def test_changed_processing_invalidates_the_cached_output(stub_server, tmp_path):
+    url, _ = stub_server
+    CountingWorkflow('counting', url, str(tmp_path)).run()
+
+    bumped = type('BumpedWorkflow', (CountingWorkflow,), {'PROCESS_VERSION': 2})('counting', url, str(tmp_path))
+    bumped.run()
+    renaming = RenamingWorkflow('counting', url, str(tmp_path))
+    output = renaming.run()
+
+    assert bumped.processed == 1 and not bumped.skipped
+    assert renaming.processed == 1 and list(output.columns) == ['value']
+    renaming.run()
+    assert renaming.processed == 1 and renaming.skipped
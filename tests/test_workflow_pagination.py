@@ -0,0 +1,98 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import pytest
+from datasets.worldbank.main_gdp_and_other_stats_gdp.workflow import WorldBankGDPWorkflow
+from workflows.http import HttpClient, DownloadCache, RateLimiter
+from workflows.pagination import fetch_pages
+
+PAGES = 8
+PER_PAGE = 5
+PAGE_DELAY = 0.2
+
+
+class MockWorldBankHandler(BaseHTTPRequestHandler):
+    # Pages that answer 503 once before succeeding
+    flaky_pages = set()
+    hits = []
+
+    def do_GET(self):
+        page = int(parse_qs(urlparse(self.path).query)['page'][0])
+        self.hits.append(page)
+        if page in self.flaky_pages:
+            self.flaky_pages.discard(page)
+            self.send_response(503)
+            self.send_header('Retry-After', '0')
+            self.end_headers()
+            return
+        time.sleep(PAGE_DELAY)
+        records = [
+            {'country': {'id': f'C{page:02d}{i}', 'value': f'Country {page}-{i}'},
+             'date': '2022', 'value': str(page * 1000 + i)}
+            for i in range(PER_PAGE)
+        ]
+        body = json.dumps([{'page': page, 'pages': PAGES, 'per_page': PER_PAGE,
+                            'total': PAGES * PER_PAGE}, records]).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def mock_api():
+    MockWorldBankHandler.flaky_pages = set()
+    MockWorldBankHandler.hits = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MockWorldBankHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_pages_is_complete_ordered_and_concurrent(mock_api, tmp_path):
+    client = HttpClient(DownloadCache(str(tmp_path)))
+
+    start = time.perf_counter()
+    pages = fetch_pages(client, f"{mock_api}/indicator", {'format': 'json'}, max_workers=4)
+    elapsed = time.perf_counter() - start
+
+    assert len(pages) == PAGES
+    values = [int(record['value']) for page in pages for record in page]
+    assert values == [page * 1000 + i for page in range(1, PAGES + 1) for i in range(PER_PAGE)]
+    # Page 1, then 7 pages 4 at a time: ~3 round trips instead of 8
+    assert elapsed < PAGES * PAGE_DELAY * 0.75
+
+
+def test_fetch_pages_retries_transient_errors(mock_api, tmp_path):
+    MockWorldBankHandler.flaky_pages = {3, 6}
+    client = HttpClient(DownloadCache(str(tmp_path)), backoff=0)
+
+    pages = fetch_pages(client, f"{mock_api}/indicator", max_workers=4)
+
+    assert sum(len(page) for page in pages) == PAGES * PER_PAGE
+    assert MockWorldBankHandler.hits.count(3) == 2
+
+
+def test_rate_limiter_spaces_requests():
+    limiter = RateLimiter(rate=50)
+    start = time.perf_counter()
+    for _ in range(6):
+        limiter.acquire()
+    assert time.perf_counter() - start >= 5 / 50 * 0.9
+
+
+def test_worldbank_workflow_reads_every_page(mock_api, tmp_path):
+    workflow = WorldBankGDPWorkflow('worldbank_gdp', mock_api, '/country/all/indicator/NY.GDP.MKTP.CD')
+    workflow.http = HttpClient(DownloadCache(str(tmp_path)))
+
+    result = workflow.process_data(workflow.fetch_data())
+
+    assert len(result) == PAGES * PER_PAGE
+    assert result['country_code'].is_unique
@@ -1,15 +1,132 @@
 import yaml
-from typing import Dict, List
+from typing import IO, Any, Callable, Dict, List, Optional, Tuple
 import os
+import threading
 import logging
+from utils.metrics import registry, stage
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_CONFIG_PATH = 'config/config.yaml'
 
+# libyaml's C loader is several times faster than the pure Python one; fall
+# back transparently when PyYAML was built without it.
+YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+class FrozenDict(dict):
+    """
+    Read-only dict returned by the metadata cache.
+
+    It is still a ``dict`` so it can be handed to ``json.dumps``/``JSONResponse``
+    as-is; callers that need to modify a definition should take a ``thaw`` copy.
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Cached metadata is read-only; use thaw() to get a mutable copy")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+    def __reduce__(self):
+        return (dict, (thaw(self),))
+
+
+def freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(v) for v in value]
+    return value
+
+
+def _parse_yaml(file: IO) -> Any:
+    return freeze(yaml.load(file, Loader=YamlLoader))
+
+
+class MetadataCache:
+    """
+    Process-level cache of parsed files (YAML unless another ``parse`` is given).
+
+    Entries are keyed by path and validated against ``os.stat`` on every lookup,
+    so edits on disk are picked up on the next call without any explicit
+    invalidation. Parsed documents are frozen so a single instance can be shared
+    by every request.
+    """
+
+    def __init__(self, parse: Callable[[IO], Any] = None, stage_name: str = 'yaml_load'):
+        self.parse = parse or _parse_yaml
+        self.stage_name = stage_name
+        self._entries: Dict[str, Tuple[Tuple[int, int, int], Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, file_path: str) -> Any:
+        signature = self.signature(file_path)
+        if signature is None:
+            raise FileNotFoundError(f"No such file: {file_path}")
+        key = os.path.abspath(file_path)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == signature:
+            self.hits += 1
+            return entry[1]
+
+        with stage(self.stage_name), open(file_path, 'r') as file:
+            value = self.parse(file)
+        with self._lock:
+            self._entries[key] = (signature, value)
+            self.misses += 1
+        return value
+
+    def signature(self, file_path: str) -> Optional[Tuple[int, int, int]]:
+        """The stat signature entries are validated against; None if the file does not exist."""
+        try:
+            st = os.stat(file_path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def invalidate(self, file_path: str = None):
+        with self._lock:
+            if file_path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(file_path), None)
+
+    def invalidate_directory(self, directory: str) -> int:
+        """Drop every entry under ``directory``; returns how many were dropped."""
+        prefix = os.path.join(os.path.abspath(directory), '')
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+    def info(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+metadata_cache = MetadataCache()
+registry.register_cache('metadata', metadata_cache.info)
+
+
 def load_yaml(file_path: str) -> Dict:
-    with open(file_path, 'r') as file:
-        return yaml.safe_load(file)
+    return metadata_cache.get(file_path)
 
 def load_config(config_path: str = DEFAULT_CONFIG_PATH) -> Dict:
     # Get the directory of the current script
@@ -18,7 +135,7 @@ def load_config(config_path: str = DEFAULT_CONFIG_PATH) -> Dict:
     project_root = os.path.dirname(current_dir)
     # Construct the full path
     full_path = os.path.join(project_root, config_path)
-    
+
     if not os.path.exists(full_path):
         raise FileNotFoundError(f"Config file not found: {full_path}")
     return load_yaml(full_path)
@@ -26,17 +143,19 @@ def load_config(config_path: str = DEFAULT_CONFIG_PATH) -> Dict:
 def get_dataset_yaml_path(organization: str, dataset_code: str) -> str:
     return os.path.join('datasets', organization, dataset_code, 'dataset.yaml')
 
+def get_datacard_yaml_path(organization: str, definition: str) -> str:
+    return os.path.join('datacards', organization, f"{definition}.yml")
+
 def load_dataset_definition(organization: str, dataset: str):
     file_path = get_dataset_yaml_path(organization, dataset)
-    logger.info(f"Loading dataset definition from: {file_path}")
+    logger.debug("Loading dataset definition from: %s", file_path)
     try:
-        with open(file_path, 'r') as file:
-            return yaml.safe_load(file)
+        return load_yaml(file_path)
     except FileNotFoundError:
-        logger.error(f"Dataset definition file not found: {file_path}")
+        logger.error("Dataset definition file not found: %s", file_path)
         raise
     except yaml.YAMLError as e:
-        logger.error(f"Error parsing dataset YAML: {e}")
+        logger.error("Error parsing dataset YAML: %s", e)
         raise
 
 def save_dataset_definition(dataset_name: str, database: str, connection_config: Dict, schema: List[str], organization: str, dataset_code: str):
@@ -49,4 +168,5 @@ def save_dataset_definition(dataset_name: str, database: str, connection_config:
     file_path = get_dataset_yaml_path(organization, dataset_code)
     os.makedirs(os.path.dirname(file_path), exist_ok=True)
     with open(file_path, 'w') as f:
-        yaml.dump(dataset_definition, f)
\ No newline at end of file
+        yaml.dump(dataset_definition, f)
+    metadata_cache.invalidate(file_path)
@@ -0,0 +1,168 @@
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# Seconds; covers sub-millisecond cache hits up to slow LLM calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(labelnames: Sequence[str], labelvalues: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram(Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # key -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple, List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 2)
+            state[index] += 1
+            state[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        state = self._values.get(self._key(labels))
+        return int(sum(state[:-1])) if state else 0
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for key, state in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), state[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = _format_labels(self.labelnames, key, 'le="%s"' % le)
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {state[-1]}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._caches: Dict[str, Callable[[], Dict[str, int]]] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_cache(self, name: str, info: Callable[[], Dict[str, int]]):
+        """Expose a cache's ``{"hits": .., "misses": ..}`` counters and hit ratio."""
+        self._caches[name] = info
+
+    def _register(self, metric: Metric):
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        if self._caches:
+            cache_lines = {"hits": [], "misses": [], "ratio": []}
+            for name, info in sorted(self._caches.items()):
+                stats = info()
+                hits, misses = stats.get("hits", 0), stats.get("misses", 0)
+                cache_lines["hits"].append(f'dataflare_cache_hits_total{{cache="{name}"}} {hits}')
+                cache_lines["misses"].append(f'dataflare_cache_misses_total{{cache="{name}"}} {misses}')
+                ratio = hits / (hits + misses) if hits + misses else 0.0
+                cache_lines["ratio"].append(f'dataflare_cache_hit_ratio{{cache="{name}"}} {ratio}')
+            lines += ["# HELP dataflare_cache_hits_total Cache lookups served from cache", "# TYPE dataflare_cache_hits_total counter"]
+            lines += cache_lines["hits"]
+            lines += ["# HELP dataflare_cache_misses_total Cache lookups that had to load", "# TYPE dataflare_cache_misses_total counter"]
+            lines += cache_lines["misses"]
+            lines += ["# HELP dataflare_cache_hit_ratio Hits over total lookups since start", "# TYPE dataflare_cache_hit_ratio gauge"]
+            lines += cache_lines["ratio"]
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+REQUEST_LATENCY = registry.histogram(
+    "dataflare_http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status")
+)
+RESPONSE_BYTES = registry.counter(
+    "dataflare_http_response_bytes_total", "Response body bytes sent by route", ("method", "route")
+)
+STAGE_LATENCY = registry.histogram(
+    "dataflare_stage_duration_seconds", "Time spent in each request-path stage", ("stage",)
+)
+ROWS_RETURNED = registry.counter(
+    "dataflare_query_rows_returned_total", "Rows returned by dataset queries"
+)
+
+
+def stage(name: str):
+    """Time a block of the request path, e.g. ``with stage("duckdb_execute"): ...``."""
+    return STAGE_LATENCY.time(stage=name)
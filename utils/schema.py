@@ -0,0 +1,175 @@
+from typing import Any, Dict, List, Optional, Union
+import pyarrow as pa
+
+# Declared column types -> (Arrow type, DuckDB type). Logical types map to the
+# general-purpose width; sized types (int16, float32, ...) let a dataset.yaml
+# ask for a compact physical type.
+COLUMN_TYPES = {
+    'string': (pa.string(), 'VARCHAR'),
+    'bool': (pa.bool_(), 'BOOLEAN'),
+    'boolean': (pa.bool_(), 'BOOLEAN'),
+    'int': (pa.int64(), 'BIGINT'),
+    'integer': (pa.int64(), 'BIGINT'),
+    'int8': (pa.int8(), 'TINYINT'),
+    'int16': (pa.int16(), 'SMALLINT'),
+    'int32': (pa.int32(), 'INTEGER'),
+    'int64': (pa.int64(), 'BIGINT'),
+    'float': (pa.float64(), 'DOUBLE'),
+    'double': (pa.float64(), 'DOUBLE'),
+    'float32': (pa.float32(), 'REAL'),
+    'float64': (pa.float64(), 'DOUBLE'),
+    'date': (pa.date32(), 'DATE'),
+    'datetime': (pa.timestamp('us'), 'TIMESTAMP'),
+    'timestamp': (pa.timestamp('us'), 'TIMESTAMP'),
+}
+
+DICTIONARY_STRING = pa.dictionary(pa.int32(), pa.string())
+
+
+class SchemaError(ValueError):
+    """Data does not match the schema declared in dataset.yaml."""
+
+
+class ColumnSpec:
+    """
+    One declared column. ``encoding: dictionary`` stores a string column as
+    dictionary indices (for low-cardinality values such as country names);
+    ``nullable: false`` rejects nulls at ingest.
+    """
+
+    def __init__(self, name: str, type: str = 'string', encoding: Optional[str] = None,
+                 nullable: bool = True, description: Optional[str] = None):
+        if type not in COLUMN_TYPES:
+            raise SchemaError(f"Column '{name}' has unknown type '{type}'")
+        if encoding not in (None, 'dictionary'):
+            raise SchemaError(f"Column '{name}' has unknown encoding '{encoding}'")
+        if encoding == 'dictionary' and type != 'string':
+            raise SchemaError(f"Column '{name}': dictionary encoding applies to string columns only")
+        self.name = name
+        self.type = type
+        self.encoding = encoding
+        self.nullable = nullable
+        self.description = description
+
+    @property
+    def arrow_type(self) -> pa.DataType:
+        return DICTIONARY_STRING if self.encoding == 'dictionary' else COLUMN_TYPES[self.type][0]
+
+    @property
+    def duckdb_type(self) -> str:
+        return COLUMN_TYPES[self.type][1]
+
+    def to_dict(self) -> Dict[str, Any]:
+        column = {'name': self.name, 'type': self.type}
+        if self.encoding:
+            column['encoding'] = self.encoding
+        if not self.nullable:
+            column['nullable'] = False
+        if self.description:
+            column['description'] = self.description
+        return column
+
+
+class DatasetSchema:
+    """
+    Typed schema of a dataset, built from the ``schema``/``columns`` list of its
+    dataset.yaml. Workflows coerce their output with it before it is written,
+    and DuckDBConnectionManager uses it for table DDL and inserts, so a
+    column has the same physical type in memory, in Parquet and in DuckDB.
+    """
+
+    def __init__(self, columns: List[ColumnSpec]):
+        self.columns = columns
+        self._by_name = {column.name: column for column in columns}
+
+    @classmethod
+    def from_definition(cls, definition: Dict[str, Any]) -> Optional['DatasetSchema']:
+        declared = schema_columns(definition)
+        # Definitions saved from raw DDL ("id INTEGER") carry no typed columns
+        if not declared or not all(isinstance(column, dict) for column in declared):
+            return None
+        return cls.from_columns(declared)
+
+    @classmethod
+    def from_columns(cls, declared: List[Dict[str, Any]]) -> 'DatasetSchema':
+        keys = ('name', 'type', 'encoding', 'nullable', 'description')
+        return cls([ColumnSpec(**{key: column[key] for key in keys if key in column}) for column in declared])
+
+    def to_columns(self) -> List[Dict[str, Any]]:
+        """The column list as written in dataset.yaml."""
+        return [column.to_dict() for column in self.columns]
+
+    @property
+    def names(self) -> List[str]:
+        return [column.name for column in self.columns]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._by_name
+
+    def column(self, name: str) -> ColumnSpec:
+        return self._by_name[name]
+
+    @property
+    def arrow_schema(self) -> pa.Schema:
+        return pa.schema([pa.field(column.name, column.arrow_type, nullable=column.nullable)
+                          for column in self.columns])
+
+    def duckdb_columns(self) -> List[str]:
+        """Column definitions for ``CREATE TABLE``."""
+        return [f'"{column.name}" {column.duckdb_type}' + ('' if column.nullable else ' NOT NULL')
+                for column in self.columns]
+
+    def coerce(self, table: pa.Table) -> pa.Table:
+        """
+        Validate ``table`` against the schema and cast it to the physical types.
+
+        The result has exactly the declared columns, in declared order. Missing
+        or undeclared columns, values that do not parse or fit (e.g. a year
+        outside int16) and nulls in non-nullable columns raise SchemaError.
+        """
+        missing = [name for name in self.names if name not in table.column_names]
+        unexpected = [name for name in table.column_names if name not in self]
+        if missing or unexpected:
+            raise SchemaError(f"Columns do not match the schema: missing {missing}, unexpected {unexpected}")
+        arrays = []
+        for column in self.columns:
+            values = table.column(column.name)
+            if not column.nullable and values.null_count:
+                raise SchemaError(f"Column '{column.name}' is not nullable but has {values.null_count} null(s)")
+            try:
+                if column.encoding == 'dictionary' and pa.types.is_dictionary(values.type):
+                    values = values.cast(pa.string())
+                arrays.append(values.cast(column.arrow_type))
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+                raise SchemaError(f"Column '{column.name}' cannot be stored as {column.type}: {e}") from e
+        return pa.Table.from_arrays(arrays, schema=self.arrow_schema)
+
+
+def storage_table(table: pa.Table) -> pa.Table:
+    """
+    The table as it should be written to Parquet.
+
+    Parquet already dictionary-encodes string pages, so dictionary columns are
+    written as plain strings: storing the Arrow dictionary type on top adds
+    per-row-group dictionaries and made DuckDB scans of the file slower.
+    Integer and float widths are kept.
+    """
+    if not any(pa.types.is_dictionary(field.type) for field in table.schema):
+        return table
+    fields = [pa.field(field.name, field.type.value_type, nullable=field.nullable)
+              if pa.types.is_dictionary(field.type) else field for field in table.schema]
+    return table.cast(pa.schema(fields, metadata=table.schema.metadata))
+
+
+def schema_columns(definition: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The column list of a dataset definition (declared as ``schema`` or ``columns``)."""
+    return list(definition.get('schema') or definition.get('columns') or [])
+
+
+def dataset_schema(source: Union[Dict[str, Any], List[Any], 'DatasetSchema', None]) -> Optional['DatasetSchema']:
+    """A DatasetSchema from a definition dict, a list of column dicts, or a DatasetSchema."""
+    if source is None or isinstance(source, DatasetSchema):
+        return source
+    if isinstance(source, dict):
+        return DatasetSchema.from_definition(source)
+    return DatasetSchema.from_definition({'schema': list(source)})
@@ -0,0 +1,110 @@
+import json
+import threading
+from typing import Any
+import duckdb
+import pyarrow as pa
+import pyarrow.compute as pc
+from utils.metrics import stage
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def encode_json(content: Any) -> bytes:
+    """Serialize JSON-compatible content to bytes, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, separators=(',', ':')).encode('utf-8')
+
+
+def _isoformat(column: pa.ChunkedArray) -> pa.ChunkedArray:
+    """
+    Timestamps as ``datetime.isoformat()`` writes each value: a fraction only
+    when the value has one (nine digits when it has nanoseconds), and the UTC
+    offset of timezone-aware values.
+    """
+    column_type = column.type
+    parts = [pc.strftime(column.cast(pa.timestamp('s', column_type.tz), safe=False), format='%Y-%m-%dT%H:%M:%S')]
+    if column_type.unit != 's':
+        # millisecond/microsecond/nanosecond are each the part below the previous unit
+        micros = pc.add(pc.multiply(pc.millisecond(column), 1000), pc.microsecond(column))
+        fraction = pc.binary_join_element_wise('.', pc.utf8_lpad(micros.cast(pa.string()), 6, '0'), '')
+        has_fraction = pc.not_equal(micros, 0)
+        if column_type.unit == 'ns':
+            nanos = pc.nanosecond(column)
+            fraction = pc.if_else(pc.not_equal(nanos, 0), pc.binary_join_element_wise(
+                fraction, pc.utf8_lpad(nanos.cast(pa.string()), 3, '0'), ''), fraction)
+            has_fraction = pc.or_(has_fraction, pc.not_equal(nanos, 0))
+        parts.append(pc.if_else(has_fraction, fraction, ''))
+    if column_type.tz is not None:
+        # %z is +HHMM; isoformat writes +HH:MM
+        offset = pc.strftime(column, format='%z')
+        parts.append(pc.binary_join_element_wise(pc.utf8_slice_codeunits(offset, 0, 3),
+                                                 pc.utf8_slice_codeunits(offset, 3, 5), ':'))
+    return pc.binary_join_element_wise(*parts, '')
+
+
+def _json_compatible_column(column: pa.ChunkedArray) -> pa.ChunkedArray:
+    column_type = column.type
+    if pa.types.is_timestamp(column_type):
+        return _isoformat(column)
+    if pa.types.is_date(column_type):
+        return pc.strftime(column, format='%Y-%m-%d')
+    if pa.types.is_time(column_type):
+        return column.cast(pa.string())
+    if pa.types.is_decimal(column_type):
+        return column.cast(pa.float64())
+    if pa.types.is_float32(column_type):
+        # Via the shortest decimal form, so 3.7 stays 3.7 rather than 3.700000047683716
+        return column.cast(pa.string()).cast(pa.float64())
+    if pa.types.is_dictionary(column_type):
+        return column.cast(column_type.value_type)
+    return column
+
+
+def to_json_compatible(table: pa.Table) -> pa.Table:
+    """
+    Convert the columns JSON has no type for (dates, timestamps, times,
+    decimals) to strings/floats, one vectorized Arrow kernel per column.
+    """
+    columns = [_json_compatible_column(column) for column in table.columns]
+    return pa.Table.from_arrays(columns, names=table.column_names)
+
+
+def table_to_records(table: pa.Table) -> list:
+    with stage("serialization"):
+        return to_json_compatible(table).to_pylist()
+
+
+_encoder = threading.local()
+
+
+def _finite(column: pa.ChunkedArray) -> pa.ChunkedArray:
+    # NaN and infinities have no JSON form; encode_json writes them as null too
+    if pa.types.is_floating(column.type):
+        return pc.if_else(pc.is_finite(column), column, None)
+    return column
+
+
+def encode_table(table: pa.Table) -> bytes:
+    """
+    Encode an Arrow table as a JSON array of row objects, from its columns:
+    DuckDB writes each row's object and Arrow joins them, so no Python object
+    is built per row or value.
+    """
+    with stage("serialization"):
+        table = to_json_compatible(table)
+        table = pa.Table.from_arrays([_finite(column) for column in table.columns], names=table.column_names)
+        connection = getattr(_encoder, 'connection', None)
+        if connection is None:
+            connection = _encoder.connection = duckdb.connect()
+        connection.register('_rows', table)
+        try:
+            rows = connection.execute("SELECT to_json(_rows)::VARCHAR FROM _rows").to_arrow_table().column(0)
+        finally:
+            connection.unregister('_rows')
+        # One list of every row, joined into the array's body
+        rows = pa.ListArray.from_arrays(pa.array([0, len(rows)], pa.int32()), rows.combine_chunks())
+        return b'[' + pc.binary_join(rows, ',')[0].as_py().encode('utf-8') + b']'
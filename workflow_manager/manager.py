@@ -1,9 +1,14 @@
 # workflow_manager/manager.py
 
-from typing import Dict, List
+from typing import Dict, List, Union
 from workflows.base_workflow import BaseWorkflow
+from workflows.streaming_workflow import StreamingWorkflow
 import pandas as pd
 
+# Batch workflows return their DataFrame; streaming workflows write their
+# snapshot chunk by chunk and return its path
+WorkflowResult = Union[pd.DataFrame, str]
+
 class WorkflowManager:
     def __init__(self):
         self.workflows: Dict[str, BaseWorkflow] = {}
@@ -11,22 +16,28 @@ class WorkflowManager:
     def add_workflow(self, workflow: BaseWorkflow):
         self.workflows[workflow.name] = workflow
 
-    def run_workflow(self, name: str) -> pd.DataFrame:
+    def run_workflow(self, name: str) -> WorkflowResult:
         if name not in self.workflows:
             raise ValueError(f"Workflow '{name}' not found")
         return self.workflows[name].run()
 
-    def run_all_workflows(self) -> Dict[str, pd.DataFrame]:
+    def run_all_workflows(self) -> Dict[str, WorkflowResult]:
         return {name: workflow.run() for name, workflow in self.workflows.items()}
 
     def get_workflow_metadata(self) -> List[Dict]:
-        return [
-            {
+        metadata = []
+        for workflow in self.workflows.values():
+            if not workflow.start_time:
+                continue
+            entry = {
                 "name": workflow.name,
+                "style": "streaming" if isinstance(workflow, StreamingWorkflow) else "batch",
                 "start_time": workflow.start_time,
                 "end_time": workflow.end_time,
                 "duration": workflow.end_time - workflow.start_time if workflow.end_time else None
             }
-            for workflow in self.workflows.values()
-            if workflow.start_time
-        ]
\ No newline at end of file
+            if isinstance(workflow, StreamingWorkflow):
+                entry["rows_written"] = workflow.rows_written
+                entry["chunks_written"] = workflow.chunks_written
+            metadata.append(entry)
+        return metadata
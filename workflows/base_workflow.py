@@ -1,15 +1,30 @@
 # workflows/base_workflow.py
 
 from abc import ABC, abstractmethod
+import os
+import json
+import hashlib
+import inspect
 import pandas as pd
 from datetime import datetime
-from typing import Any  
+from typing import Any, Dict, List, Optional, Tuple
+from workflows.http import HttpClient, HttpPayload, DownloadCache, DEFAULT_CACHE_DIR, atomic_write
+from workflows.pagination import PageStream, fetch_pages
+from utils.config_loader import load_config, load_yaml
+from utils.schema import DatasetSchema
 
 class BaseWorkflow(ABC):
+    # Raise when process_data's output changes for the same payloads in a way
+    # its own source does not show, e.g. through a helper it calls
+    PROCESS_VERSION = 1
+
     def __init__(self, name: str):
         self.name = name
         self.start_time = None
         self.end_time = None
+        self.skipped = False
+        self._http: Optional[HttpClient] = None
+        self._payload_hashes: List[str] = []
 
     def log_start(self):
         self.start_time = datetime.now()
@@ -21,11 +36,132 @@ class BaseWorkflow(ABC):
         print(f"Finished workflow '{self.name}' at {self.end_time}")
         print(f"Duration: {duration}")
 
+    @property
+    def dataset_dir(self) -> str:
+        """Directory of the workflow's module, i.e. ``datasets/<org>/<dataset>``."""
+        return os.path.dirname(inspect.getfile(type(self)))
+
+    @property
+    def dataset_key(self) -> Optional[Tuple[str, str]]:
+        """``(organization, dataset)`` when the workflow lives under ``datasets/``, else None."""
+        org_dir, dataset = os.path.split(os.path.abspath(self.dataset_dir))
+        datasets_dir, organization = os.path.split(org_dir)
+        if os.path.basename(datasets_dir) != 'datasets':
+            return None
+        return organization, dataset
+
+    @property
+    def definition(self) -> Dict[str, Any]:
+        """The ``dataset.yaml`` next to the workflow's module, or {} if there is none."""
+        path = os.path.join(self.dataset_dir, 'dataset.yaml')
+        return load_yaml(path) if os.path.exists(path) else {}
+
+    @property
+    def schema(self) -> Optional[DatasetSchema]:
+        """Typed schema declared in ``dataset.yaml``; output is coerced to it before it is stored."""
+        return DatasetSchema.from_definition(self.definition)
+
+    @property
+    def workflow_config(self) -> Dict[str, Any]:
+        return load_config().get('workflows', {})
+
+    @property
+    def cache_dir(self) -> str:
+        return self.workflow_config.get('cache_dir', DEFAULT_CACHE_DIR)
+
+    @property
+    def http(self) -> HttpClient:
+        """Pooled, cache-backed HTTP client shared by every request of this workflow."""
+        if self._http is None:
+            http_config = self.workflow_config.get('http', {})
+            self._http = HttpClient(
+                DownloadCache(os.path.join(self.cache_dir, 'downloads')),
+                pool_size=http_config.get('pool_size', 10),
+                retries=http_config.get('retries', 3),
+                rate_limit=http_config.get('rate_limit_per_second'),
+            )
+        return self._http
+
+    @http.setter
+    def http(self, client: HttpClient):
+        self._http = client
+
+    def http_get(self, url: str, params: Optional[Dict] = None, **kwargs) -> HttpPayload:
+        return self._record(self.http.get(url, params=params, **kwargs))
+
+    def http_post(self, url: str, json_body: Any = None, **kwargs) -> HttpPayload:
+        return self._record(self.http.post(url, json_body=json_body, **kwargs))
+
+    def http_get_pages(self, url: str, params: Optional[Dict] = None, **kwargs) -> PageStream:
+        """
+        Fetch every page of a paginated endpoint concurrently (see
+        ``workflows.pagination.fetch_pages``) and return them as a lazy stream.
+        """
+        kwargs.setdefault('max_workers', self.workflow_config.get('http', {}).get('max_concurrency', 4))
+        pages = fetch_pages(self.http, url, params, **kwargs)
+        self._payload_hashes.extend(pages.page_hashes)
+        return pages
+
+    def _record(self, payload: HttpPayload) -> HttpPayload:
+        self._payload_hashes.append(payload.sha256)
+        return payload
+
+    def payload_digest(self) -> Optional[str]:
+        """
+        Hash of every payload fetched through ``http_get``/``http_post`` during
+        this run, or None if the workflow fetched by other means.
+        """
+        if not self._payload_hashes:
+            return None
+        return hashlib.sha256('\n'.join(self._payload_hashes).encode('utf-8')).hexdigest()
+
+    def processing_version(self) -> str:
+        """
+        Hash of what the processed output depends on besides the payloads:
+        ``PROCESS_VERSION``, the source of ``process_data`` and the schema
+        declared in ``dataset.yaml``.
+        """
+        process_data = type(self).process_data
+        try:
+            source = inspect.getsource(process_data)
+        except (OSError, TypeError):
+            source = process_data.__qualname__
+        schema = self.schema
+        parts = [str(self.PROCESS_VERSION), source,
+                 json.dumps(schema.to_columns() if schema else None, sort_keys=True, default=str)]
+        return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+
+    def _processed_paths(self):
+        directory = os.path.join(self.cache_dir, 'processed')
+        return os.path.join(directory, f'{self.name}.json'), os.path.join(directory, f'{self.name}.parquet')
+
+    def load_processed(self, digest: str) -> Optional[pd.DataFrame]:
+        """The output of the last run if it was processed from the same payloads, the same way."""
+        state_path, data_path = self._processed_paths()
+        try:
+            with open(state_path) as f:
+                state = json.load(f)
+            if (state.get('payload_digest') != digest
+                    or state.get('processing_version') != self.processing_version()):
+                return None
+            return pd.read_parquet(data_path)
+        except (OSError, ValueError):
+            return None
+
+    def store_processed(self, digest: str, processed_data: pd.DataFrame):
+        state_path, data_path = self._processed_paths()
+        os.makedirs(os.path.dirname(data_path), exist_ok=True)
+        tmp_path = f'{data_path}.tmp'
+        processed_data.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, data_path)
+        atomic_write(state_path, json.dumps({'payload_digest': digest,
+                                             'processing_version': self.processing_version()}).encode('utf-8'))
+
     @abstractmethod
     def fetch_data(self) -> Any:
         """
         Fetch raw data from the source.
-        
+
         Returns:
             Any: The raw data fetched from the source
         """
@@ -35,21 +171,39 @@ class BaseWorkflow(ABC):
     def process_data(self, raw_data: Any) -> pd.DataFrame:
         """
         Process the raw data into a pandas DataFrame.
-        
+
         Args:
-            raw_data (Any): The raw data returned by fetch_data
-        
+            raw_data (Any): The raw data returned by fetch_data; paginated
+                sources pass an iterator that yields one page at a time
+
         Returns:
             pd.DataFrame: The processed data
         """
         pass
 
-    @abstractmethod
     def run(self) -> pd.DataFrame:
         """
         Run the complete workflow.
-        
+
+        When every payload fetched over ``http_get``/``http_post`` hashes the
+        same as on the last run, and ``processing_version`` is unchanged,
+        ``process_data`` is skipped and the previous output is returned.
+
         Returns:
             pd.DataFrame: The final processed data
         """
-        pass
\ No newline at end of file
+        self.log_start()
+        self._payload_hashes = []
+        self.skipped = False
+        raw_data = self.fetch_data()
+        digest = self.payload_digest()
+        processed_data = self.load_processed(digest) if digest else None
+        if processed_data is not None:
+            self.skipped = True
+            print(f"Workflow '{self.name}': source unchanged, skipping processing")
+        else:
+            processed_data = self.process_data(raw_data)
+            if digest:
+                self.store_processed(digest, processed_data)
+        self.log_end()
+        return processed_data
@@ -0,0 +1,185 @@
+# workflows/http.py
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Optional
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join('.cache', 'workflows')
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def atomic_write(path: str, content: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+class HttpPayload:
+    """A response body plus the SHA-256 it is stored under in the download cache."""
+
+    def __init__(self, content: bytes, sha256: str, status_code: int, from_cache: bool):
+        self.content = content
+        self.sha256 = sha256
+        self.status_code = status_code
+        # True when the upstream answered 304 and the body came from disk
+        self.from_cache = from_cache
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+class DownloadCache:
+    """
+    On-disk, content-addressed store for workflow downloads.
+
+    Bodies live under ``objects/<sha256>`` so identical payloads are stored
+    once. ``index/<request key>.json`` maps a request to the object it last
+    returned and the validators (ETag, Last-Modified) to revalidate it with.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR):
+        self.directory = directory
+
+    @staticmethod
+    def request_key(method: str, url: str, params: Optional[Dict] = None, body: Any = None) -> str:
+        canonical = json.dumps([method.upper(), url, params or {}, body], sort_keys=True, default=str)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def object_path(self, sha256: str) -> str:
+        return os.path.join(self.directory, 'objects', sha256[:2], sha256)
+
+    def _index_path(self, key: str) -> str:
+        return os.path.join(self.directory, 'index', f'{key}.json')
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """The index entry for ``key``, or None if it or its object is missing."""
+        try:
+            with open(self._index_path(key)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if os.path.exists(self.object_path(entry['sha256'])) else None
+
+    def read(self, sha256: str) -> bytes:
+        with open(self.object_path(sha256), 'rb') as f:
+            return f.read()
+
+    def store(self, key: str, url: str, content: bytes, etag: Optional[str], last_modified: Optional[str]) -> str:
+        sha256 = hashlib.sha256(content).hexdigest()
+        object_path = self.object_path(sha256)
+        if not os.path.exists(object_path):
+            atomic_write(object_path, content)
+        entry = {'url': url, 'sha256': sha256, 'etag': etag, 'last_modified': last_modified}
+        atomic_write(self._index_path(key), json.dumps(entry).encode('utf-8'))
+        return sha256
+
+
+class RateLimiter:
+    """Spaces calls to ``acquire`` at least ``1 / rate`` seconds apart, across threads."""
+
+    def __init__(self, rate: Optional[float] = None):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+class HttpClient:
+    """
+    Pooled HTTP session for workflows with conditional revalidation.
+
+    A cached request is re-sent with ``If-None-Match``/``If-Modified-Since``;
+    on ``304 Not Modified`` the body is served from the download cache, so an
+    unchanged upstream costs one round trip and no transfer.
+
+    Connection errors and 429/5xx responses are retried with exponential
+    backoff (honouring ``Retry-After``); ``rate_limit`` caps requests per
+    second across all threads sharing the client.
+    """
+
+    def __init__(self, cache: Optional[DownloadCache] = None, pool_size: int = 10,
+                 timeout: float = 60, session: Optional[requests.Session] = None,
+                 retries: int = 3, backoff: float = 0.5, rate_limit: Optional[float] = None):
+        self.cache = cache or DownloadCache()
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.rate_limiter = RateLimiter(rate_limit)
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def request(self, method: str, url: str, params: Optional[Dict] = None, json_body: Any = None,
+                headers: Optional[Dict[str, str]] = None) -> HttpPayload:
+        key = self.cache.request_key(method, url, params, json_body)
+        cached = self.cache.lookup(key)
+        request_headers = dict(headers or {})
+        if cached is not None:
+            if cached.get('etag'):
+                request_headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                request_headers['If-Modified-Since'] = cached['last_modified']
+
+        response = self._send(method, url, params=params, json=json_body, headers=request_headers)
+        if response.status_code == 304 and cached is not None:
+            logger.debug("Not modified: %s %s", method, url)
+            return HttpPayload(self.cache.read(cached['sha256']), cached['sha256'], 304, from_cache=True)
+
+        response.raise_for_status()
+        sha256 = self.cache.store(key, url, response.content,
+                                  response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        logger.debug("Downloaded %s %s (%d bytes)", method, url, len(response.content))
+        return HttpPayload(response.content, sha256, response.status_code, from_cache=False)
+
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        for attempt in range(self.retries + 1):
+            self.rate_limiter.acquire()
+            delay = self.backoff * (2 ** attempt)
+            try:
+                response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    raise
+                logger.warning("Request failed, retrying in %.2fs: %s %s", delay, method, url)
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                    return response
+                retry_after = response.headers.get('Retry-After', '')
+                if retry_after.isdigit():
+                    delay = float(retry_after)
+                logger.warning("HTTP %d, retrying in %.2fs: %s %s", response.status_code, delay, method, url)
+            time.sleep(delay)
+
+    def get(self, url: str, params: Optional[Dict] = None, **kwargs) -> HttpPayload:
+        return self.request('GET', url, params=params, **kwargs)
+
+    def post(self, url: str, json_body: Any = None, **kwargs) -> HttpPayload:
+        return self.request('POST', url, json_body=json_body, **kwargs)
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,58 @@
+# workflows/pagination.py
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from workflows.http import HttpClient
+
+
+class PageStream:
+    """
+    Iterator over downloaded pages, in page order.
+
+    Pages are already in the download cache; each one is read and parsed
+    only when the consumer reaches it, so at most one parsed page is held in
+    memory at a time.
+    """
+
+    def __init__(self, client: HttpClient, page_hashes: List[str], records: Callable[[Any], Any]):
+        self.client = client
+        self.page_hashes = page_hashes
+        self.records = records
+
+    @property
+    def paths(self) -> List[str]:
+        """Cache files holding the pages, for readers that parse them natively."""
+        return [self.client.cache.object_path(sha256) for sha256 in self.page_hashes]
+
+    def __len__(self) -> int:
+        return len(self.page_hashes)
+
+    def __iter__(self) -> Iterator[Any]:
+        for sha256 in self.page_hashes:
+            yield self.records(json.loads(self.client.cache.read(sha256)))
+
+
+def fetch_pages(client: HttpClient, url: str, params: Optional[Dict] = None,
+                total_pages: Callable[[Any], int] = lambda document: document[0]['pages'],
+                records: Callable[[Any], Any] = lambda document: document[1] or [],
+                page_param: str = 'page', max_workers: int = 4) -> PageStream:
+    """
+    Download every page of a paginated endpoint.
+
+    Page 1 is fetched first to read the page count from its metadata (the
+    defaults fit the World Bank API's ``[metadata, records]`` documents); the
+    remaining pages are fetched concurrently on at most ``max_workers``
+    threads, with the client's retries and rate limit applied to each.
+    """
+    params = dict(params or {})
+
+    def fetch_page(page: int) -> str:
+        return client.get(url, params={**params, page_param: page}).sha256
+
+    first_hash = fetch_page(1)
+    pages = int(total_pages(json.loads(client.cache.read(first_hash))) or 1)
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        # map() keeps page order regardless of completion order
+        rest = list(executor.map(fetch_page, range(2, pages + 1)))
+    return PageStream(client, [first_hash] + rest, records)
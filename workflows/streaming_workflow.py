@@ -0,0 +1,174 @@
+# workflows/streaming_workflow.py
+
+import os
+import queue
+import threading
+from abc import abstractmethod
+from typing import Any, Iterable, Iterator, Optional, Union
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from workflows.base_workflow import BaseWorkflow
+from workflows.columnar import apply_schema
+from utils.schema import DatasetSchema, storage_table
+from data_binding.snapshot import atomic_snapshot, snapshot_version
+from data_binding.events import publish_dataset_event
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def bounded_prefetch(chunks: Iterable[Any], depth: int = 2) -> Iterator[Any]:
+    """
+    Iterate ``chunks`` on a background thread, at most ``depth`` chunks ahead.
+
+    The producer blocks once ``depth`` chunks are waiting, so a fast source
+    cannot outrun a slow consumer (backpressure) and memory stays bounded by
+    ``depth + 2`` chunks. Errors raised by the source are re-raised in the
+    consumer; closing the iterator early stops the producer.
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=max(1, depth))
+    stopped = threading.Event()
+
+    def put(item) -> bool:
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for chunk in chunks:
+                if not put(chunk):
+                    return
+        except BaseException as e:
+            put(_Failure(e))
+        put(_DONE)
+
+    producer = threading.Thread(target=produce, name='workflow-prefetch', daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stopped.set()
+        producer.join()
+
+
+class StreamingWorkflow(BaseWorkflow):
+    """
+    Workflow that fetches, processes and writes its data chunk by chunk.
+
+    ``fetch_chunks`` yields raw chunks (pages, files, date ranges...), which are
+    prefetched on a background thread with bounded backpressure. Each one is
+    turned into a table by ``process_chunk``, coerced to the dataset.yaml
+    schema and appended to the dataset's Parquet snapshot as its own row
+    group, so memory use depends on the chunk size, not the dataset size. The
+    snapshot is published atomically once the last chunk is written, followed
+    by a dataset event for the API caches.
+    """
+
+    # Chunks fetched ahead of processing
+    prefetch_chunks = 2
+    compression = 'zstd'
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.rows_written = 0
+        self.chunks_written = 0
+
+    @abstractmethod
+    def fetch_chunks(self) -> Iterator[Any]:
+        """
+        Yield raw chunks from the source, one at a time.
+
+        Returns:
+            Iterator[Any]: The raw chunks
+        """
+        pass
+
+    @abstractmethod
+    def process_chunk(self, raw_chunk: Any) -> Union[pa.Table, pd.DataFrame]:
+        """
+        Process one raw chunk.
+
+        Args:
+            raw_chunk (Any): A chunk yielded by fetch_chunks
+
+        Returns:
+            Union[pa.Table, pd.DataFrame]: The processed rows of that chunk
+        """
+        pass
+
+    @property
+    def output_path(self) -> str:
+        """The Parquet snapshot the dataset is served from."""
+        file_name = self.definition.get('database', {}).get('file') or 'data.parquet'
+        if not file_name.endswith('.parquet'):
+            file_name = 'data.parquet'
+        return os.path.join(self.dataset_dir, 'data', file_name)
+
+    def fetch_data(self) -> Iterator[Any]:
+        return self.fetch_chunks()
+
+    def process_data(self, raw_data: Iterable[Any]) -> pd.DataFrame:
+        """Process every chunk and return them as one DataFrame (not used by ``run``)."""
+        schema = self.schema
+        tables = [self._to_table(self.process_chunk(chunk), schema) for chunk in raw_data]
+        return pa.concat_tables(tables).to_pandas(date_as_object=False) if tables else pd.DataFrame()
+
+    @staticmethod
+    def _to_table(processed: Union[pa.Table, pd.DataFrame], schema: Optional[DatasetSchema]) -> pa.Table:
+        if isinstance(processed, pd.DataFrame):
+            processed = pa.Table.from_pandas(processed, preserve_index=False)
+        return apply_schema(processed, schema)
+
+    def run(self) -> str:
+        """
+        Run the workflow, streaming every chunk into the Parquet snapshot.
+
+        Returns:
+            str: The path of the published snapshot
+        """
+        self.log_start()
+        self.rows_written = 0
+        self.chunks_written = 0
+        target = self.output_path
+        schema = self.schema
+        with atomic_snapshot(target) as tmp_path:
+            writer: Optional[pq.ParquetWriter] = None
+            try:
+                for raw_chunk in bounded_prefetch(self.fetch_chunks(), self.prefetch_chunks):
+                    table = storage_table(self._to_table(self.process_chunk(raw_chunk), schema))
+                    if table.num_rows == 0:
+                        continue
+                    if writer is None:
+                        writer = pq.ParquetWriter(tmp_path, table.schema, compression=self.compression)
+                    # One row group per chunk
+                    writer.write_table(table.cast(writer.schema), row_group_size=table.num_rows)
+                    self.rows_written += table.num_rows
+                    self.chunks_written += 1
+                if writer is None and schema is not None:
+                    writer = pq.ParquetWriter(tmp_path, storage_table(schema.arrow_schema.empty_table()).schema,
+                                              compression=self.compression)
+            finally:
+                if writer is not None:
+                    writer.close()
+            if writer is None:
+                raise ValueError(f"Workflow '{self.name}' produced no rows and declares no schema")
+        if self.dataset_key is not None:
+            publish_dataset_event(*self.dataset_key, snapshot_version(target), target)
+        self.log_end()
+        return target